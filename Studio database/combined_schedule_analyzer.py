@@ -1,5 +1,4 @@
 from openpyxl import load_workbook
-import pandas as pd
 import re
 import json
 from datetime import datetime
@@ -233,6 +232,8 @@ if __name__ == "__main__":
                 'Teacher_Color': lesson['teacher_color']
             })
     
+    # pandas is only needed for the summary CSV, so it is imported here
+    import pandas as pd
     df = pd.DataFrame(lessons_list)
     summary_file = 'Private_lesson_Calendar_69-615_LESSON_SUMMARY.csv'
     df.to_csv(summary_file, index=False)
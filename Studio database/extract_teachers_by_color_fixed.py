@@ -1,5 +1,4 @@
 from openpyxl import load_workbook
-import pandas as pd
 import re
 
 def extract_teachers_by_color_fixed():
@@ -134,7 +133,8 @@ def extract_teachers_by_color_fixed():
                 date = ''
         headers.append(f"{day} {studio} ({date})")
     
-    # Save teacher colors CSV
+    # Save teacher colors CSV (pandas is imported only once the workbook is read)
+    import pandas as pd
     teacher_df = pd.DataFrame(teacher_data, columns=headers)
     teacher_output = 'Private_lesson_Calendar_69-615_TEACHERS_BY_COLOR.csv'
     teacher_df.to_csv(teacher_output, index=False)
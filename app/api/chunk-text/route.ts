@@ -1,6 +1,7 @@
 import { NextRequest, NextResponse } from 'next/server';
 import { spawn } from 'child_process';
 import path from 'path';
+import { decodeProcessorOutput, PROCESSOR_OUTPUT_FORMAT_ENV } from '@/lib/processor-output';
 
 export async function POST(request: NextRequest) {
   console.log('=== CHUNK TEXT API ROUTE CALLED ===');
@@ -56,19 +57,22 @@ export async function POST(request: NextRequest) {
     console.log('Executing Python chunking script:', scriptPath);
 
     // Execute the Python script
-    const result = await new Promise<string>((resolve, reject) => {
+    const result = await new Promise<Buffer>((resolve, reject) => {
       const pythonProcess = spawn('python', [
         scriptPath,
         text,
         chunkSize.toString(),
         overlap.toString()
-      ]);
+      ], {
+        // Chunk text arrives as raw UTF-8 frames instead of escaped JSON
+        env: { ...process.env, [PROCESSOR_OUTPUT_FORMAT_ENV]: 'binary' }
+      });
 
-      let stdout = '';
+      const stdoutChunks: Buffer[] = [];
       let stderr = '';
 
-      pythonProcess.stdout.on('data', (data) => {
-        stdout += data.toString();
+      pythonProcess.stdout.on('data', (data: Buffer) => {
+        stdoutChunks.push(data);
       });
 
       pythonProcess.stderr.on('data', (data) => {
@@ -77,7 +81,7 @@ export async function POST(request: NextRequest) {
 
       pythonProcess.on('close', (code) => {
         if (code === 0) {
-          resolve(stdout);
+          resolve(Buffer.concat(stdoutChunks));
         } else {
           console.error('Python script stderr:', stderr);
           reject(new Error(`Python script failed with code ${code}: ${stderr}`));
@@ -93,9 +97,9 @@ export async function POST(request: NextRequest) {
     // Parse the Python script output
     let pythonResult;
     try {
-      pythonResult = JSON.parse(result);
+      pythonResult = decodeProcessorOutput(result);
     } catch (_parseError) {
-      console.error('Failed to parse Python output:', result);
+      console.error('Failed to parse Python output:', result.toString('utf-8'));
       return NextResponse.json({
         success: false,
         error: 'Failed to parse chunking result'
@@ -0,0 +1,141 @@
+import { NextRequest, NextResponse } from 'next/server';
+import { spawn } from 'child_process';
+import { mkdir, writeFile, unlink } from 'fs/promises';
+import path from 'path';
+import { decodeProcessorOutput } from '@/lib/processor-output';
+
+const SUPPORTED_EXTENSIONS = ['.pdf', '.docx', '.pptx', '.xlsx', '.csv', '.html', '.htm', '.md', '.markdown'];
+
+// Extracts and chunks an uploaded document in a single Python process
+// (scripts/ingest_pipeline.py) instead of process-* followed by /api/chunk-text.
+// Opt-in: the Vectorize upload flow and processDocument() still use process-*,
+// because they show and summarize the extracted text before it is chunked.
+export async function POST(request: NextRequest) {
+  console.log('=== INGEST DOCUMENT API ROUTE CALLED ===');
+
+  try {
+    const formData = await request.formData();
+    const file = formData.get('file') as File;
+    const chunkSize = parseInt((formData.get('chunkSize') as string) || '1000', 10);
+    const overlap = parseInt((formData.get('overlap') as string) || '200', 10);
+
+    if (!file) {
+      return NextResponse.json({
+        success: false,
+        error: 'No file provided'
+      }, { status: 400 });
+    }
+
+    const extension = path.extname(file.name).toLowerCase();
+    if (!SUPPORTED_EXTENSIONS.includes(extension)) {
+      return NextResponse.json({
+        success: false,
+        error: 'File must be a PDF, Word (.docx), PowerPoint (.pptx), Excel (.xlsx), CSV, HTML or Markdown document'
+      }, { status: 400 });
+    }
+
+    if (file.size > 500 * 1024 * 1024) {
+      return NextResponse.json({
+        success: false,
+        error: 'File too large. Maximum size is 500MB'
+      }, { status: 400 });
+    }
+
+    if (isNaN(chunkSize) || chunkSize <= 0 || isNaN(overlap) || overlap < 0 || overlap >= chunkSize) {
+      return NextResponse.json({
+        success: false,
+        error: 'Chunk size must be positive and overlap must be between 0 and chunk size'
+      }, { status: 400 });
+    }
+
+    const buffer = Buffer.from(await file.arrayBuffer());
+    const tempFileName = `temp_${Date.now()}_${file.name.replace(/[^a-zA-Z0-9.-]/g, '_')}`;
+    const tempFilePath = path.join(process.cwd(), 'temp', tempFileName);
+    const scriptPath = path.join(process.cwd(), 'scripts', 'ingest_pipeline.py');
+
+    await mkdir(path.join(process.cwd(), 'temp'), { recursive: true });
+    await writeFile(tempFilePath, buffer);
+
+    try {
+      console.log('Executing Python ingestion pipeline:', scriptPath);
+
+      const output = await new Promise<Buffer>((resolve, reject) => {
+        const pythonProcess = spawn('python3', [
+          scriptPath,
+          tempFilePath,
+          '--chunk-size', chunkSize.toString(),
+          '--overlap', overlap.toString(),
+          // Chunk text arrives as raw UTF-8 frames instead of escaped JSON
+          '--output-format', 'binary'
+        ]);
+
+        const stdoutChunks: Buffer[] = [];
+        let stderr = '';
+
+        pythonProcess.stdout.on('data', (data: Buffer) => {
+          stdoutChunks.push(data);
+        });
+
+        pythonProcess.stderr.on('data', (data) => {
+          stderr += data.toString();
+        });
+
+        pythonProcess.on('close', () => {
+          if (stderr) {
+            console.error('Python script stderr:', stderr);
+          }
+          // A failed ingestion still prints an error result
+          resolve(Buffer.concat(stdoutChunks));
+        });
+
+        pythonProcess.on('error', (err) => {
+          reject(new Error(`Failed to start Python process: ${err.message}`));
+        });
+      });
+
+      const result = decodeProcessorOutput(output);
+
+      if (!result.success) {
+        console.log('Document ingestion failed:', result.error);
+        return NextResponse.json({
+          success: false,
+          error: result.error,
+          filename: file.name,
+          size: file.size,
+          chunks: []
+        });
+      }
+
+      console.log('Document ingestion successful:', {
+        documentType: result.documentType,
+        totalChunks: result.metadata.totalChunks,
+        blockCount: result.metadata.blockCount
+      });
+
+      return NextResponse.json({
+        success: true,
+        filename: file.name,
+        size: file.size,
+        documentType: result.documentType,
+        uploadTime: new Date().toISOString(),
+        chunks: result.chunks,
+        metadata: result.metadata
+      });
+
+    } finally {
+      try {
+        await unlink(tempFilePath);
+      } catch (cleanupError) {
+        console.error('Failed to clean up temp file:', cleanupError);
+      }
+    }
+
+  } catch (error) {
+    console.error('Ingest document API error:', error);
+
+    return NextResponse.json({
+      success: false,
+      error: error instanceof Error ? error.message : 'Unknown error occurred'
+    }, { status: 500 });
+  }
+}
@@ -3,9 +3,13 @@ import { exec } from 'child_process';
 import { promisify } from 'util';
 import { writeFile, unlink } from 'fs/promises';
 import path from 'path';
+import { decodeProcessorOutput } from '@/lib/processor-output';
 
 const execAsync = promisify(exec);
 
+// Largest processor output accepted on stdout
+const PROCESSOR_MAX_BUFFER = 200 * 1024 * 1024;
+
 export async function POST(request: NextRequest) {
   console.log('=== PDF API ROUTE CALLED ===');
   
@@ -59,15 +63,16 @@ export async function POST(request: NextRequest) {
       
       console.log('Executing Python PDF processor...');
       // Execute Python script to extract text
-      const pythonCommand = `python3 scripts/pdf_processor.py "${tempFilePath}" --max-pages 50`;
-      const { stdout, stderr } = await execAsync(pythonCommand);
+      // Binary output carries the extracted text as raw UTF-8 instead of escaped JSON
+      const pythonCommand = `python3 scripts/pdf_processor.py "${tempFilePath}" --max-pages 50 --output-format binary`;
+      const { stdout, stderr } = await execAsync(pythonCommand, { encoding: 'buffer', maxBuffer: PROCESSOR_MAX_BUFFER });
       
-      if (stderr) {
-        console.error('Python script stderr:', stderr);
+      if (stderr.length) {
+        console.error('Python script stderr:', stderr.toString());
       }
       
-      console.log('Python script completed, parsing result...');
-      const result = JSON.parse(stdout);
+      console.log('Python script completed, decoding result...');
+      const result = decodeProcessorOutput(stdout);
       
       // Clean up temporary file
       await unlink(tempFilePath);
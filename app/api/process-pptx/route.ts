@@ -3,9 +3,13 @@ import { exec } from 'child_process';
 import { promisify } from 'util';
 import { writeFile, unlink } from 'fs/promises';
 import path from 'path';
+import { decodeProcessorOutput } from '@/lib/processor-output';
 
 const execAsync = promisify(exec);
 
+// Largest processor output accepted on stdout
+const PROCESSOR_MAX_BUFFER = 200 * 1024 * 1024;
+
 export async function POST(request: NextRequest) {
   console.log('=== PPTX API ROUTE CALLED ===');
   
@@ -68,16 +72,17 @@ export async function POST(request: NextRequest) {
       console.log('Executing Python PowerPoint processor...');
       // Execute Python script to extract text using virtual environment
       const slideBySlideFlag = slideBySlide ? ' --slide-by-slide' : '';
-      const pythonCommand = `source venv/bin/activate && python3 scripts/pptx_processor.py "${tempFilePath}"${slideBySlideFlag}`;
+      const pythonCommand = `source venv/bin/activate && python3 scripts/pptx_processor.py "${tempFilePath}"${slideBySlideFlag} --cache-dir temp/pptx-slide-cache --output-format binary`;
       console.log('Python command:', pythonCommand);
-      const { stdout, stderr } = await execAsync(pythonCommand, { shell: '/bin/bash' });
+      // Binary output carries the extracted text as raw UTF-8 instead of escaped JSON
+      const { stdout, stderr } = await execAsync(pythonCommand, { shell: '/bin/bash', encoding: 'buffer', maxBuffer: PROCESSOR_MAX_BUFFER });
       
-      if (stderr) {
-        console.error('Python script stderr:', stderr);
+      if (stderr.length) {
+        console.error('Python script stderr:', stderr.toString());
       }
       
-      console.log('Python script completed, parsing result...');
-      const result = JSON.parse(stdout);
+      console.log('Python script completed, decoding result...');
+      const result = decodeProcessorOutput(stdout);
       
       // Clean up temporary file
       await unlink(tempFilePath);
@@ -110,6 +115,8 @@ export async function POST(request: NextRequest) {
         uploadTime: new Date().toISOString(),
         hasText: result.hasText,
         slideTexts: result.slideTexts || [],
+        reusedSlides: result.reusedSlides || [],
+        changedSlides: result.changedSlides || [],
         extractedLength: result.text.length,
         documentType: 'pptx',
         readyForSummarization: true
@@ -71,6 +71,8 @@ interface Chunk {
   text: string;
   charCount: number;
   wordCount: number;
+  start?: number;
+  end?: number;
 }
 
 interface SummaryResult {
@@ -0,0 +1,51 @@
+// Decoder for the Python processors' binary output (scripts/processor_output.py).
+//
+// Scripts run with `--output-format binary` (or RAG_PROCESSOR_OUTPUT_FORMAT=binary)
+// write "RPO1", then a length-prefixed compact JSON header, then length-prefixed
+// raw UTF-8 text frames; {"$frame": n} in the header stands for the n-th frame.
+// Lengths are unsigned 32-bit big-endian. Anything without the magic bytes is
+// plain JSON (errors raised before the output format is known).
+
+const BINARY_MAGIC = Buffer.from('RPO1', 'ascii');
+const FRAME_KEY = '$frame';
+
+export const PROCESSOR_OUTPUT_FORMAT_ENV = 'RAG_PROCESSOR_OUTPUT_FORMAT';
+
+function restoreFrames(value: unknown, frames: string[]): unknown {
+  if (Array.isArray(value)) {
+    return value.map(item => restoreFrames(item, frames));
+  }
+  if (value !== null && typeof value === 'object') {
+    const record = value as Record<string, unknown>;
+    const keys = Object.keys(record);
+    if (keys.length === 1 && keys[0] === FRAME_KEY && typeof record[FRAME_KEY] === 'number') {
+      return frames[record[FRAME_KEY] as number];
+    }
+    for (const key of keys) {
+      record[key] = restoreFrames(record[key], frames);
+    }
+  }
+  return value;
+}
+
+export function decodeProcessorOutput<T = any>(output: Buffer): T {
+  if (output.length < BINARY_MAGIC.length || !output.subarray(0, BINARY_MAGIC.length).equals(BINARY_MAGIC)) {
+    return JSON.parse(output.toString('utf-8'));
+  }
+
+  let offset = BINARY_MAGIC.length;
+  const headerLength = output.readUInt32BE(offset);
+  offset += 4;
+  const header = JSON.parse(output.toString('utf-8', offset, offset + headerLength));
+  offset += headerLength;
+
+  const frames: string[] = [];
+  while (offset < output.length) {
+    const length = output.readUInt32BE(offset);
+    offset += 4;
+    frames.push(output.toString('utf-8', offset, offset + length));
+    offset += length;
+  }
+
+  return restoreFrames(header, frames) as T;
+}
@@ -0,0 +1,739 @@
+#!/usr/bin/env python3
+"""
+Approximate Nearest-Neighbour Index over segs Embeddings
+Exports segs vectors to a memory-mappable .npy file and builds an IVF-PQ index in
+NumPy: a coarse k-means quantizer picks a few inverted lists per query and product-
+quantized residuals score their members from one lookup table, with optional exact
+re-ranking. New chunks can be added without retraining (as small part files next
+to the index, replacing earlier copies of the same keys), and nprobe/rerank trade
+recall for latency. Queries return segs (doc, id) keys with cosine scores.
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+from pathlib import Path
+
+try:
+    import numpy as np
+except ImportError:
+    print(json.dumps({
+        "success": False,
+        "error": "numpy not installed. Please run: pip install numpy"
+    }))
+    sys.exit(1)
+
+from segs_loader import connect_sqlite, connect_oracle, stand_in_embedding
+
+INDEX_VERSION = 1
+
+# Sub-quantizer centroids; codes are one byte per subspace
+PQ_CENTROIDS = 256
+
+DEFAULT_TOP_K = 10
+DEFAULT_NPROBE = 8
+DEFAULT_RERANK = 50
+DEFAULT_ITERATIONS = 10
+DEFAULT_TRAIN_SAMPLE = 50000
+
+# Rows per block when computing distances, bounding temporary matrices
+DISTANCE_BLOCK_ROWS = 8192
+
+# Rows added as part files before the whole index is rewritten grouped by list
+COMPACT_FRACTION = 0.25
+MAX_PARTS = 16
+
+EXPORT_SQL = "select doc, id, vec from segs where vec is not null"
+EXPORT_ORDER_SQL = " order by doc, id"
+
+def normalize_rows(vectors):
+    """Scale rows to unit length (zero rows are left as zeros) so inner product is cosine."""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.where(norms > 0, norms, 1.0)
+
+def keys_path(embeddings_path):
+    """Path of the (doc, id) keys file written next to an embeddings .npy file."""
+    return Path(embeddings_path).with_suffix(".keys.json")
+
+def key_codes(keys):
+    """View (n, 2) [document number, id] keys as n opaque values for set operations (np.isin, np.unique)."""
+    return np.ascontiguousarray(keys, dtype=np.int64).reshape(-1, 2).view(np.dtype((np.void, 16))).ravel()
+
+def last_occurrences(keys):
+    """Sorted row numbers of the last row for each distinct key."""
+    _, reversed_first = np.unique(key_codes(keys)[::-1], return_index=True)
+    return np.sort(len(keys) - 1 - reversed_first)
+
+class RowBlocks:
+    """
+    Read-only row-wise concatenation of arrays, such as memory-mapped saved parts
+    plus newly added rows, that gathers rows without copying the blocks.
+    """
+
+    def __init__(self, blocks):
+        self.blocks = [block for block in blocks if len(block)] or list(blocks[:1])
+        self.starts = np.cumsum([0] + [len(block) for block in self.blocks])
+        self.shape = (int(self.starts[-1]),) + self.blocks[0].shape[1:]
+        self.dtype = self.blocks[0].dtype
+
+    @classmethod
+    def join(cls, *arrays):
+        blocks = []
+        for array in arrays:
+            blocks.extend(array.blocks if isinstance(array, RowBlocks) else [array])
+        return cls(blocks)
+
+    def __len__(self):
+        return self.shape[0]
+
+    def __getitem__(self, rows):
+        rows = np.asarray(rows, dtype=np.int64).reshape(-1)
+        result = np.empty((len(rows),) + self.shape[1:], dtype=self.dtype)
+        numbers = np.searchsorted(self.starts, rows, side="right") - 1
+        for number in np.unique(numbers):
+            selected = numbers == number
+            result[selected] = self.blocks[number][rows[selected] - self.starts[number]]
+        return result
+
+    def __matmul__(self, other):
+        return np.concatenate([block @ other for block in self.blocks])
+
+    def __array__(self, dtype=None, copy=None):
+        array = np.concatenate(self.blocks) if len(self.blocks) > 1 else np.asarray(self.blocks[0])
+        return array.astype(dtype, copy=False) if dtype is not None else array
+
+def staging_directory(target_dir):
+    """Create an empty sibling directory to write a new version of target_dir into."""
+    target_dir = Path(target_dir)
+    staging = target_dir.with_name(target_dir.name + ".tmp")
+    shutil.rmtree(staging, ignore_errors=True)
+    staging.mkdir(parents=True)
+    return staging
+
+def publish_directory(staging, target_dir):
+    """Swap a fully written staging directory into place with renames, then drop the old one."""
+    target_dir = Path(target_dir)
+    previous = target_dir.with_name(target_dir.name + ".old")
+    shutil.rmtree(previous, ignore_errors=True)
+    if target_dir.exists():
+        os.replace(target_dir, previous)
+    os.replace(staging, target_dir)
+    shutil.rmtree(previous, ignore_errors=True)
+
+def export_embeddings(connection, backend, embeddings_path, doc=None, min_id=None):
+    """
+    Export segs vectors to a .npy file and their (doc, id) keys to a .keys.json file.
+
+    Args:
+        connection: DB-API connection (python-oracledb or sqlite3)
+        backend (str): "oracle" or "sqlite"
+        embeddings_path (str): Output .npy path
+        doc (str): Only export this document's chunks
+        min_id (int): Only export chunks with at least this id
+
+    Returns:
+        dict: Row count, dimensions and output paths
+    """
+    cursor = connection.cursor()
+    documents = []
+    document_numbers = {}
+    keys = []
+    vectors = []
+    try:
+        sql = EXPORT_SQL
+        binds = {}
+        if doc is not None:
+            sql += " and doc = :doc"
+            binds["doc"] = doc
+        if min_id is not None:
+            sql += " and id >= :min_id"
+            binds["min_id"] = min_id
+        cursor.execute(sql + EXPORT_ORDER_SQL, binds)
+        for doc, chunk_id, vec in cursor:
+            if backend == "sqlite":
+                vector = np.frombuffer(vec, dtype=np.float32)
+            else:
+                # python-oracledb returns VECTOR columns as array.array
+                vector = np.asarray(vec, dtype=np.float32)
+            if doc not in document_numbers:
+                document_numbers[doc] = len(documents)
+                documents.append(doc)
+            keys.append([document_numbers[doc], int(chunk_id)])
+            vectors.append(vector)
+    finally:
+        cursor.close()
+
+    if not vectors:
+        raise ValueError("segs has no embedded rows to export" if not binds else "No embedded segs rows match the filters")
+    matrix = np.vstack(vectors).astype(np.float32, copy=False)
+
+    Path(embeddings_path).parent.mkdir(parents=True, exist_ok=True)
+    np.save(embeddings_path, matrix)
+    keys_path(embeddings_path).write_text(json.dumps({"documents": documents, "keys": keys}), encoding="utf-8")
+    return {
+        "rows": len(keys),
+        "dimensions": int(matrix.shape[1]),
+        "embeddings": str(embeddings_path),
+        "keys": str(keys_path(embeddings_path))
+    }
+
+def load_embeddings(embeddings_path):
+    """
+    Memory-map an exported embeddings file and read its keys.
+
+    Returns:
+        tuple: (vectors memmap, documents list, keys array of [doc number, id])
+    """
+    vectors = np.load(embeddings_path, mmap_mode="r")
+    key_data = json.loads(keys_path(embeddings_path).read_text(encoding="utf-8"))
+    keys = np.asarray(key_data["keys"], dtype=np.int64).reshape(-1, 2)
+    if len(keys) != len(vectors):
+        raise ValueError(f"{keys_path(embeddings_path)} has {len(keys)} keys for {len(vectors)} vectors")
+    return vectors, key_data["documents"], keys
+
+def nearest_centroids(data, centroids):
+    """Index of the nearest centroid (squared L2) for every row, computed in blocks."""
+    centroid_norms = np.einsum("ij,ij->i", centroids, centroids)
+    assignment = np.empty(len(data), dtype=np.int32)
+    for start in range(0, len(data), DISTANCE_BLOCK_ROWS):
+        block = data[start:start + DISTANCE_BLOCK_ROWS]
+        # ||x||^2 is the same for every centroid, so it is left out of the argmin
+        distances = centroid_norms - 2.0 * (block @ centroids.T)
+        assignment[start:start + len(block)] = np.argmin(distances, axis=1)
+    return assignment
+
+def kmeans(data, clusters, iterations=DEFAULT_ITERATIONS, rng=None):
+    """
+    Lloyd's k-means; empty clusters are re-seeded from random rows.
+
+    Args:
+        data (ndarray): float32 rows
+        clusters (int): Number of centroids (at most len(data))
+        iterations (int): Assignment/update rounds
+        rng (Generator): Random generator for seeding
+
+    Returns:
+        ndarray: (clusters, dimensions) float32 centroids
+    """
+    rng = rng or np.random.default_rng(0)
+    clusters = min(clusters, len(data))
+    centroids = data[rng.choice(len(data), clusters, replace=False)].astype(np.float32)
+
+    for _ in range(iterations):
+        assignment = nearest_centroids(data, centroids)
+        counts = np.bincount(assignment, minlength=clusters)
+        empty = counts == 0
+        # Sum each cluster's rows as one contiguous run of the rows sorted by cluster
+        order = np.argsort(assignment, kind="stable")
+        starts = np.searchsorted(assignment[order], np.flatnonzero(~empty))
+        sums = np.zeros_like(centroids)
+        sums[~empty] = np.add.reduceat(data[order], starts, axis=0)
+        centroids = sums / np.maximum(counts, 1).astype(np.float32)[:, None]
+        if empty.any():
+            centroids[empty] = data[rng.choice(len(data), int(empty.sum()), replace=False)]
+    return centroids.astype(np.float32)
+
+def default_subspaces(dimensions):
+    """Number of PQ subspaces: the largest divisor of dimensions up to dimensions / 8."""
+    target = max(1, dimensions // 8)
+    return max(m for m in range(1, target + 1) if dimensions % m == 0)
+
+class IVFPQIndex:
+    """
+    Inverted-file index with product-quantized residuals over unit-length vectors.
+
+    Each vector is stored as its coarse list number and one byte per PQ subspace; the
+    normalized vectors are kept alongside (memory-mapped once saved) for exact
+    re-ranking of the best candidates. Rows superseded by a later add of the same
+    key stay in place, masked out of searches, until the index is compacted.
+    """
+
+    def __init__(self, centroids, codebooks, documents=None):
+        self.centroids = np.asarray(centroids, dtype=np.float32)
+        self.codebooks = np.asarray(codebooks, dtype=np.float32)
+        self.subspaces, self.pq_centroids, self.subspace_dimensions = self.codebooks.shape
+        self.dimensions = self.centroids.shape[1]
+        self.documents = list(documents or [])
+        self._document_numbers = {doc: number for number, doc in enumerate(self.documents)}
+        self.codes = np.empty((0, self.subspaces), dtype=np.uint8)
+        self.lists = np.empty(0, dtype=np.int32)
+        self.keys = np.empty((0, 2), dtype=np.int64)
+        self.vectors = np.empty((0, self.dimensions), dtype=np.float32)
+        self.parts = []
+        self._removed = np.zeros(0, dtype=bool)
+        self._saved_rows = 0
+        self._order = None
+        self._offsets = None
+
+    @property
+    def count(self):
+        """Number of live (not superseded) vectors."""
+        return len(self.keys) - int(self._removed.sum())
+
+    @classmethod
+    def train(cls, vectors, lists=None, subspaces=None, iterations=DEFAULT_ITERATIONS,
+              train_sample=DEFAULT_TRAIN_SAMPLE, seed=0):
+        """
+        Train the coarse quantizer and PQ codebooks on (a sample of) vectors.
+
+        Args:
+            vectors (ndarray): (n, d) vectors; normalized here
+            lists (int): Inverted lists (default: 4 * sqrt(n))
+            subspaces (int): PQ subspaces, must divide d (default: see default_subspaces)
+            iterations (int): k-means rounds
+            train_sample (int): Maximum vectors used for training
+            seed (int): Random seed
+
+        Returns:
+            IVFPQIndex: Trained, empty index
+        """
+        rng = np.random.default_rng(seed)
+        count, dimensions = vectors.shape
+        lists = lists or max(1, int(4 * np.sqrt(count)))
+        subspaces = subspaces or default_subspaces(dimensions)
+        if dimensions % subspaces:
+            raise ValueError(f"PQ subspaces ({subspaces}) must divide the vector dimensions ({dimensions})")
+
+        sample = np.sort(rng.choice(count, min(count, train_sample), replace=False))
+        data = normalize_rows(vectors[sample])
+        centroids = kmeans(data, lists, iterations, rng)
+        residuals = data - centroids[nearest_centroids(data, centroids)]
+
+        subspace_dimensions = dimensions // subspaces
+        pq_centroids = min(PQ_CENTROIDS, len(data))
+        codebooks = np.empty((subspaces, pq_centroids, subspace_dimensions), dtype=np.float32)
+        for subspace in range(subspaces):
+            part = np.ascontiguousarray(residuals[:, subspace * subspace_dimensions:(subspace + 1) * subspace_dimensions])
+            codebooks[subspace] = kmeans(part, pq_centroids, iterations, rng)
+        return cls(centroids, codebooks)
+
+    def encode(self, vectors):
+        """Return (list numbers, PQ codes) for normalized vectors."""
+        lists = nearest_centroids(vectors, self.centroids)
+        residuals = vectors - self.centroids[lists]
+        codes = np.empty((len(vectors), self.subspaces), dtype=np.uint8)
+        width = self.subspace_dimensions
+        for subspace in range(self.subspaces):
+            part = np.ascontiguousarray(residuals[:, subspace * width:(subspace + 1) * width])
+            codes[:, subspace] = nearest_centroids(part, self.codebooks[subspace])
+        return lists, codes
+
+    def add(self, vectors, documents, keys):
+        """
+        Add vectors with their segs keys, using the trained quantizers as they are.
+
+        A key that is already indexed is replaced: the earlier row is masked out of
+        searches. Within vectors, the last row for a key wins.
+
+        Args:
+            vectors (ndarray): (n, d) vectors
+            documents (list): Document names that keys refer to by number
+            keys (ndarray): (n, 2) [document number, chunk id] rows
+
+        Returns:
+            tuple: (new keys added, existing keys replaced)
+        """
+        if vectors.shape[1] != self.dimensions:
+            raise ValueError(f"Expected {self.dimensions}-dimensional vectors, got {vectors.shape[1]}")
+        # Renumber the documents into this index's document list
+        mapping = np.empty(len(documents), dtype=np.int64)
+        for number, doc in enumerate(documents):
+            if doc not in self._document_numbers:
+                self._document_numbers[doc] = len(self.documents)
+                self.documents.append(doc)
+            mapping[number] = self._document_numbers[doc]
+        keys = np.asarray(keys, dtype=np.int64).reshape(-1, 2)
+        keys = np.column_stack([mapping[keys[:, 0]], keys[:, 1]]) if len(keys) else keys
+        if len(keys):
+            unique_rows = last_occurrences(keys)
+            if len(unique_rows) < len(keys):
+                vectors, keys = vectors[unique_rows], keys[unique_rows]
+        replaced = np.flatnonzero(np.isin(key_codes(self.keys), key_codes(keys)) & ~self._removed) \
+            if len(keys) and len(self.keys) else np.empty(0, dtype=np.int64)
+        self._removed[replaced] = True
+
+        added_vectors = []
+        added_lists = []
+        added_codes = []
+        for start in range(0, len(vectors), DISTANCE_BLOCK_ROWS):
+            block = normalize_rows(vectors[start:start + DISTANCE_BLOCK_ROWS])
+            lists, codes = self.encode(block)
+            added_vectors.append(block)
+            added_lists.append(lists)
+            added_codes.append(codes)
+
+        if added_vectors:
+            # Saved rows stay memory-mapped; only the new rows are held in memory
+            self.vectors = RowBlocks.join(self.vectors, *added_vectors)
+            self.codes = RowBlocks.join(self.codes, *added_codes)
+            self.lists = np.concatenate([np.asarray(self.lists), *added_lists])
+            self.keys = np.concatenate([np.asarray(self.keys), keys])
+            self._removed = np.concatenate([self._removed, np.zeros(len(keys), dtype=bool)])
+            self._order = None
+        return len(keys) - len(replaced), len(replaced)
+
+    def _inverted_lists(self):
+        """Vector numbers grouped by list, and each list's start offset (rebuilt after adds)."""
+        if self._order is None:
+            self._order = np.argsort(self.lists, kind="stable").astype(np.int64)
+            self._offsets = np.searchsorted(self.lists[self._order], np.arange(len(self.centroids) + 1))
+        return self._order, self._offsets
+
+    def search(self, query, top_k=DEFAULT_TOP_K, nprobe=DEFAULT_NPROBE, rerank=DEFAULT_RERANK):
+        """
+        Find the vectors most similar to a query.
+
+        Args:
+            query (ndarray): (d,) query vector
+            top_k (int): Number of results
+            nprobe (int): Inverted lists scanned; more lists raise recall and latency
+            rerank (int): Best approximate candidates re-scored exactly (0 to skip)
+
+        Returns:
+            list: {"doc", "id", "score"} dicts, best first; scores are cosine
+                similarities (approximate when rerank is 0)
+        """
+        if top_k <= 0 or not len(self.codes):
+            return []
+        query = normalize_rows(query.reshape(-1))
+        order, offsets = self._inverted_lists()
+
+        coarse = self.centroids @ query
+        nprobe = min(max(1, nprobe), len(coarse))
+        probed = np.argpartition(-coarse, nprobe - 1)[:nprobe]
+        candidates = np.concatenate([order[offsets[number]:offsets[number + 1]] for number in probed])
+        if self._removed.any():
+            candidates = candidates[~self._removed[candidates]]
+        if not len(candidates):
+            return []
+
+        # One lookup table of query-subvector x codeword products serves every list
+        table = np.einsum("sd,skd->sk", query.reshape(self.subspaces, -1), self.codebooks)
+        codes = self.codes[candidates]
+        approximate = coarse[self.lists[candidates]] + table[np.arange(self.subspaces), codes].sum(axis=1)
+
+        keep = max(top_k, rerank)
+        if len(candidates) > keep:
+            best = np.argpartition(-approximate, keep - 1)[:keep]
+            candidates, approximate = candidates[best], approximate[best]
+
+        if rerank > 0:
+            scores = np.asarray(self.vectors[np.sort(candidates)] @ query)
+            candidates = np.sort(candidates)
+        else:
+            scores = approximate
+
+        ranked = np.lexsort((candidates, -scores))[:top_k]
+        return [
+            {"doc": self.documents[int(self.keys[candidate, 0])], "id": int(self.keys[candidate, 1]),
+             "score": round(float(score), 4)}
+            for candidate, score in zip(candidates[ranked], scores[ranked])
+        ]
+
+    def save(self, index_dir):
+        """
+        Write the whole index as .npy files plus meta.json, replacing index_dir.
+
+        Superseded rows are dropped and vectors are written grouped by inverted list,
+        so each list is one contiguous run of the mapped files. The new files are
+        written to a sibling directory first, so readers never see a half-written index.
+        """
+        order, _ = self._inverted_lists()
+        order = order[~self._removed[order]]
+        staging = staging_directory(index_dir)
+
+        self.codes = np.asarray(self.codes)[order]
+        self.lists = np.asarray(self.lists)[order]
+        self.keys = np.asarray(self.keys)[order]
+        self.vectors = np.asarray(self.vectors)[order]
+        np.save(staging / "centroids.npy", self.centroids)
+        np.save(staging / "codebooks.npy", self.codebooks)
+        np.save(staging / "codes.npy", self.codes)
+        np.save(staging / "lists.npy", self.lists)
+        np.save(staging / "keys.npy", self.keys)
+        np.save(staging / "vectors.npy", self.vectors)
+        self.parts = []
+        self._write_meta(staging, len(self.keys))
+        publish_directory(staging, index_dir)
+
+        self._removed = np.zeros(len(self.keys), dtype=bool)
+        self._saved_rows = len(self.keys)
+        self._order = np.arange(len(self.lists), dtype=np.int64)
+        self._offsets = np.searchsorted(self.lists, np.arange(len(self.centroids) + 1))
+
+    def save_added(self, index_dir):
+        """
+        Persist rows added since the index was loaded or saved as one part directory.
+
+        Only the new rows and the list of superseded row numbers are written, then
+        meta.json is replaced to publish the part. Once the parts hold more than
+        COMPACT_FRACTION of the base rows, or there are MAX_PARTS of them, the whole
+        index is rewritten with save() instead.
+
+        Returns:
+            bool: True if the index was compacted
+        """
+        index_dir = Path(index_dir)
+        base_rows = self._saved_rows - sum(part["rows"] for part in self.parts)
+        pending = len(self.keys) - self._saved_rows
+        if not (index_dir / "meta.json").exists() or len(self.parts) + 1 > MAX_PARTS \
+                or len(self.keys) - base_rows > COMPACT_FRACTION * max(base_rows, 1):
+            self.save(index_dir)
+            return True
+        if not pending and not self._removed.any():
+            return False
+
+        name = f"part-{len(self.parts) + 1:06d}"
+        staging = staging_directory(index_dir / name)
+        np.save(staging / "codes.npy", np.asarray(self.codes[np.arange(self._saved_rows, len(self.keys))]))
+        np.save(staging / "lists.npy", np.asarray(self.lists[self._saved_rows:]))
+        np.save(staging / "keys.npy", np.asarray(self.keys[self._saved_rows:]))
+        np.save(staging / "vectors.npy", np.asarray(self.vectors[np.arange(self._saved_rows, len(self.keys))]))
+        np.save(staging / "removed.npy", np.flatnonzero(self._removed))
+        publish_directory(staging, index_dir / name)
+
+        self.parts.append({"name": name, "rows": pending})
+        self._saved_rows = len(self.keys)
+        meta = index_dir / "meta.json.tmp"
+        self._write_meta(index_dir, base_rows, meta)
+        os.replace(meta, index_dir / "meta.json")
+        return False
+
+    def _write_meta(self, directory, base_rows, path=None):
+        (path or Path(directory) / "meta.json").write_text(json.dumps({
+            "version": INDEX_VERSION,
+            "dimensions": self.dimensions,
+            "lists": len(self.centroids),
+            "subspaces": self.subspaces,
+            "count": base_rows,
+            "documents": self.documents,
+            "parts": self.parts
+        }), encoding="utf-8")
+
+    @classmethod
+    def load(cls, index_dir):
+        """Open a saved index and its parts; codes, keys and vectors are memory-mapped."""
+        index_dir = Path(index_dir)
+        meta = json.loads((index_dir / "meta.json").read_text(encoding="utf-8"))
+        if meta.get("version") != INDEX_VERSION:
+            raise ValueError(f"Unsupported ANN index version: {meta.get('version')}")
+        index = cls(np.load(index_dir / "centroids.npy"), np.load(index_dir / "codebooks.npy"), meta["documents"])
+        index.codes = np.load(index_dir / "codes.npy", mmap_mode="r")
+        index.lists = np.load(index_dir / "lists.npy")
+        index.keys = np.load(index_dir / "keys.npy", mmap_mode="r")
+        index.vectors = np.load(index_dir / "vectors.npy", mmap_mode="r")
+        index.parts = meta.get("parts", [])
+        if index.parts:
+            directories = [index_dir / part["name"] for part in index.parts]
+            index.codes = RowBlocks.join(index.codes, *(np.load(path / "codes.npy", mmap_mode="r") for path in directories))
+            index.vectors = RowBlocks.join(index.vectors, *(np.load(path / "vectors.npy", mmap_mode="r") for path in directories))
+            index.lists = np.concatenate([index.lists, *(np.load(path / "lists.npy") for path in directories)])
+            index.keys = np.concatenate([index.keys, *(np.load(path / "keys.npy") for path in directories)])
+        index._removed = np.zeros(len(index.keys), dtype=bool)
+        index._saved_rows = len(index.keys)
+        if index.parts:
+            index._removed[np.load(index_dir / index.parts[-1]["name"] / "removed.npy")] = True
+        else:
+            # Saved grouped by list, so the grouping is the identity permutation
+            index._order = np.arange(len(index.lists), dtype=np.int64)
+            index._offsets = np.searchsorted(index.lists, np.arange(len(index.centroids) + 1))
+        return index
+
+def exact_search(vectors, query, top_k):
+    """Brute-force cosine top-k over normalized vectors, for measuring recall."""
+    scores = np.asarray(vectors @ normalize_rows(query.reshape(-1)))
+    best = np.argpartition(-scores, min(top_k, len(scores)) - 1)[:top_k]
+    return best[np.argsort(-scores[best], kind="stable")]
+
+def benchmark(index, queries, top_k, settings):
+    """
+    Measure recall@k against an exact scan and per-query latency.
+
+    Args:
+        index (IVFPQIndex): Loaded index
+        queries (ndarray): (q, d) query vectors
+        top_k (int): k for recall
+        settings (list): (nprobe, rerank) pairs to measure
+
+    Returns:
+        list: One dict per setting with recall and latency percentiles
+    """
+    live = np.flatnonzero(~index._removed)
+    keys = np.asarray(index.keys)[live]
+    vectors = index.vectors if len(live) == len(index.keys) else index.vectors[live]
+    truth = [
+        {tuple(keys[number]) for number in exact_search(vectors, query, top_k)}
+        for query in queries
+    ]
+    reports = []
+    for nprobe, rerank in settings:
+        latencies = []
+        hits = 0
+        for query, expected in zip(queries, truth):
+            start = time.perf_counter()
+            results = index.search(query, top_k, nprobe, rerank)
+            latencies.append(time.perf_counter() - start)
+            found = {(index._document_numbers[result["doc"]], result["id"]) for result in results}
+            hits += len(found & expected)
+        latencies.sort()
+        reports.append({
+            "nprobe": nprobe,
+            "rerank": rerank,
+            "recallAtK": round(hits / (len(queries) * top_k), 4),
+            "p50Ms": round(latencies[len(latencies) // 2] * 1000, 3),
+            "p95Ms": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000, 3)
+        })
+    return reports
+
+def parse_query_vector(args, dimensions):
+    """Build the query vector from --vector (JSON list) or --text (SQLite stand-in embedding)."""
+    if args.vector:
+        vector = np.asarray(json.loads(args.vector), dtype=np.float32)
+    else:
+        vector = np.frombuffer(stand_in_embedding(args.text), dtype=np.float32)
+    if vector.shape != (dimensions,):
+        raise ValueError(f"Query vector has {vector.size} dimensions, the index has {dimensions}")
+    return vector
+
+def main():
+    parser = argparse.ArgumentParser(description='Export segs embeddings and serve similarity queries from an IVF-PQ index')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    export_parser = subparsers.add_parser('export', help='Export segs vectors to a .npy file with a .keys.json sidecar')
+    export_parser.add_argument('embeddings', help='Output .npy file')
+    export_parser.add_argument('--doc', help='Only export this document (e.g. after reloading it)')
+    export_parser.add_argument('--min-id', type=int, help='Only export chunks with at least this id')
+    export_parser.add_argument('--backend', choices=['oracle', 'sqlite'], default='sqlite', help='Database holding segs')
+    export_parser.add_argument('--sqlite-path', default='temp/segs.db', help='SQLite stand-in database file')
+    export_parser.add_argument('--user', default=os.environ.get('ORACLE_USER'), help='Oracle user (default: $ORACLE_USER)')
+    export_parser.add_argument('--dsn', default=os.environ.get('ORACLE_DSN'), help='Oracle connect string (default: $ORACLE_DSN)')
+
+    build_parser = subparsers.add_parser('build', help='Train an index on exported embeddings and add them')
+    build_parser.add_argument('embeddings', help='Exported .npy file')
+    build_parser.add_argument('index_dir', help='Index directory to write')
+    build_parser.add_argument('--lists', type=int, default=None, help='Inverted lists (default: 4 * sqrt(n))')
+    build_parser.add_argument('--subspaces', type=int, default=None, help='PQ subspaces, dividing the dimensions (default: about d / 8)')
+    build_parser.add_argument('--iterations', type=int, default=DEFAULT_ITERATIONS, help='k-means iterations')
+    build_parser.add_argument('--train-sample', type=int, default=DEFAULT_TRAIN_SAMPLE, help='Vectors used for training')
+
+    add_parser = subparsers.add_parser('add', help='Add (or replace) exported chunks without retraining')
+    add_parser.add_argument('index_dir', help='Index directory')
+    add_parser.add_argument('embeddings', help='Exported .npy file with the new chunks')
+
+    query_parser = subparsers.add_parser('query', help='Return the chunks most similar to a vector')
+    query_parser.add_argument('index_dir', help='Index directory')
+    source = query_parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--vector', help='Query vector as a JSON list')
+    source.add_argument('--text', help='Query text, embedded with the SQLite stand-in model')
+
+    bench_parser = subparsers.add_parser('bench', help='Measure recall@k and latency against an exact scan')
+    bench_parser.add_argument('index_dir', help='Index directory')
+    bench_parser.add_argument('--queries', type=int, default=200, help='Indexed vectors (plus noise) used as queries')
+    bench_parser.add_argument('--nprobe-values', type=int, nargs='+', default=[1, 4, 8, 16, 32], help='nprobe settings to measure')
+
+    for subparser in (query_parser, bench_parser):
+        subparser.add_argument('--top-k', type=int, default=DEFAULT_TOP_K, help='Number of results')
+        subparser.add_argument('--rerank', type=int, default=DEFAULT_RERANK, help='Candidates re-scored exactly (0 to skip)')
+    query_parser.add_argument('--nprobe', type=int, default=DEFAULT_NPROBE, help='Inverted lists to scan')
+
+    args = parser.parse_args()
+
+    def fail(message):
+        print(json.dumps({"success": False, "error": message}))
+        sys.exit(1)
+
+    if args.command == "export":
+        try:
+            if args.backend == "oracle":
+                if not args.user or not args.dsn:
+                    fail("Oracle backend needs --user/--dsn (or ORACLE_USER/ORACLE_DSN) and ORACLE_PASSWORD")
+                connection = connect_oracle(args.user, args.dsn, os.environ.get('ORACLE_PASSWORD'))
+            else:
+                connection = connect_sqlite(args.sqlite_path)
+        except ImportError:
+            fail("python-oracledb not installed. Please run: pip install oracledb")
+        except Exception as e:
+            fail(f"Could not connect to {args.backend}: {str(e)}")
+        try:
+            result = export_embeddings(connection, args.backend, args.embeddings, args.doc, args.min_id)
+        except Exception as e:
+            fail(f"Export failed: {str(e)}")
+        finally:
+            connection.close()
+        print(json.dumps({"success": True, **result}, indent=2))
+        return
+
+    if args.command in ("build", "add"):
+        start = time.perf_counter()
+        try:
+            vectors, documents, keys = load_embeddings(args.embeddings)
+        except (OSError, ValueError, KeyError) as e:
+            fail(f"Could not read embeddings: {str(e)}")
+        try:
+            if args.command == "build":
+                index = IVFPQIndex.train(vectors, args.lists, args.subspaces, args.iterations, args.train_sample)
+                added, replaced = index.add(vectors, documents, keys)
+                index.save(args.index_dir)
+                compacted = True
+            else:
+                index = IVFPQIndex.load(args.index_dir)
+                added, replaced = index.add(vectors, documents, keys)
+                compacted = index.save_added(args.index_dir)
+        except (OSError, ValueError) as e:
+            fail(f"Could not {args.command} index: {str(e)}")
+        print(json.dumps({
+            "success": True,
+            "indexDir": args.index_dir,
+            "added": added,
+            "replaced": replaced,
+            "count": index.count,
+            "parts": len(index.parts),
+            "compacted": compacted,
+            "lists": len(index.centroids),
+            "subspaces": index.subspaces,
+            "seconds": round(time.perf_counter() - start, 3)
+        }, indent=2))
+        return
+
+    try:
+        start = time.perf_counter()
+        index = IVFPQIndex.load(args.index_dir)
+        loaded = time.perf_counter()
+    except (OSError, ValueError, KeyError) as e:
+        fail(f"Could not open index: {str(e)}")
+
+    if args.command == "query":
+        try:
+            query = parse_query_vector(args, index.dimensions)
+        except ValueError as e:
+            fail(str(e))
+        searched = time.perf_counter()
+        results = index.search(query, args.top_k, args.nprobe, args.rerank)
+        print(json.dumps({
+            "success": True,
+            "results": results,
+            "loadMs": round((loaded - start) * 1000, 3),
+            "queryMs": round((time.perf_counter() - searched) * 1000, 3)
+        }, indent=2))
+        return
+
+    rng = np.random.default_rng(1)
+    sample = rng.choice(len(index.codes), min(args.queries, len(index.codes)), replace=False)
+    queries = np.asarray(index.vectors[np.sort(sample)])
+    # Perturb each query by about 10% of its length so it is not an exact match
+    queries = queries + rng.normal(0, 0.1 / np.sqrt(index.dimensions), queries.shape).astype(np.float32)
+    settings = [(nprobe, args.rerank) for nprobe in args.nprobe_values]
+    print(json.dumps({
+        "success": True,
+        "count": index.count,
+        "queries": len(queries),
+        "topK": args.top_k,
+        "settings": benchmark(index, queries, args.top_k, settings)
+    }, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Text Normalization Benchmark
+Compares normalize_text() in text_normalize.py against the per-line loops the PDF,
+Word and PowerPoint processors used before, on multi-megabyte synthetic text, and
+checks that the whitespace handling produces identical output.
+"""
+
+import re
+import json
+import time
+import random
+import argparse
+import statistics
+
+from text_normalize import normalize_text
+from synthetic_corpus import sentence, paragraph
+
+def legacy_normalize_pdf(text):
+    """Previous pdf_processor.py loop: strip every line and drop blank ones."""
+    cleaned_text = text.strip()
+    if cleaned_text:
+        cleaned_text = '\n'.join(line.strip() for line in cleaned_text.split('\n') if line.strip())
+    return cleaned_text
+
+def legacy_normalize_docx(text):
+    """Previous docx_processor.py / pptx_processor.py loop: keep one blank line between blocks."""
+    cleaned_text = text.strip()
+    if cleaned_text:
+        lines = []
+        for line in cleaned_text.split('\n'):
+            cleaned_line = line.strip()
+            if cleaned_line or (lines and lines[-1]):
+                lines.append(cleaned_line)
+        cleaned_text = '\n'.join(lines)
+    return cleaned_text
+
+# Whole-buffer regexes, kept to show why normalize_text() does not use them for
+# whitespace: patterns led by a character class are tried at every offset
+REGEX_LINE_BREAK = re.compile(r"[^\S\n]*\n[^\S\n]*")
+REGEX_BLANK_RUN = re.compile(r"\n{3,}")
+
+def regex_normalize_pdf(text):
+    return re.sub(r"\n+", "\n", REGEX_LINE_BREAK.sub("\n", text)).strip()
+
+def regex_normalize_docx(text):
+    return REGEX_BLANK_RUN.sub("\n\n", REGEX_LINE_BREAK.sub("\n", text)).strip()
+
+def build_pdf_text(megabytes, seed=0, fixups=False):
+    """Page-marker text shaped like pdf_processor.py output before normalization."""
+    rng = random.Random(seed)
+    parts = []
+    size = 0
+    page = 0
+    while size < megabytes * 1024 * 1024:
+        page += 1
+        lines = [f"  {sentence(rng, rng.randint(8, 14))}  " for _ in range(40)]
+        if fixups:
+            lines[5] += " eﬃcient work-"
+            lines[6] = "ﬂow continues here"
+            lines[10] += " a well-"
+            lines[11] = "known result"
+        part = f"\n--- Page {page} ---\n" + "\n".join(lines) + "\n \n"
+        parts.append(part)
+        size += len(part)
+    return "".join(parts)
+
+def build_docx_text(megabytes, seed=0):
+    """Paragraph and table text shaped like docx_processor.py output before normalization."""
+    rng = random.Random(seed)
+    parts = []
+    size = 0
+    block = 0
+    while size < megabytes * 1024 * 1024:
+        block += 1
+        if block % 20 == 0:
+            rows = "\n".join(f"{rng.choice('abc')} | {rng.randint(1, 99)} | {sentence(rng, 4)}" for _ in range(5))
+            part = f"\n--- Table {block // 20} ---\n{rows}\n\n"
+        else:
+            part = f"{paragraph(rng, rng.randint(2, 5))} \n\n"
+        parts.append(part)
+        size += len(part)
+    return "".join(parts)
+
+def interleaved_times(functions, text, repeat):
+    """
+    Time functions in rotating order, so load changes during the run affect them all alike.
+
+    Returns:
+        tuple: (median wall time in seconds per function, result per function)
+    """
+    times = [[] for _ in functions]
+    results = [None] * len(functions)
+    for round_number in range(repeat):
+        for offset in range(len(functions)):
+            number = (round_number + offset) % len(functions)
+            start = time.perf_counter()
+            results[number] = functions[number](text)
+            times[number].append(time.perf_counter() - start)
+    return [statistics.median(samples) for samples in times], results
+
+def compare(text, legacy, regex, shared, repeat):
+    (legacy_time, regex_time, shared_time), (legacy_result, regex_result, shared_result) = \
+        interleaved_times([legacy, regex, shared], text, repeat)
+    return {
+        "megabytes": round(len(text) / (1024 * 1024), 2),
+        "legacySeconds": round(legacy_time, 4),
+        "wholeBufferRegexSeconds": round(regex_time, 4),
+        "sharedSeconds": round(shared_time, 4),
+        "speedup": round(legacy_time / shared_time, 2) if shared_time else None,
+        "identical": legacy_result == shared_result == regex_result
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark shared text normalization against the previous per-processor loops')
+    parser.add_argument('--megabytes', type=float, default=8, help='Size of each synthetic text')
+    parser.add_argument('--repeat', type=int, default=15, help='Timed repetitions (the median is reported)')
+
+    args = parser.parse_args()
+
+    pdf_text = build_pdf_text(args.megabytes)
+    docx_text = build_docx_text(args.megabytes)
+    fixup_text = build_pdf_text(args.megabytes, fixups=True)
+
+    (legacy_fixup_time, fixup_time), (_, fixed) = interleaved_times(
+        [legacy_normalize_pdf, lambda text: normalize_text(text, dehyphenate=True)], fixup_text, args.repeat)
+
+    print(json.dumps({
+        "success": True,
+        "pdf": compare(pdf_text, legacy_normalize_pdf, regex_normalize_pdf,
+                       lambda text: normalize_text(text, dehyphenate=True), args.repeat),
+        "docxPptx": compare(docx_text, legacy_normalize_docx, regex_normalize_docx,
+                            lambda text: normalize_text(text, keep_blank_lines=True), args.repeat),
+        "pdfWithLigaturesAndHyphenation": {
+            "megabytes": round(len(fixup_text) / (1024 * 1024), 2),
+            "legacySeconds": round(legacy_fixup_time, 4),
+            "sharedSeconds": round(fixup_time, 4),
+            "ligaturesRemaining": sum(fixed.count(character) for character in "ﬀﬁﬂﬃﬄ"),
+            "hyphenatedBreaksRemaining": fixed.count("work-\n"),
+            "compoundHyphensKept": fixed.count("well-known")
+        }
+    }, indent=2))
+
+if __name__ == "__main__":
+    main()
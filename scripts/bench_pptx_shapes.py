@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+PowerPoint Shape Text Extraction Benchmark
+Compares the single-pass extract_text_from_shape() in pptx_processor.py against the
+previous multi-method extractor on a synthetic text-heavy deck.
+"""
+
+import sys
+import io
+import json
+import time
+import argparse
+import contextlib
+
+try:
+    from pptx import Presentation
+    from pptx.util import Inches
+except ImportError:
+    print(json.dumps({
+        "success": False,
+        "error": "python-pptx not installed. Please run: pip install python-pptx"
+    }))
+    sys.exit(1)
+
+from pptx_processor import extract_text_from_shape
+
+def legacy_extract_text_from_shape(shape):
+    """
+    Previous extractor: seven overlapping methods deduplicated with substring scans.
+    Kept here (without its stderr output) as the benchmark baseline.
+    """
+    text_content = ""
+
+    try:
+        if hasattr(shape, "text") and shape.text.strip():
+            text_content += shape.text.strip() + "\n"
+
+        if hasattr(shape, "text_frame") and shape.text_frame:
+            if hasattr(shape.text_frame, "text") and shape.text_frame.text.strip():
+                frame_text = shape.text_frame.text.strip()
+                if frame_text not in text_content:
+                    text_content += frame_text + "\n"
+
+            if hasattr(shape.text_frame, "paragraphs"):
+                for para in shape.text_frame.paragraphs:
+                    if hasattr(para, "text") and para.text.strip():
+                        para_text = para.text.strip()
+                        if para_text not in text_content:
+                            text_content += para_text + "\n"
+
+                    if hasattr(para, "runs"):
+                        for run in para.runs:
+                            if hasattr(run, "text") and run.text.strip():
+                                run_text = run.text.strip()
+                                if run_text not in text_content:
+                                    text_content += run_text + "\n"
+
+        if hasattr(shape, "table"):
+            for row in shape.table.rows:
+                row_text = ""
+                for cell in row.cells:
+                    if hasattr(cell, "text") and cell.text.strip():
+                        row_text += cell.text.strip() + "\t"
+                    if hasattr(cell, "text_frame") and cell.text_frame:
+                        if hasattr(cell.text_frame, "text") and cell.text_frame.text.strip():
+                            cell_frame_text = cell.text_frame.text.strip()
+                            if cell_frame_text not in row_text:
+                                row_text += cell_frame_text + "\t"
+                if row_text.strip():
+                    text_content += row_text.strip() + "\n"
+
+        if hasattr(shape, "shapes"):
+            for sub_shape in shape.shapes:
+                sub_text = legacy_extract_text_from_shape(sub_shape)
+                if sub_text and sub_text not in text_content:
+                    text_content += sub_text
+
+    except Exception:
+        pass
+
+    return text_content
+
+def build_text_heavy_deck(slides, boxes, paragraphs, runs):
+    """
+    Build an in-memory deck where every slide has several multi-paragraph text
+    boxes, a table and a group of text boxes.
+
+    Returns:
+        Presentation: The generated presentation
+    """
+    presentation = Presentation()
+    layout = presentation.slide_layouts[6]  # Blank
+
+    for slide_number in range(slides):
+        slide = presentation.slides.add_slide(layout)
+
+        for box_number in range(boxes):
+            box = slide.shapes.add_textbox(Inches(0.2), Inches(0.2 + box_number * 0.5), Inches(4), Inches(0.5))
+            frame = box.text_frame
+            for para_number in range(paragraphs):
+                para = frame.paragraphs[0] if para_number == 0 else frame.add_paragraph()
+                for run_number in range(runs):
+                    run = para.add_run()
+                    run.text = (f"Slide {slide_number} box {box_number} line {para_number} "
+                                f"segment {run_number} of the training material. ")
+
+        table = slide.shapes.add_table(8, 4, Inches(5), Inches(0.2), Inches(4), Inches(3)).table
+        for row_number in range(8):
+            for col_number in range(4):
+                table.cell(row_number, col_number).text = f"Cell {slide_number}-{row_number}-{col_number}"
+
+        group = slide.shapes.add_group_shape()
+        for member in range(3):
+            member_box = group.shapes.add_textbox(Inches(5), Inches(4 + member * 0.4), Inches(3), Inches(0.4))
+            member_box.text_frame.text = f"Grouped note {member}: see appendix"  # Repeated across slides
+
+    buffer = io.BytesIO()
+    presentation.save(buffer)
+    buffer.seek(0)
+    return Presentation(buffer)
+
+def time_extractor(presentation, extractor, repeat):
+    """Return the best wall time in seconds and the extracted character count."""
+    best = None
+    characters = 0
+    for _ in range(repeat):
+        with open('/dev/null', 'w') as devnull, contextlib.redirect_stderr(devnull):
+            start = time.perf_counter()
+            characters = 0
+            for slide in presentation.slides:
+                for shape in slide.shapes:
+                    characters += len(extractor(shape))
+            elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, characters
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark PowerPoint shape text extraction')
+    parser.add_argument('--slides', type=int, default=40, help='Number of slides in the synthetic deck')
+    parser.add_argument('--boxes', type=int, default=4, help='Text boxes per slide')
+    parser.add_argument('--paragraphs', type=int, default=15, help='Paragraphs per text box')
+    parser.add_argument('--runs', type=int, default=3, help='Runs per paragraph')
+    parser.add_argument('--repeat', type=int, default=3, help='Timed repetitions (best is reported)')
+
+    args = parser.parse_args()
+
+    presentation = build_text_heavy_deck(args.slides, args.boxes, args.paragraphs, args.runs)
+
+    legacy_time, legacy_chars = time_extractor(presentation, legacy_extract_text_from_shape, args.repeat)
+    current_time, current_chars = time_extractor(presentation, extract_text_from_shape, args.repeat)
+
+    print(json.dumps({
+        "success": True,
+        "deck": {
+            "slides": args.slides,
+            "boxesPerSlide": args.boxes,
+            "paragraphsPerBox": args.paragraphs,
+            "runsPerParagraph": args.runs
+        },
+        "legacy": {"seconds": round(legacy_time, 4), "characters": legacy_chars},
+        "singlePass": {"seconds": round(current_time, 4), "characters": current_chars},
+        "speedup": round(legacy_time / current_time, 2) if current_time else None
+    }, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Document Pipeline Benchmark Suite
+Runs the document processors and chunk_text over a synthetic corpus (see
+synthetic_corpus.py) and reports throughput, p50/p95 latency and peak RSS per
+document type and size bucket. With --stream the single-process ingestion pipeline
+is measured instead, showing the memory profile of block-by-block extraction. Results can be saved as a baseline and later runs
+checked against it with a regression threshold. Everything runs offline.
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from processor_metrics import peak_rss_mb
+from synthetic_corpus import SIZE_BUCKETS, GENERATORS, generate_corpus
+
+# Metrics compared against the baseline; higher values are worse for all of them
+REGRESSION_METRICS = [
+    ("extract", "p50Ms"),
+    ("extract", "p95Ms"),
+    ("chunk", "p50Ms"),
+    ("memory", "peakRssMB")
+]
+
+def percentile(values, fraction):
+    """Linearly interpolated percentile of a list of numbers."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * fraction
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+def summarize_latencies(seconds):
+    """Return p50/p95/mean in milliseconds for a list of durations in seconds."""
+    return {
+        "p50Ms": round(percentile(seconds, 0.50) * 1000, 3),
+        "p95Ms": round(percentile(seconds, 0.95) * 1000, 3),
+        "meanMs": round(sum(seconds) / len(seconds) * 1000, 3) if seconds else 0.0
+    }
+
+def load_extractor(document_type):
+    """Import the extractor for a document type."""
+    if document_type == "pdf":
+        from pdf_processor import extract_text_from_pdf
+        return lambda path: extract_text_from_pdf(path, max_pages=10 ** 6)
+    if document_type == "docx":
+        from docx_processor import extract_text_from_docx
+        return extract_text_from_docx
+    if document_type == "pptx":
+        from pptx_processor import extract_text_from_pptx
+        return lambda path: extract_text_from_pptx(path, workers=1)
+    if document_type == "xlsx":
+        from xlsx_processor import extract_text_from_xlsx
+        return extract_text_from_xlsx
+    if document_type == "csv":
+        from csv_processor import extract_text_from_csv
+        return extract_text_from_csv
+    if document_type == "html":
+        from html_processor import extract_text_from_html
+        return extract_text_from_html
+    from markdown_processor import extract_text_from_markdown
+    return extract_text_from_markdown
+
+def load_pipeline(document_type, chunk_size, overlap):
+    """
+    Return a function that extracts and chunks a file block by block without keeping
+    the text or the chunks, so peak RSS reflects the streaming path.
+    """
+    from ingest_pipeline import iter_document_chunks
+
+    def run(path):
+        characters = 0
+        chunks = 0
+        for chunk in iter_document_chunks(path, document_type, chunk_size, overlap, max_pages=10 ** 6, workers=1):
+            characters += chunk["charCount"]
+            chunks += 1
+        return {"success": True, "characters": characters, "chunks": chunks}
+
+    return run
+
+def run_case(document_type, bucket, path, iterations, chunk_size, overlap, stream=False):
+    """
+    Benchmark one corpus file. Runs in a fresh process so peak RSS is per case.
+
+    Returns:
+        dict: Latency, throughput and memory figures for the case
+    """
+    if stream:
+        # Extraction and chunking are interleaved, so they are timed together
+        extract = load_pipeline(document_type, chunk_size, overlap)
+        chunk_text = None
+    else:
+        extract = load_extractor(document_type)
+        from chunk_text import chunk_text, load_text_splitter_class
+        try:
+            # langchain is imported lazily on the first split, so check it up front
+            load_text_splitter_class()
+        except ImportError:
+            chunk_text = None  # langchain not installed; chunking is reported as skipped
+
+    extract_seconds = []
+    chunk_seconds = []
+    result = {}
+    chunks = []
+
+    for _ in range(iterations):
+        start = time.perf_counter()
+        result = extract(path)
+        extract_seconds.append(time.perf_counter() - start)
+        if not result.get("success"):
+            return {"type": document_type, "bucket": bucket, "success": False, "error": result.get("error")}
+
+        if chunk_text is not None:
+            start = time.perf_counter()
+            chunks = chunk_text(result["text"], chunk_size, overlap)
+            chunk_seconds.append(time.perf_counter() - start)
+
+    document_bytes = os.path.getsize(path)
+    units = (result.get("pageCount") or result.get("slideCount") or result.get("paragraphCount")
+             or result.get("rowCount") or result.get("blockCount") or result.get("chunks") or 0)
+    median_seconds = percentile(extract_seconds, 0.50) or 1e-9
+
+    return {
+        "type": document_type,
+        "bucket": bucket,
+        "success": True,
+        "documentBytes": document_bytes,
+        "units": units,
+        "characters": result["characters"] if stream else len(result["text"]),
+        "iterations": iterations,
+        "mode": "stream" if stream else "extract",
+        "extract": {
+            **summarize_latencies(extract_seconds),
+            "throughputMBps": round(document_bytes / median_seconds / (1024 * 1024), 3),
+            "unitsPerSecond": round(units / median_seconds, 2)
+        },
+        "chunk": {**summarize_latencies(chunk_seconds), "chunks": len(chunks)} if chunk_seconds else {"skipped": True},
+        "memory": {"peakRssMB": round(peak_rss_mb(), 2)}
+    }
+
+def run_suite(corpus_dir, buckets, types, iterations, chunk_size=1000, overlap=200, seed=0, stream=False):
+    """
+    Generate (or reuse) the corpus and benchmark every type/bucket pair.
+
+    Returns:
+        dict: Results keyed by "type/bucket"
+    """
+    files = generate_corpus(corpus_dir, buckets, types, seed)
+    context = multiprocessing.get_context("spawn")
+    results = {}
+
+    for entry in files:
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+            case = executor.submit(run_case, entry["type"], entry["bucket"], entry["path"],
+                                   iterations, chunk_size, overlap, stream).result()
+        results[f"{entry['type']}/{entry['bucket']}"] = case
+        print(f"{entry['type']}/{entry['bucket']}: "
+              f"p50 {case.get('extract', {}).get('p50Ms')} ms, "
+              f"peak RSS {case.get('memory', {}).get('peakRssMB')} MB", file=sys.stderr)
+
+    return results
+
+def find_regressions(results, baseline, threshold):
+    """
+    Compare results to a baseline.
+
+    Args:
+        results (dict): Current results keyed by "type/bucket"
+        baseline (dict): Baseline results in the same shape
+        threshold (float): Allowed relative increase, e.g. 0.2 for +20%
+
+    Returns:
+        list: One dict per metric that got worse by more than the threshold
+    """
+    regressions = []
+    for key, current in results.items():
+        previous = baseline.get(key)
+        if not previous or not current.get("success") or not previous.get("success"):
+            continue
+        for section, metric in REGRESSION_METRICS:
+            before = previous.get(section, {}).get(metric)
+            after = current.get(section, {}).get(metric)
+            if before and after is not None and after > before * (1 + threshold):
+                regressions.append({
+                    "case": key,
+                    "metric": f"{section}.{metric}",
+                    "baseline": before,
+                    "current": after,
+                    "change": round(after / before - 1, 3)
+                })
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the document processors and chunker on a synthetic corpus')
+    parser.add_argument('--corpus-dir', default='temp/benchmark-corpus', help='Where the synthetic corpus is generated and reused')
+    parser.add_argument('--buckets', nargs='+', choices=list(SIZE_BUCKETS), help='Size buckets (default: all)')
+    parser.add_argument('--types', nargs='+', choices=list(GENERATORS), help='Document types (default: all)')
+    parser.add_argument('--iterations', type=int, default=5, help='Timed runs per case')
+    parser.add_argument('--chunk-size', type=int, default=1000, help='Chunk size passed to chunk_text')
+    parser.add_argument('--overlap', type=int, default=200, help='Overlap passed to chunk_text')
+    parser.add_argument('--seed', type=int, default=0, help='Corpus seed')
+    parser.add_argument('--stream', action='store_true', help='Measure the streaming extract-and-chunk pipeline instead of the processors')
+    parser.add_argument('--save-baseline', help='Write the results to this baseline file')
+    parser.add_argument('--baseline', help='Compare against this baseline file')
+    parser.add_argument('--threshold', type=float, default=0.2, help='Allowed relative slowdown before failing (default: 0.2)')
+
+    args = parser.parse_args()
+
+    results = run_suite(args.corpus_dir, args.buckets, args.types, args.iterations,
+                        args.chunk_size, args.overlap, args.seed, args.stream)
+
+    report = {"success": True, "results": results}
+
+    if args.save_baseline:
+        Path(args.save_baseline).write_text(json.dumps({"results": results}, indent=2))
+        report["baselineSaved"] = args.save_baseline
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text())["results"]
+        regressions = find_regressions(results, baseline, args.threshold)
+        report["regressions"] = regressions
+        report["success"] = not regressions
+
+    print(json.dumps(report, indent=2))
+    if not report["success"]:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,431 @@
+#!/usr/bin/env python3
+"""
+BM25 Lexical Index over Chunked Documents
+Builds an inverted index from chunk_text.py / ingest_pipeline.py chunks and answers
+keyword and ID queries with BM25 scores, returning the (doc, id) keys of segs rows so
+keyword-heavy queries can be answered or pre-filtered without a vector scan. Postings
+are packed into typed arrays in one file that queries read through mmap.
+"""
+
+import os
+import re
+import sys
+import json
+import mmap
+import math
+import time
+import array
+import heapq
+import bisect
+import argparse
+from pathlib import Path
+from collections import Counter
+
+from segs_loader import segment_rows
+from processor_output import read_chunks
+
+# NumPy (optional) scores multi-term queries with vectorized adds over the mapped
+# postings; without it the postings are accumulated in a dict
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+INDEX_MAGIC = b"BM25RPI1"
+INDEX_VERSION = 1
+
+DEFAULT_K1 = 1.2
+DEFAULT_B = 0.75
+DEFAULT_TOP_K = 10
+
+# Words joined by - _ . / : are indexed both as one token ("inv-2024-001") and as
+# their parts, so ID lookups match exactly and still match on any component
+WORD_PATTERN = re.compile(r"[^\W_]+")
+TOKEN_PATTERN = re.compile(r"[^\W_]+(?:[-_./:][^\W_]+)*")
+
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or that the to "
+    "was were will with this these those not but if then than so".split()
+)
+
+# Typed sections stored after the header: name -> array typecode
+SECTIONS = {
+    "termOffsets": "I",
+    "termBytes": "B",
+    "postingOffsets": "I",
+    "postingChunks": "I",
+    "postingImpacts": "f",
+    "chunkDocs": "I",
+    "chunkIds": "I"
+}
+
+def tokenize(text):
+    """
+    Split text into lowercase index terms.
+
+    Args:
+        text (str): Chunk or query text
+
+    Returns:
+        list: Words, then compound tokens
+    """
+    text = text.lower()
+    terms = [word for word in WORD_PATTERN.findall(text) if word not in STOPWORDS]
+    terms.extend(token for token in TOKEN_PATTERN.findall(text) if not token.isalnum())
+    return terms
+
+def bm25_impacts(postings, lengths, k1=DEFAULT_K1, b=DEFAULT_B):
+    """
+    Turn term frequencies into per-posting BM25 term weights.
+
+    Document lengths and IDF are fixed once the index is built, so each posting's
+    contribution to a score is computed here and queries only add them up.
+
+    Args:
+        postings (dict): term -> {chunk index: term frequency}
+        lengths (list): Token count per chunk
+        k1 (float): Term frequency saturation
+        b (float): Length normalization
+
+    Returns:
+        dict: term -> (chunk indexes, impacts), highest impact first
+    """
+    chunk_count = len(lengths)
+    average_length = (sum(lengths) / chunk_count) if chunk_count else 0.0
+    norms = [k1 * (1 - b + b * length / average_length) if average_length else k1 for length in lengths]
+
+    impacts = {}
+    for term, frequencies in postings.items():
+        df = len(frequencies)
+        idf = math.log(1 + (chunk_count - df + 0.5) / (df + 0.5))
+        # Negated so a plain tuple sort gives highest impact first, ties by chunk
+        weighted = sorted([(-idf * tf * (k1 + 1) / (tf + norms[chunk]), chunk) for chunk, tf in frequencies.items()])
+        impacts[term] = ([chunk for _, chunk in weighted], [-impact for impact, _ in weighted])
+    return impacts
+
+def build_index(rows, index_path, k1=DEFAULT_K1, b=DEFAULT_B):
+    """
+    Build and write a BM25 index.
+
+    Args:
+        rows (list): segs rows ({"id", "seg", "doc"}) as built by segs_loader.segment_rows
+        index_path (str): Output file (replaced atomically)
+        k1 (float): BM25 k1
+        b (float): BM25 b
+
+    Returns:
+        dict: Counts and the index size in bytes
+    """
+    documents = []
+    document_numbers = {}
+    chunk_docs = array.array("I")
+    chunk_ids = array.array("I")
+    lengths = []
+    postings = {}
+
+    for chunk, row in enumerate(rows):
+        if row["doc"] not in document_numbers:
+            document_numbers[row["doc"]] = len(documents)
+            documents.append(row["doc"])
+        chunk_docs.append(document_numbers[row["doc"]])
+        chunk_ids.append(row["id"])
+
+        terms = tokenize(row["seg"])
+        lengths.append(len(terms))
+        for term, frequency in Counter(terms).items():
+            postings.setdefault(term, {})[chunk] = frequency
+
+    impacts = bm25_impacts(postings, lengths, k1, b)
+
+    terms = sorted(impacts)
+    term_offsets = array.array("I", [0])
+    term_bytes = bytearray()
+    posting_offsets = array.array("I", [0])
+    posting_chunks = array.array("I")
+    posting_impacts = array.array("f")
+    for term in terms:
+        term_bytes += term.encode("utf-8")
+        term_offsets.append(len(term_bytes))
+        chunks, weights = impacts[term]
+        posting_chunks.extend(chunks)
+        posting_impacts.extend(weights)
+        posting_offsets.append(len(posting_chunks))
+
+    sections = {
+        "termOffsets": term_offsets.tobytes(),
+        "termBytes": bytes(term_bytes),
+        "postingOffsets": posting_offsets.tobytes(),
+        "postingChunks": posting_chunks.tobytes(),
+        "postingImpacts": posting_impacts.tobytes(),
+        "chunkDocs": chunk_docs.tobytes(),
+        "chunkIds": chunk_ids.tobytes()
+    }
+    header = {
+        "version": INDEX_VERSION,
+        "byteorder": sys.byteorder,
+        "k1": k1,
+        "b": b,
+        "chunkCount": len(rows),
+        "termCount": len(terms),
+        "postingCount": len(posting_chunks),
+        "averageLength": (sum(lengths) / len(lengths)) if lengths else 0.0,
+        "documents": documents
+    }
+
+    write_index(index_path, header, sections)
+    return {
+        "documents": len(documents),
+        "chunkCount": header["chunkCount"],
+        "termCount": header["termCount"],
+        "postingCount": header["postingCount"],
+        "bytes": os.path.getsize(index_path)
+    }
+
+def align(size, boundary=8):
+    """Round size up to a multiple of boundary."""
+    return (size + boundary - 1) // boundary * boundary
+
+def write_index(index_path, header, sections):
+    """
+    Write the magic bytes, a JSON header with section offsets, and the sections.
+
+    Each section starts on an 8-byte boundary so it can be cast in place once mapped.
+    """
+    # The header records where each section starts, which depends on the header's own
+    # length; repeat the layout until the offsets stop changing
+    layout = {name: [0, 0] for name in sections}
+    while True:
+        header["sections"] = layout
+        encoded = json.dumps(header, separators=(",", ":")).encode("utf-8")
+        offset = align(len(INDEX_MAGIC) + 4 + len(encoded))
+        layout = {}
+        for name, data in sections.items():
+            layout[name] = [offset, len(data)]
+            offset = align(offset + len(data))
+        if layout == header["sections"]:
+            break
+
+    Path(index_path).parent.mkdir(parents=True, exist_ok=True)
+    temporary_path = f"{index_path}.tmp"
+    with open(temporary_path, "wb") as file:
+        file.write(INDEX_MAGIC)
+        file.write(len(encoded).to_bytes(4, "little"))
+        file.write(encoded)
+        for name, data in sections.items():
+            file.write(b"\0" * (header["sections"][name][0] - file.tell()))
+            file.write(data)
+    os.replace(temporary_path, index_path)
+
+class BM25Index:
+    """
+    Read-only BM25 index opened with mmap.
+
+    Nothing but the JSON header is parsed on open; terms are found by binary search
+    over the mapped term table and postings are read in place.
+    """
+
+    def __init__(self, index_path):
+        self._file = open(index_path, "rb")
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError(f"Empty index file: {index_path}")
+        self._view = memoryview(self._map)
+
+        if self._view[:len(INDEX_MAGIC)] != INDEX_MAGIC:
+            self.close()
+            raise ValueError(f"Not a BM25 index: {index_path}")
+        header_length = int.from_bytes(self._view[len(INDEX_MAGIC):len(INDEX_MAGIC) + 4], "little")
+        start = len(INDEX_MAGIC) + 4
+        self.header = json.loads(bytes(self._view[start:start + header_length]))
+        if self.header.get("version") != INDEX_VERSION or self.header.get("byteorder") != sys.byteorder:
+            self.close()
+            raise ValueError(f"Unsupported BM25 index version or byte order: {index_path}")
+
+        for name, typecode in SECTIONS.items():
+            offset, length = self.header["sections"][name]
+            section = self._view[offset:offset + length]
+            setattr(self, f"_{name}", section if typecode == "B" else section.cast(typecode))
+        self.documents = self.header["documents"]
+
+    def close(self):
+        """Release the mapped views, the mapping and the file."""
+        for name in SECTIONS:
+            view = self.__dict__.pop(f"_{name}", None)
+            if view is not None:
+                view.release()
+        if getattr(self, "_view", None) is not None:
+            self._view.release()
+            self._view = None
+        if getattr(self, "_map", None) is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _term(self, number):
+        return bytes(self._termBytes[self._termOffsets[number]:self._termOffsets[number + 1]])
+
+    def _find_term(self, term):
+        """Return the term number, or None if the term is not in the index."""
+        encoded = term.encode("utf-8")
+        terms = _TermTable(self)
+        number = bisect.bisect_left(terms, encoded)
+        if number < len(terms) and terms[number] == encoded:
+            return number
+        return None
+
+    def postings(self, term):
+        """
+        Postings for one (already tokenized) term.
+
+        Returns:
+            tuple: (chunk numbers, impacts) memoryviews, highest impact first; empty
+                if the term is not indexed
+        """
+        number = self._find_term(term)
+        if number is None:
+            return (), ()
+        start, end = self._postingOffsets[number], self._postingOffsets[number + 1]
+        return self._postingChunks[start:end], self._postingImpacts[start:end]
+
+    def chunk_key(self, chunk):
+        """Return the (doc, id) segs key of a chunk number."""
+        return self.documents[self._chunkDocs[chunk]], self._chunkIds[chunk]
+
+    def search(self, query, top_k=DEFAULT_TOP_K):
+        """
+        Score chunks against a query with BM25.
+
+        Args:
+            query (str): Query text, tokenized like the chunks
+            top_k (int): Number of results
+
+        Returns:
+            list: {"doc", "id", "score"} dicts, best first
+        """
+        matched = [self.postings(term) for term in dict.fromkeys(tokenize(query))]
+        matched = [(chunks, impacts) for chunks, impacts in matched if len(chunks)]
+        if not matched or top_k <= 0:
+            return []
+
+        if len(matched) == 1:
+            # Postings are stored highest impact first, so one term needs no scoring pass
+            chunks, impacts = matched[0]
+            best = list(zip(chunks[:top_k], impacts[:top_k]))
+        elif numpy is not None:
+            best = self._top_chunks_numpy(matched, top_k)
+        else:
+            scores = {}
+            get = scores.get
+            for chunks, impacts in matched:
+                for chunk, impact in zip(chunks, impacts):
+                    scores[chunk] = get(chunk, 0.0) + impact
+            best = heapq.nsmallest(top_k, scores.items(), key=lambda item: (-item[1], item[0]))
+
+        results = []
+        for chunk, score in best:
+            doc, chunk_id = self.chunk_key(chunk)
+            results.append({"doc": doc, "id": chunk_id, "score": round(score, 4)})
+        return results
+
+    def _top_chunks_numpy(self, matched, top_k):
+        """Sum impacts per chunk in a dense score array and select the top_k."""
+        scores = numpy.zeros(self.header["chunkCount"], dtype=numpy.float32)
+        for chunks, impacts in matched:
+            # A term lists each chunk once, so the fancy-indexed add has no duplicates
+            scores[numpy.frombuffer(chunks, dtype=numpy.uint32)] += numpy.frombuffer(impacts, dtype=numpy.float32)
+        candidates = numpy.flatnonzero(scores)
+        if len(candidates) > top_k:
+            candidates = candidates[numpy.argpartition(-scores[candidates], top_k - 1)[:top_k]]
+        order = numpy.lexsort((candidates, -scores[candidates]))
+        return [(int(chunk), float(scores[chunk])) for chunk in candidates[order]]
+
+class _TermTable:
+    """Sequence view of an index's sorted terms (as UTF-8 bytes) for bisect."""
+
+    def __init__(self, index):
+        self._index = index
+
+    def __len__(self):
+        return self._index.header["termCount"]
+
+    def __getitem__(self, number):
+        return self._index._term(number)
+
+def document_name(source, doc=None):
+    """segs.doc for a chunk file: --doc if given, else the file name minus a .json/.ndjson suffix."""
+    if doc:
+        return doc
+    path = Path(source)
+    return path.stem if path.suffix.lower() in (".json", ".ndjson", ".jsonl") else path.name
+
+def main():
+    parser = argparse.ArgumentParser(description='Build and query a BM25 keyword index over chunked documents')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    build_parser = subparsers.add_parser('build', help='Build an index from chunk files')
+    build_parser.add_argument('index_path', help='Index file to write')
+    build_parser.add_argument('chunks', nargs='+', help='chunk_text.py JSON or ingest_pipeline.py --stream NDJSON files ("-" for stdin)')
+    build_parser.add_argument('--doc', help='Document name stored in segs.doc (single input only; default: file name)')
+    build_parser.add_argument('--k1', type=float, default=DEFAULT_K1, help='BM25 term frequency saturation')
+    build_parser.add_argument('--b', type=float, default=DEFAULT_B, help='BM25 length normalization')
+
+    query_parser = subparsers.add_parser('query', help='Return the top-k chunks for a query')
+    query_parser.add_argument('index_path', help='Index file')
+    query_parser.add_argument('query', help='Query text')
+    query_parser.add_argument('--top-k', type=int, default=DEFAULT_TOP_K, help='Number of results')
+
+    args = parser.parse_args()
+
+    def fail(message):
+        print(json.dumps({"success": False, "error": message}))
+        sys.exit(1)
+
+    if args.command == "build":
+        if args.doc and len(args.chunks) > 1:
+            fail("--doc can only be used with a single chunk file")
+        start = time.perf_counter()
+        rows = []
+        try:
+            for source in args.chunks:
+                rows.extend(segment_rows(read_chunks(source), document_name(source, args.doc)))
+        except (OSError, ValueError, KeyError) as e:
+            fail(f"Could not read chunks: {str(e)}")
+        try:
+            stats = build_index(rows, args.index_path, args.k1, args.b)
+        except (OSError, OverflowError) as e:
+            fail(f"Could not write index: {str(e)}")
+        print(json.dumps({
+            "success": True,
+            "indexPath": args.index_path,
+            **stats,
+            "buildSeconds": round(time.perf_counter() - start, 3)
+        }, indent=2))
+        return
+
+    try:
+        start = time.perf_counter()
+        index = BM25Index(args.index_path)
+    except (OSError, ValueError) as e:
+        fail(f"Could not open index: {str(e)}")
+    with index:
+        loaded = time.perf_counter()
+        results = index.search(args.query, args.top_k)
+        finished = time.perf_counter()
+        print(json.dumps({
+            "success": True,
+            "query": args.query,
+            "results": results,
+            "openMicroseconds": round((loaded - start) * 1e6),
+            "queryMicroseconds": round((finished - loaded) * 1e6)
+        }, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Bulk Document Ingestion Script
+Ingests a ZIP archive or a directory of mixed PDF, Word, PowerPoint, Excel, CSV, HTML
+and Markdown documents. Each file's format is sniffed from its magic bytes (so
+mislabelled files are routed correctly; CSV and Markdown go by extension), files are processed across a process pool, and one NDJSON result line is
+written per file as soon as it finishes.
+"""
+
+import os
+import sys
+import json
+import argparse
+import logging
+import tempfile
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from processor_log import get_logger, configure_logging, add_logging_arguments, log_event, log_stage
+from ingest_pipeline import sniff_document_type, process_document, DOCUMENT_TYPES, TEXT_DOCUMENT_TYPES
+
+logger = get_logger("bulk")
+
+UNSUPPORTED_FORMATS = {
+    "ole": "Legacy binary Office format (.doc/.ppt/.xls) is not supported; save it as .docx, .pptx or .xlsx",
+    "zip": "Nested ZIP archives are not supported"
+}
+
+# Limits on what a ZIP archive may expand to, checked from its directory before
+# anything is extracted; reads stop at each member's declared size, so the
+# declared total bounds the disk space used
+DEFAULT_MAX_ARCHIVE_FILES = 10000
+DEFAULT_MAX_ARCHIVE_MB = 2048
+
+def collect_input_files(input_path, work_dir, max_files=DEFAULT_MAX_ARCHIVE_FILES,
+                        max_bytes=DEFAULT_MAX_ARCHIVE_MB * 1024 * 1024):
+    """
+    List the files to ingest from a directory or a ZIP archive.
+
+    ZIP members are extracted into work_dir under generated names, so member paths
+    can never escape it; the original member name is kept for reporting.
+
+    Args:
+        input_path (str): Directory or ZIP archive
+        work_dir (str): Scratch directory for extracted archive members
+        max_files (int): Maximum number of archive members to extract
+        max_bytes (int): Maximum total uncompressed size of the extracted members
+
+    Returns:
+        list: (file path on disk, display name) tuples
+
+    Raises:
+        ValueError: If the archive exceeds max_files or max_bytes
+    """
+    root = Path(input_path)
+
+    if root.is_dir():
+        return [
+            (str(path), str(path.relative_to(root)))
+            for path in sorted(root.rglob("*"))
+            if path.is_file() and not path.name.startswith(".")
+        ]
+
+    files = []
+    with zipfile.ZipFile(root) as archive:
+        members = [
+            (index, member) for index, member in enumerate(archive.infolist())
+            if not (member.is_dir() or Path(member.filename).name.startswith(".")
+                    or member.filename.startswith("__MACOSX/"))
+        ]
+        if len(members) > max_files:
+            raise ValueError(f"Archive has {len(members)} files; the limit is {max_files}")
+        total_bytes = sum(member.file_size for _, member in members)
+        if total_bytes > max_bytes:
+            raise ValueError(f"Archive expands to {total_bytes // (1024 * 1024)} MB; "
+                             f"the limit is {max_bytes // (1024 * 1024)} MB")
+
+        for index, member in members:
+            name = Path(member.filename).name
+            target = Path(work_dir) / f"{index:06d}_{name}"
+            with archive.open(member) as source, open(target, 'wb') as destination:
+                while True:
+                    data = source.read(1024 * 1024)
+                    if not data:
+                        break
+                    destination.write(data)
+            files.append((str(target), member.filename))
+    return files
+
+def extract_document(path, document_type, max_pages=50):
+    """
+    Run the processor matching document_type and return its result.
+
+    Processors are imported inside the worker so each only loads what it needs.
+    """
+    if document_type == "pdf":
+        from pdf_processor import extract_text_from_pdf
+        return extract_text_from_pdf(path, max_pages)
+    if document_type == "docx":
+        from docx_processor import extract_text_from_docx
+        return extract_text_from_docx(path)
+    if document_type == "pptx":
+        from pptx_processor import extract_text_from_pptx
+        # Files are already spread across processes; keep OCR on one thread per file
+        return extract_text_from_pptx(path, workers=1)
+    if document_type == "xlsx":
+        from xlsx_processor import extract_text_from_xlsx
+        return extract_text_from_xlsx(path)
+    if document_type == "csv":
+        from csv_processor import extract_text_from_csv
+        return extract_text_from_csv(path)
+    if document_type == "html":
+        from html_processor import extract_text_from_html
+        return extract_text_from_html(path)
+    from markdown_processor import extract_text_from_markdown
+    return extract_text_from_markdown(path)
+
+def ingest_file(path, name, chunk=False, chunk_size=1000, overlap=200, max_pages=50):
+    """
+    Sniff and process a single file (runs in a worker process).
+
+    Args:
+        path (str): File path on disk
+        name (str): Display name (relative path or archive member name)
+        chunk (bool): Return chunks from the ingestion pipeline instead of extracted text
+        chunk_size (int): Target chunk size in characters
+        overlap (int): Characters of overlap between chunks
+        max_pages (int): Maximum PDF pages to process
+
+    Returns:
+        dict: Per-file result with the detected type and the processor output
+    """
+    extension = Path(name).suffix.lower()
+    try:
+        detected_type = sniff_document_type(path)
+    except OSError as e:
+        return {"file": name, "success": False, "error": f"Cannot read file: {str(e)}"}
+    if detected_type is None and DOCUMENT_TYPES.get(extension) in TEXT_DOCUMENT_TYPES:
+        # Plain-text formats have no signature, so trust the extension for them
+        detected_type = DOCUMENT_TYPES[extension]
+
+    record = {
+        "file": name,
+        "detectedType": detected_type,
+        "mislabelled": detected_type in DOCUMENT_TYPES.values() and DOCUMENT_TYPES.get(extension) != detected_type
+    }
+
+    if detected_type not in DOCUMENT_TYPES.values():
+        record.update({
+            "success": False,
+            "error": UNSUPPORTED_FORMATS.get(detected_type, "Unrecognised document format")
+        })
+        return record
+
+    try:
+        if chunk:
+            result = process_document(path, detected_type, chunk_size, overlap, max_pages, workers=1)
+        else:
+            result = extract_document(path, detected_type, max_pages)
+    except Exception as e:
+        result = {"success": False, "error": f"Unexpected error processing {detected_type}: {str(e)}"}
+
+    record.update(result)
+    return record
+
+def ingest_collection(input_path, workers=None, chunk=False, chunk_size=1000, overlap=200, max_pages=50, out=None,
+                      max_archive_files=DEFAULT_MAX_ARCHIVE_FILES, max_archive_mb=DEFAULT_MAX_ARCHIVE_MB):
+    """
+    Ingest every file in a directory or ZIP archive and stream NDJSON results.
+
+    Args:
+        input_path (str): Directory or ZIP archive
+        workers (int): Worker processes (defaults to the CPU count)
+        chunk (bool): Return chunks instead of extracted text
+        chunk_size (int): Target chunk size in characters
+        overlap (int): Characters of overlap between chunks
+        max_pages (int): Maximum PDF pages to process
+        out: Text stream to write to (defaults to stdout)
+        max_archive_files (int): Maximum number of files extracted from a ZIP archive
+        max_archive_mb (float): Maximum total uncompressed size of a ZIP archive's files
+
+    Returns:
+        bool: True if every file was processed successfully
+    """
+    out = out or sys.stdout
+
+    def emit(record):
+        out.write(json.dumps(record) + "\n")
+        out.flush()
+
+    if not os.path.isdir(input_path) and not (os.path.isfile(input_path) and sniff_document_type(input_path) == "zip"):
+        emit({"type": "error", "success": False, "error": "Input must be a directory or a ZIP archive"})
+        return False
+
+    with tempfile.TemporaryDirectory(prefix="bulk_ingest_") as work_dir:
+        try:
+            with log_stage(logger, "collect"):
+                files = collect_input_files(input_path, work_dir, max_archive_files,
+                                            int(max_archive_mb * 1024 * 1024))
+        except (ValueError, zipfile.BadZipFile) as e:
+            emit({"type": "error", "success": False, "error": f"Cannot extract archive: {str(e)}"})
+            return False
+
+        worker_count = max(1, min(workers or os.cpu_count() or 1, len(files) or 1))
+        log_event(logger, logging.INFO, "Ingesting files", files=len(files), workers=worker_count)
+
+        succeeded = 0
+        with log_stage(logger, "ingest", files=len(files), workers=worker_count):
+            with ProcessPoolExecutor(max_workers=worker_count) as executor:
+                futures = {
+                    executor.submit(ingest_file, path, name, chunk, chunk_size, overlap, max_pages): name
+                    for path, name in files
+                }
+                for future in as_completed(futures):
+                    try:
+                        record = future.result()
+                    except Exception as e:
+                        record = {"file": futures[future], "success": False, "error": f"Worker failed: {str(e)}"}
+                    succeeded += bool(record.get("success"))
+                    emit({"type": "file", **record})
+
+    emit({
+        "type": "summary",
+        "success": succeeded == len(files),
+        "fileCount": len(files),
+        "succeeded": succeeded,
+        "failed": len(files) - succeeded
+    })
+    return succeeded == len(files)
+
+def main():
+    parser = argparse.ArgumentParser(description='Ingest a ZIP archive or directory of PDF, Word, PowerPoint, Excel, CSV, HTML and Markdown files')
+    parser.add_argument('input_path', help='Directory or ZIP archive to ingest')
+    parser.add_argument('--workers', type=int, default=0, help='Worker processes (default: CPU count)')
+    parser.add_argument('--chunk', action='store_true', help='Return chunks from the ingestion pipeline instead of extracted text')
+    parser.add_argument('--chunk-size', type=int, default=1000, help='Target chunk size in characters')
+    parser.add_argument('--overlap', type=int, default=200, help='Characters of overlap between chunks')
+    parser.add_argument('--max-pages', type=int, default=50, help='Maximum PDF pages to process')
+    parser.add_argument('--max-archive-files', type=int, default=DEFAULT_MAX_ARCHIVE_FILES,
+                        help='Reject ZIP archives with more files than this')
+    parser.add_argument('--max-archive-mb', type=float, default=DEFAULT_MAX_ARCHIVE_MB,
+                        help='Reject ZIP archives whose files expand to more than this many megabytes')
+    add_logging_arguments(parser)
+
+    args = parser.parse_args()
+    configure_logging(args.log_level, args.log_json)
+
+    success = ingest_collection(args.input_path, args.workers, args.chunk, args.chunk_size, args.overlap, args.max_pages,
+                                max_archive_files=args.max_archive_files, max_archive_mb=args.max_archive_mb)
+    sys.exit(0 if success else 1)
+
+if __name__ == "__main__":
+    main()
@@ -3,18 +3,89 @@
 Text chunking script using langchain's RecursiveCharacterTextSplitter
 """
 
+import os
 import sys
 import json
-from typing import List, Dict
+from bisect import bisect_right
+from typing import TYPE_CHECKING, List, Dict, Iterable, Iterator, Tuple
 
-try:
-    from langchain.text_splitter import RecursiveCharacterTextSplitter
-except ImportError:
-    print(json.dumps({
-        "error": "langchain not installed. Please run: pip install langchain",
-        "success": False
-    }))
-    sys.exit(1)
+from processor_metrics import DocumentMetrics, METRICS_FILE_ENV, serialize_result, profile_memory_requested
+from processor_output import OUTPUT_FORMAT_ENV, write_output
+
+if TYPE_CHECKING:
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+# Separator placed between consecutive source blocks in chunk_blocks()
+BLOCK_SEPARATOR = "\n\n"
+
+# chunk_blocks() splits once this many chunk sizes of block text are buffered
+BLOCK_WINDOW_CHUNKS = 8
+
+def load_text_splitter_class():
+    """
+    Import RecursiveCharacterTextSplitter on first use
+    
+    langchain is the slowest import in the scripts, so it is deferred until text is
+    actually split; arguments are validated and documents opened without it.
+    
+    Returns:
+        The RecursiveCharacterTextSplitter class
+    """
+    try:
+        from langchain_text_splitters import RecursiveCharacterTextSplitter
+    except ImportError:
+        try:
+            from langchain.text_splitter import RecursiveCharacterTextSplitter
+        except ImportError:
+            raise ImportError("langchain not installed. Please run: pip install langchain") from None
+    return RecursiveCharacterTextSplitter
+
+def create_text_splitter(chunk_size: int = 1000, chunk_overlap: int = 200) -> "RecursiveCharacterTextSplitter":
+    """
+    Create the RecursiveCharacterTextSplitter used for all chunking
+    
+    Args:
+        chunk_size: Target size of each chunk in characters
+        chunk_overlap: Number of characters to overlap between chunks
+        
+    Returns:
+        Configured text splitter
+    """
+    return load_text_splitter_class()(
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_overlap,
+        length_function=len,
+        separators=["\n\n", "\n", " ", ""]
+    )
+
+def locate_chunks(text: str, chunks: List[str], chunk_overlap: int) -> Iterator[Tuple[int, str, int]]:
+    """
+    Find where each split chunk starts in the text it was split from
+    
+    As with langchain's add_start_index, each chunk is searched for from where the
+    previous chunk's overlap could begin, so repeated text (running headers,
+    periodic content) is not matched at an earlier copy.
+    
+    Args:
+        text: The text that was split
+        chunks: The splitter's chunks, in order
+        chunk_overlap: The splitter's chunk overlap
+        
+    Yields:
+        (1-based chunk number, stripped chunk text, start offset) for non-empty chunks
+    """
+    previous_start = 0
+    previous_length = 0
+    for number, chunk in enumerate(chunks, 1):
+        chunk_text = chunk.strip()
+        if not chunk_text:
+            continue
+        search_from = max(0, previous_start + previous_length - chunk_overlap)
+        start = text.find(chunk_text, search_from)
+        if start < 0:
+            start = search_from
+        previous_start, previous_length = start, len(chunk_text)
+        yield number, chunk_text, start
 
 def chunk_text(text: str, chunk_size: int = 1000, chunk_overlap: int = 200) -> List[Dict]:
     """
@@ -26,50 +97,120 @@ def chunk_text(text: str, chunk_size: int = 1000, chunk_overlap: int = 200) -> L
         chunk_overlap: Number of characters to overlap between chunks
         
     Returns:
-        List of chunk dictionaries with id, text, charCount, and wordCount
+        List of chunk dictionaries with id, text, charCount, wordCount and the
+        start/end character offsets of the chunk text in text
     """
     try:
         # Create the text splitter
-        text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=chunk_size,
-            chunk_overlap=chunk_overlap,
-            length_function=len,
-            separators=["\n\n", "\n", " ", ""]
-        )
+        text_splitter = create_text_splitter(chunk_size, chunk_overlap)
         
         # Split the text
         chunks = text_splitter.split_text(text)
         
         # Format chunks for our application
-        formatted_chunks = []
-        for i, chunk in enumerate(chunks, 1):
-            chunk_text = chunk.strip()
-            if chunk_text:  # Only include non-empty chunks
-                formatted_chunks.append({
-                    "id": i,
-                    "text": chunk_text,
-                    "charCount": len(chunk_text),
-                    "wordCount": len(chunk_text.split())
-                })
+        # Only non-empty chunks are included
+        formatted_chunks = [{
+            "id": i,
+            "text": chunk_text,
+            "charCount": len(chunk_text),
+            "wordCount": len(chunk_text.split()),
+            "start": start,
+            "end": start + len(chunk_text)
+        } for i, chunk_text, start in locate_chunks(text, chunks, chunk_overlap)]
         
         return formatted_chunks
         
     except Exception as e:
         raise Exception(f"Failed to chunk text: {str(e)}")
 
+def chunk_blocks(blocks: Iterable[Dict], chunk_size: int = 1000, chunk_overlap: int = 200) -> Iterator[Dict]:
+    """
+    Chunk a stream of extracted blocks (pages, slides, paragraphs) as they arrive
+    
+    Blocks are buffered until about BLOCK_WINDOW_CHUNKS chunk sizes of text are
+    available, then the window is split and its chunks are yielded, so chunking
+    overlaps with extraction and only one window of text is held at a time.
+    Windows always end on a block boundary; overlap is applied within a window
+    but not across window boundaries.
+    
+    Args:
+        blocks: Iterable of block dicts with at least "text" and "position" keys
+        chunk_size: Target size of each chunk in characters
+        chunk_overlap: Number of characters to overlap between chunks
+        
+    Yields:
+        Chunk dicts with id, text, charCount, wordCount, start/end character offsets
+        into the blocks joined by BLOCK_SEPARATOR, and the source blocks they span
+    """
+    text_splitter = create_text_splitter(chunk_size, chunk_overlap)
+    window_size = chunk_size * BLOCK_WINDOW_CHUNKS
+    
+    window_texts = []
+    window_sources = []
+    window_starts = []
+    window_length = 0
+    window_offset = 0
+    chunk_id = 0
+    
+    def flush():
+        nonlocal chunk_id
+        window_text = BLOCK_SEPARATOR.join(window_texts)
+        
+        for _, chunk_text, start in locate_chunks(window_text, text_splitter.split_text(window_text), chunk_overlap):
+            end = start + len(chunk_text)
+            
+            first = bisect_right(window_starts, start) - 1
+            last = bisect_right(window_starts, end - 1) - 1
+            
+            chunk_id += 1
+            yield {
+                "id": chunk_id,
+                "text": chunk_text,
+                "charCount": len(chunk_text),
+                "wordCount": len(chunk_text.split()),
+                "start": window_offset + start,
+                "end": window_offset + end,
+                "sources": window_sources[max(first, 0):last + 1]
+            }
+    
+    for block in blocks:
+        text = block.get("text", "").strip()
+        if not text:
+            continue
+        
+        if window_texts:
+            window_length += len(BLOCK_SEPARATOR)
+        window_starts.append(window_length)
+        window_texts.append(text)
+        window_sources.append({key: value for key, value in block.items() if key != "text"})
+        window_length += len(text)
+        
+        if window_length >= window_size:
+            yield from flush()
+            window_offset += window_length + len(BLOCK_SEPARATOR)
+            window_texts, window_sources, window_starts = [], [], []
+            window_length = 0
+    
+    if window_texts:
+        yield from flush()
+
 def main():
     """Main function to handle command line arguments and process text"""
     try:
-        if len(sys.argv) != 4:
+        # --profile-memory is the only option; the rest of the arguments are positional
+        profile_memory = "--profile-memory" in sys.argv[4:] or profile_memory_requested()
+        arguments = sys.argv[:4] + [arg for arg in sys.argv[4:] if arg != "--profile-memory"]
+        
+        if len(arguments) != 4:
             print(json.dumps({
-                "error": "Usage: python chunk_text.py <text> <chunk_size> <overlap>",
+                "error": "Usage: python chunk_text.py <text> <chunk_size> <overlap> [--profile-memory]",
                 "success": False
             }))
             sys.exit(1)
         
-        text = sys.argv[1]
-        chunk_size = int(sys.argv[2])
-        overlap = int(sys.argv[3])
+        text = arguments[1]
+        chunk_size = int(arguments[2])
+        overlap = int(arguments[3])
         
         # Validate inputs
         if not text or not text.strip():
@@ -100,8 +241,16 @@ def main():
             }))
             sys.exit(1)
         
+        metrics = DocumentMetrics("chunk")
+        metrics.record_startup()
+        if profile_memory:
+            metrics.enable_memory_profiling()
+        metrics.count("characters", len(text))
+        
         # Chunk the text
-        chunks = chunk_text(text, chunk_size, overlap)
+        with metrics.stage("split"):
+            chunks = chunk_text(text, chunk_size, overlap)
+        metrics.count("chunks", len(chunks))
         
         # Return success response
         result = {
@@ -117,7 +266,9 @@ def main():
             }
         }
         
-        print(json.dumps(result))
+        # Metrics file and output format come from the environment since arguments are positional
+        write_output(serialize_result(result, metrics, os.environ.get(METRICS_FILE_ENV),
+                                      output_format=os.environ.get(OUTPUT_FORMAT_ENV, "json")))
         
     except ValueError as e:
         print(json.dumps({
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Context Packer for Retrieved Chunks
+Turns scored chunks with offsets (chunk_text.py / ingest_pipeline.py output) into
+prompt context: chunks that overlap or touch in a document are merged back into
+contiguous source spans so shared text is sent once, lines that repeat across the
+corpus (running headers, footers, page numbers) are removed, and spans are added
+greedily by score while they fit a token budget.
+"""
+
+import re
+import sys
+import json
+import argparse
+from pathlib import Path
+from collections import Counter
+
+from mmr_rerank import merge_spans, estimate_tokens, CONTEXT_SEPARATOR
+from processor_output import iter_chunks, read_chunks
+
+DEFAULT_TOKEN_BUDGET = 2000
+
+# A line seen this many times across the corpus is treated as boilerplate
+DEFAULT_MIN_REPEATS = 4
+
+# Longer lines are content even when repeated (quoted clauses, repeated table rows)
+MAX_BOILERPLATE_CHARS = 120
+
+ORDERS = ("document", "score")
+
+_WHITESPACE = re.compile(r"\s+")
+_DIGITS = re.compile(r"\d+")
+_BLANK_LINES = re.compile(r"\n{3,}")
+
+def line_key(line):
+    """
+    Normalize a line for boilerplate matching: collapse whitespace, ignore case and
+    mask digit runs, so "Page 3 of 12" and "page 4 of 12" share a key.
+
+    Returns:
+        str: Key, or "" for lines that are never boilerplate
+    """
+    key = _WHITESPACE.sub(" ", line).strip().casefold()
+    if not key or len(key) > MAX_BOILERPLATE_CHARS:
+        return ""
+    key = _DIGITS.sub("#", key)
+    # Mostly-numeric lines (table rows, totals) differ in substance, not just numbering
+    if sum(character.isalpha() for character in key) < key.count("#"):
+        return ""
+    return key
+
+def detect_boilerplate(chunks, min_repeats=DEFAULT_MIN_REPEATS):
+    """
+    Find lines repeated across a corpus.
+
+    Chunks are first merged into source spans, so text shared by overlapping chunks
+    is counted once.
+
+    Args:
+        chunks (list): Corpus chunks with "text" and, ideally, "doc", "start", "end"
+        min_repeats (int): Occurrences that make a line boilerplate
+
+    Returns:
+        set: Boilerplate line keys (see line_key())
+    """
+    counts = Counter()
+    for span in merge_spans(chunks):
+        counts.update(key for key in map(line_key, span["text"].split("\n")) if key)
+    return {key for key, count in counts.items() if count >= min_repeats}
+
+def strip_boilerplate(text, boilerplate):
+    """
+    Remove boilerplate lines from text.
+
+    Returns:
+        tuple: (cleaned text, number of lines removed)
+    """
+    if not boilerplate:
+        return text, 0
+    kept = []
+    removed = 0
+    for line in text.split("\n"):
+        if line_key(line) in boilerplate:
+            removed += 1
+        else:
+            kept.append(line)
+    return _BLANK_LINES.sub("\n\n", "\n".join(kept)).strip(), removed
+
+def chunk_score(chunk):
+    """Retrieval score of a chunk: "score", else "relevance", else 0."""
+    score = chunk.get("score", chunk.get("relevance"))
+    return float(score) if score is not None else 0.0
+
+def pack_context(chunks, token_budget=DEFAULT_TOKEN_BUDGET, boilerplate=None, order="document"):
+    """
+    Merge chunks into spans, strip boilerplate and fill a token budget greedily by score.
+
+    Args:
+        chunks (list): Retrieved chunks with "id", "text", a "score" (or "relevance";
+            input order breaks ties) and optional "start", "end" (chunk_text() or
+            chunk_blocks() offsets) and "doc" (needed when chunks come from several
+            documents, since offsets are per document)
+        token_budget (int): Maximum estimated tokens of packed span text
+        boilerplate (set): Line keys to remove (see detect_boilerplate())
+        order (str): "document" to emit selected spans in source order, "score" for best first
+
+    Returns:
+        dict: "spans" (selected, with score and token estimates) and "stats" comparing
+            the candidates with the packed context
+    """
+    if order not in ORDERS:
+        raise ValueError(f"Unknown span order: {order}")
+    boilerplate = boilerplate or set()
+    spans = merge_spans(chunks)
+
+    removed_lines = 0
+    for span in spans:
+        span["score"] = max(chunk_score(chunks[number]) for number in span["members"])
+        span["rank"] = min(span["members"])
+        span["text"], removed = strip_boilerplate(span["text"], boilerplate)
+        span["tokens"] = estimate_tokens(span["text"])
+        removed_lines += removed
+
+    selected = []
+    seen_texts = set()
+    used = 0
+    for span in sorted(spans, key=lambda span: (-span["score"], span["rank"])):
+        # Chunks without offsets can repeat text another span already carries
+        if not span["text"] or span["text"] in seen_texts or used + span["tokens"] > token_budget:
+            continue
+        seen_texts.add(span["text"])
+        used += span["tokens"]
+        selected.append(span)
+    if order == "document":
+        selected.sort(key=lambda span: (str(span["doc"]), span["start"] if span["start"] is not None else -1, span["rank"]))
+
+    return {
+        "spans": [{
+            "doc": span["doc"],
+            "start": span["start"],
+            "end": span["end"],
+            "chunkIds": span["chunkIds"],
+            "score": round(span["score"], 4),
+            "tokens": span["tokens"],
+            "text": span["text"]
+        } for span in selected],
+        "stats": {
+            "candidates": len(chunks),
+            "mergedSpans": len(spans),
+            "selectedSpans": len(selected),
+            "candidateTokens": sum(estimate_tokens(chunk["text"]) for chunk in chunks),
+            "cleanedTokens": sum(span["tokens"] for span in spans),
+            "contextTokens": used,
+            "boilerplateLinesRemoved": removed_lines,
+            "tokenBudget": token_budget
+        }
+    }
+
+def read_corpus(paths):
+    """
+    Read corpus chunks from chunk_text.py / ingest_pipeline.py outputs (JSON, binary
+    or NDJSON), one document per file unless chunks name their own "doc".
+    """
+    chunks = []
+    for path in paths:
+        with open(path, "rb") as stream:
+            for chunk in iter_chunks(stream):
+                chunk.setdefault("doc", Path(path).name)
+                chunks.append(chunk)
+    return chunks
+
+def main():
+    parser = argparse.ArgumentParser(description='Pack retrieved chunks into deduplicated prompt context within a token budget')
+    parser.add_argument('candidates', help='Scored chunks (JSON list, {"candidates"}/{"chunks"} object or NDJSON; "-" for stdin)')
+    parser.add_argument('--token-budget', type=int, default=DEFAULT_TOKEN_BUDGET, help='Maximum estimated context tokens')
+    parser.add_argument('--corpus', nargs='+', help='Chunk outputs to detect repeated boilerplate lines in (default: the candidates)')
+    parser.add_argument('--boilerplate', help='JSON list of boilerplate line keys saved by --save-boilerplate')
+    parser.add_argument('--save-boilerplate', help='Write the detected boilerplate line keys to this file for reuse')
+    parser.add_argument('--min-repeats', type=int, default=DEFAULT_MIN_REPEATS,
+                        help='Occurrences across the corpus that make a line boilerplate')
+    parser.add_argument('--order', choices=ORDERS, default='document', help='Order of spans in the context')
+    parser.add_argument('--separator', default=CONTEXT_SEPARATOR, help='Text placed between spans in "context"')
+
+    args = parser.parse_args()
+
+    def fail(message):
+        print(json.dumps({"success": False, "error": message}))
+        sys.exit(1)
+
+    if args.min_repeats < 2:
+        fail("Minimum repeats must be at least 2")
+
+    try:
+        chunks = read_chunks(args.candidates)
+    except (OSError, ValueError, KeyError) as e:
+        fail(f"Could not read candidates: {str(e)}")
+
+    try:
+        if args.boilerplate:
+            boilerplate = set(json.loads(Path(args.boilerplate).read_text(encoding="utf-8")))
+        else:
+            boilerplate = detect_boilerplate(read_corpus(args.corpus) if args.corpus else chunks, args.min_repeats)
+        if args.save_boilerplate:
+            Path(args.save_boilerplate).write_text(json.dumps(sorted(boilerplate), indent=2), encoding="utf-8")
+    except (OSError, ValueError, KeyError) as e:
+        fail(f"Could not detect boilerplate: {str(e)}")
+
+    try:
+        result = pack_context(chunks, args.token_budget, boilerplate, args.order)
+    except (KeyError, ValueError) as e:
+        fail(f"Packing failed: {str(e)}")
+
+    print(json.dumps({
+        "success": True,
+        "context": args.separator.join(span["text"] for span in result["spans"]),
+        **result
+    }, indent=2))
+
+if __name__ == "__main__":
+    main()
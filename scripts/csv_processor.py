@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+CSV Text Extraction Script
+Reads delimited text files incrementally with the csv module, detecting the encoding
+and delimiter from a sample, so arbitrarily large exports stream in bounded memory.
+"""
+
+import sys
+import csv
+import json
+import codecs
+import argparse
+import os
+import logging
+
+from processor_log import get_logger, configure_logging, add_logging_arguments, log_event
+from processor_metrics import DocumentMetrics, add_metrics_arguments, serialize_result
+from processor_output import add_output_arguments, write_output
+
+logger = get_logger("csv")
+
+# Rows grouped into one block
+ROWS_PER_BLOCK = 50
+
+# Bytes read up front to detect the encoding and dialect
+SAMPLE_BYTES = 64 * 1024
+
+# Allow large quoted fields (the csv module's default limit is 128 KB)
+csv.field_size_limit(16 * 1024 * 1024)
+
+def detect_encoding(sample):
+    """
+    Pick an encoding for a file from its first bytes.
+
+    Returns:
+        str: "utf-8-sig" when the sample is valid UTF-8 (with or without a BOM),
+        otherwise "cp1252", the usual encoding of spreadsheet exports on Windows
+    """
+    if sample.startswith(codecs.BOM_UTF16_LE) or sample.startswith(codecs.BOM_UTF16_BE):
+        return "utf-16"
+    try:
+        # The sample may end part-way through a multi-byte character
+        codecs.getincrementaldecoder("utf-8")().decode(sample, final=False)
+        return "utf-8-sig"
+    except UnicodeDecodeError:
+        return "cp1252"
+
+def detect_dialect(text_sample):
+    """Sniff the delimiter and quoting from a text sample, defaulting to Excel CSV."""
+    try:
+        return csv.Sniffer().sniff(text_sample, delimiters=",;\t|")
+    except csv.Error:
+        return csv.excel
+
+def iter_csv_blocks(csv_path, max_rows=None, info=None):
+    """
+    Yield blocks of rows from a delimited text file.
+
+    The file is read through csv.reader one row at a time, so only the current block
+    is held in memory. firstRow/lastRow are physical line numbers in the file (the
+    line a block's first record starts on and the line its last record ends on), so
+    blank lines and quoted fields spanning several lines are accounted for; cells
+    are tab-joined.
+
+    Args:
+        csv_path (str): Path to the file
+        max_rows (int): Optional maximum number of rows (None for all)
+        info (dict): Optional dict updated with the detected encoding, delimiter, column
+            count and number of non-blank rows read
+
+    Yields:
+        dict: {"type": "rows", "position", "firstRow", "lastRow", "text"}
+    """
+    info = info if info is not None else {}
+    with open(csv_path, 'rb') as file:
+        sample = file.read(SAMPLE_BYTES)
+
+    encoding = detect_encoding(sample)
+    text_sample = sample.decode(encoding, errors="ignore")
+    if len(sample) == SAMPLE_BYTES and "\n" in text_sample:
+        text_sample = text_sample[:text_sample.rfind("\n")]  # drop the partial last row
+    dialect = detect_dialect(text_sample)
+    info.update({"encoding": encoding, "delimiter": dialect.delimiter, "columnCount": 0, "rowCount": 0})
+
+    with open(csv_path, 'r', encoding=encoding, errors="replace", newline="") as file:
+        lines = []
+        first_row = None
+        row_count = 0
+        position = 0
+        reader = csv.reader(file, dialect)
+        line_number = 0
+
+        for values in reader:
+            # A record starts on the line after the previous one ended
+            start_line, line_number = line_number + 1, reader.line_num
+            cells = [value.strip() for value in values]
+            if not any(cells):
+                continue
+            row_count += 1
+            info["rowCount"] = row_count
+            info["columnCount"] = max(info["columnCount"], len(cells))
+            if first_row is None:
+                first_row = start_line
+            lines.append("\t".join(cells).rstrip("\t"))
+            last_row = line_number
+
+            if len(lines) == ROWS_PER_BLOCK:
+                position += 1
+                yield {"type": "rows", "position": position, "firstRow": first_row,
+                       "lastRow": last_row, "text": "\n".join(lines)}
+                lines, first_row = [], None
+
+            if max_rows is not None and row_count >= max_rows:
+                break
+
+        if lines:
+            position += 1
+            yield {"type": "rows", "position": position, "firstRow": first_row,
+                   "lastRow": last_row, "text": "\n".join(lines)}
+
+def describe_csv_error(error, csv_path):
+    """
+    Build a user-facing message for an exception raised while reading a CSV file.
+
+    Args:
+        error (Exception): The exception that was raised
+        csv_path (str): Path to the file
+
+    Returns:
+        str: Error message
+    """
+    if isinstance(error, FileNotFoundError):
+        return f"CSV file not found: {csv_path}"
+    if isinstance(error, csv.Error):
+        return f"Malformed CSV file: {str(error)}"
+    return f"Unexpected error processing CSV file: {str(error)}"
+
+def extract_text_from_csv(csv_path, max_rows=None, metrics=None):
+    """
+    Extract text from a CSV file.
+
+    Args:
+        csv_path (str): Path to the file
+        max_rows (int): Optional maximum number of rows (None for all)
+        metrics (DocumentMetrics): Optional metrics to record stages and counts into
+
+    Returns:
+        dict: Result containing success status, text, row/column counts, the detected
+        encoding and delimiter, and timings
+    """
+    metrics = metrics or DocumentMetrics("csv", logger)
+    try:
+        metrics.count("bytes", os.path.getsize(csv_path))
+        info = {}
+        parts = []
+        with metrics.stage("extract"):
+            for block in iter_csv_blocks(csv_path, max_rows, info):
+                parts.append(block["text"])
+
+        text = "\n".join(parts)
+        row_count = info["rowCount"]
+        metrics.count("rows", row_count)
+        log_event(logger, logging.INFO, "CSV extracted", rows=row_count, **info)
+
+        return {
+            "success": True,
+            "text": text,
+            "rowCount": row_count,
+            "columnCount": info["columnCount"],
+            "encoding": info["encoding"],
+            "delimiter": info["delimiter"],
+            "hasText": bool(text.strip()),
+            "timings": metrics.as_dict()
+        }
+
+    except Exception as e:
+        return {
+            "success": False,
+            "error": describe_csv_error(e, csv_path),
+            "text": "",
+            "rowCount": 0
+        }
+
+def stream_text_from_csv(csv_path, max_rows=None, out=None, metrics=None):
+    """
+    Write CSV row blocks as NDJSON, one JSON object per line, as they are read.
+
+    A final "summary" line carries the counts; failures are reported as an "error" line.
+
+    Returns:
+        bool: True if the file was processed successfully
+    """
+    out = out or sys.stdout
+    metrics = metrics or DocumentMetrics("csv", logger)
+
+    def emit(record):
+        out.write(json.dumps(record) + "\n")
+        out.flush()
+
+    try:
+        metrics.count("bytes", os.path.getsize(csv_path))
+        info = {}
+        blocks = 0
+        characters = 0
+        for block in iter_csv_blocks(csv_path, max_rows, info):
+            blocks += 1
+            characters += len(block["text"])
+            emit(block)
+
+        row_count = info["rowCount"]
+        metrics.count("rows", row_count)
+        emit({
+            "type": "summary",
+            "success": True,
+            "rowCount": row_count,
+            "columnCount": info["columnCount"],
+            "encoding": info["encoding"],
+            "delimiter": info["delimiter"],
+            "blockCount": blocks,
+            "characterCount": characters,
+            "hasText": characters > 0,
+            "timings": metrics.as_dict()
+        })
+        return True
+
+    except Exception as e:
+        emit({
+            "type": "error",
+            "success": False,
+            "error": describe_csv_error(e, csv_path)
+        })
+        return False
+
+def main():
+    parser = argparse.ArgumentParser(description='Extract text from CSV and other delimited text files')
+    parser.add_argument('csv_path', help='Path to the CSV file')
+    parser.add_argument('--max-rows', type=int, default=None, help='Maximum rows to process (default: all)')
+    parser.add_argument('--stream', action='store_true', help='Stream row blocks as NDJSON')
+    add_logging_arguments(parser)
+    add_metrics_arguments(parser)
+    add_output_arguments(parser)
+
+    args = parser.parse_args()
+    configure_logging(args.log_level, args.log_json)
+
+    metrics = DocumentMetrics("csv", logger)
+    metrics.record_startup()
+    if args.profile_memory:
+        metrics.enable_memory_profiling()
+
+    if args.stream:
+        success = stream_text_from_csv(args.csv_path, args.max_rows, metrics=metrics)
+        if args.metrics_file:
+            metrics.write(args.metrics_file, args.metrics_format, success=success)
+        sys.exit(0 if success else 1)
+
+    result = extract_text_from_csv(args.csv_path, args.max_rows, metrics)
+    write_output(serialize_result(result, metrics, args.metrics_file, args.metrics_format,
+                                 output_format=args.output_format, indent=2))
+
+if __name__ == "__main__":
+    main()
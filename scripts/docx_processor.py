@@ -9,8 +9,16 @@ import sys
 import json
 import argparse
 import io
+import os
+import logging
 from pathlib import Path
 
+from processor_log import get_logger, configure_logging, add_logging_arguments, log_event, preview
+from processor_metrics import DocumentMetrics, add_metrics_arguments, serialize_result
+from processor_output import add_output_arguments, write_output
+from text_normalize import normalize_text
+from processor_imports import module_available, load_ocr
+
 try:
     from docx import Document
 except ImportError:
@@ -22,39 +30,43 @@ except ImportError:
     }))
     sys.exit(1)
 
-# OCR dependencies - optional
-OCR_AVAILABLE = False
-try:
-    from PIL import Image
-    import pytesseract
-    OCR_AVAILABLE = True
-except ImportError:
-    pass  # OCR will be skipped if dependencies not available
+# OCR dependencies - optional, imported on the first image (see load_ocr)
+OCR_AVAILABLE = module_available("PIL", "pytesseract")
 
-def extract_text_from_images_in_doc(doc):
+logger = get_logger("docx")
+
+def iter_ocr_text_from_images_in_doc(doc, metrics=None):
     """
-    Extract text from images embedded in Word document using OCR.
+    Yield text extracted from images embedded in Word document using OCR.
     
     Args:
         doc: python-docx Document object
+        metrics (DocumentMetrics): Optional metrics to record OCR time and image count into
         
-    Returns:
-        str: Extracted text from all images in the document
+    Yields:
+        tuple: (image number, OCR text) for every image that produced text
     """
+    metrics = metrics or DocumentMetrics("docx")
     if not OCR_AVAILABLE:
-        print("OCR not available - skipping image text extraction", file=sys.stderr)
-        return ""
+        log_event(logger, logging.INFO, "OCR not available - skipping image text extraction")
+        return
     
-    ocr_text = ""
     image_count = 0
+    ocr = None
     
     try:
         # Access the document's relationships to find embedded images
         for rel in doc.part.rels.values():
             if "image" in rel.target_ref:
+                if ocr is None:
+                    ocr = load_ocr()
+                    if ocr is None:
+                        log_event(logger, logging.WARNING, "OCR libraries failed to import - skipping image text extraction")
+                        return
+                    Image, pytesseract = ocr
                 try:
                     image_count += 1
-                    print(f"Processing image {image_count}: {rel.target_ref}", file=sys.stderr)
+                    log_event(logger, logging.DEBUG, "Processing image", image=image_count, target=rel.target_ref)
                     
                     # Get the image data
                     image_part = rel.target_part
@@ -64,7 +76,7 @@ def extract_text_from_images_in_doc(doc):
                     image_stream = io.BytesIO(image_data)
                     image = Image.open(image_stream)
                     
-                    print(f"Image {image_count} size: {image.size}, mode: {image.mode}", file=sys.stderr)
+                    log_event(logger, logging.DEBUG, "Image loaded", image=image_count, size=image.size, mode=image.mode)
                     
                     # Perform OCR with multiple configurations for better results
                     ocr_configs = [
@@ -76,115 +88,169 @@ def extract_text_from_images_in_doc(doc):
                     ]
                     
                     best_text = ""
-                    for config in ocr_configs:
-                        try:
-                            extracted_text = pytesseract.image_to_string(image, config=config).strip()
-                            if len(extracted_text) > len(best_text):
-                                best_text = extracted_text
-                        except:
-                            continue
+                    with metrics.stage("ocr"):
+                        for config in ocr_configs:
+                            try:
+                                extracted_text = pytesseract.image_to_string(image, config=config).strip()
+                                if len(extracted_text) > len(best_text):
+                                    best_text = extracted_text
+                            except:
+                                continue
+                    metrics.count("images")
                     
                     if best_text:
-                        ocr_text += f"\n[OCR from Image {image_count}]\n{best_text}\n"
-                        print(f"OCR extracted from image {image_count}: {best_text[:100]}...", file=sys.stderr)
+                        log_event(logger, logging.DEBUG, "OCR text extracted", image=image_count,
+                                  characters=len(best_text), preview=preview(best_text, 100))
+                        yield image_count, best_text
                     else:
-                        print(f"No text found in image {image_count}", file=sys.stderr)
+                        log_event(logger, logging.DEBUG, "No text found in image", image=image_count)
                         
                 except Exception as e:
-                    print(f"Error processing image {image_count}: {e}", file=sys.stderr)
+                    log_event(logger, logging.WARNING, "Error processing image", image=image_count, error=str(e))
                     continue
     
     except Exception as e:
-        print(f"Error accessing document images: {e}", file=sys.stderr)
+        log_event(logger, logging.WARNING, "Error accessing document images", error=str(e))
     
     if image_count > 0:
-        print(f"Processed {image_count} images for OCR", file=sys.stderr)
+        log_event(logger, logging.INFO, "Processed images for OCR", images=image_count)
     else:
-        print("No images found in document", file=sys.stderr)
+        log_event(logger, logging.DEBUG, "No images found in document")
+
+def extract_text_from_images_in_doc(doc):
+    """
+    Extract text from images embedded in Word document using OCR.
     
-    return ocr_text
+    Args:
+        doc: python-docx Document object
+        
+    Returns:
+        str: Extracted text from all images in the document
+    """
+    return "".join(
+        f"\n[OCR from Image {image_number}]\n{text}\n"
+        for image_number, text in iter_ocr_text_from_images_in_doc(doc)
+    )
 
-def extract_text_from_docx(docx_path, max_paragraphs=1000):
+def iter_docx_blocks(doc, max_paragraphs=None, metrics=None):
+    """
+    Yield paragraph, table and OCR blocks from a Word document as they are produced.
+    
+    Blocks are emitted in output order (paragraphs, then tables, then OCR text) and
+    carry an ordinal "position" so consumers can reassemble or chunk them incrementally
+    without holding the whole document text in memory. Block text is normalized
+    (see normalize_text()).
+    
+    Args:
+        doc: python-docx Document object
+        max_paragraphs (int): Optional maximum number of paragraphs to process (None for all)
+        metrics (DocumentMetrics): Optional metrics to record OCR time and image count into
+        
+    Yields:
+        dict: Block with type, position, source index and text
+    """
+    position = 0
+    
+    for i, paragraph in enumerate(doc.paragraphs):
+        if max_paragraphs is not None and i >= max_paragraphs:
+            break
+        
+        try:
+            para_text = normalize_text(paragraph.text, keep_blank_lines=True)
+            error = None
+        except Exception as para_error:
+            para_text = f"[Error extracting text from paragraph {i + 1}: {str(para_error)}]"
+            error = str(para_error)
+        
+        if para_text:  # Only include non-empty paragraphs
+            position += 1
+            block = {"type": "paragraph", "position": position, "paragraph": i + 1, "text": para_text}
+            if error is not None:
+                block["error"] = error
+            yield block
+    
+    for table_number, table in enumerate(doc.tables, 1):
+        rows = []
+        for row in table.rows:
+            row_text = " | ".join(cell.text.strip() for cell in row.cells)
+            if row_text.strip():
+                rows.append(row_text)
+        
+        position += 1
+        yield {"type": "table", "position": position, "table": table_number,
+               "text": normalize_text("\n".join(rows), keep_blank_lines=True)}
+    
+    for image_number, ocr_text in iter_ocr_text_from_images_in_doc(doc, metrics):
+        position += 1
+        yield {"type": "ocr", "position": position, "image": image_number,
+               "text": normalize_text(ocr_text, keep_blank_lines=True)}
+
+def extract_text_from_docx(docx_path, max_paragraphs=None, metrics=None):
     """
     Extract text from Word document file.
     
     Args:
         docx_path (str): Path to the .docx file
-        max_paragraphs (int): Maximum number of paragraphs to process
+        max_paragraphs (int): Optional maximum number of paragraphs to process (None for all)
+        metrics (DocumentMetrics): Optional metrics to record stages and counts into
         
     Returns:
-        dict: Result containing success status, text, and metadata
+        dict: Result containing success status, text, metadata and timings
     """
+    metrics = metrics or DocumentMetrics("docx", logger)
     try:
-        doc = Document(docx_path)
+        metrics.count("bytes", os.path.getsize(docx_path))
+        with metrics.stage("parse"):
+            doc = Document(docx_path)
         
-        print(f"OCR Available: {OCR_AVAILABLE}", file=sys.stderr)
+        log_event(logger, logging.INFO, "Document opened", paragraphs=len(doc.paragraphs), ocrAvailable=OCR_AVAILABLE)
         
-        extracted_text = ""
+        paragraph_parts = []
+        table_parts = []
+        ocr_parts = []
         paragraph_texts = []
         processed_paragraphs = 0
+        table_count = 0
         
-        # Extract text from embedded images using OCR
-        ocr_text = ""
-        if OCR_AVAILABLE:
-            print("Extracting text from images using OCR...", file=sys.stderr)
-            ocr_text = extract_text_from_images_in_doc(doc)
-        
-        for i, paragraph in enumerate(doc.paragraphs):
-            if i >= max_paragraphs:
-                break
-                
-            try:
-                para_text = paragraph.text.strip()
-                
-                if para_text:  # Only include non-empty paragraphs
+        # Includes OCR time, which is also reported on its own as the "ocr" stage
+        with metrics.stage("extract"):
+            for block in iter_docx_blocks(doc, max_paragraphs, metrics):
+                if block["type"] == "paragraph":
                     paragraph_texts.append({
-                        "paragraph": i + 1,
-                        "text": para_text
+                        "paragraph": block["paragraph"],
+                        "text": block["text"]
                     })
-                    extracted_text += f"{para_text}\n\n"
-                    processed_paragraphs += 1
-                    
-            except Exception as para_error:
-                paragraph_texts.append({
-                    "paragraph": i + 1,
-                    "text": f"[Error extracting text from paragraph {i + 1}: {str(para_error)}]"
-                })
-                extracted_text += f"[Error extracting paragraph {i + 1}]\n\n"
-        
-        # Also extract text from tables if present
-        table_text = ""
-        table_count = 0
+                    if "error" in block:
+                        paragraph_parts.append(f"[Error extracting paragraph {block['paragraph']}]\n\n")
+                    else:
+                        paragraph_parts.append(f"{block['text']}\n\n")
+                        processed_paragraphs += 1
+                elif block["type"] == "table":
+                    table_count += 1
+                    rows = f"{block['text']}\n" if block["text"] else ""
+                    table_parts.append(f"\n--- Table {block['table']} ---\n{rows}\n")
+                else:
+                    ocr_parts.append(f"\n[OCR from Image {block['image']}]\n{block['text']}\n")
         
-        for table in doc.tables:
-            table_count += 1
-            table_text += f"\n--- Table {table_count} ---\n"
-            
-            for row in table.rows:
-                row_text = " | ".join(cell.text.strip() for cell in row.cells)
-                if row_text.strip():
-                    table_text += f"{row_text}\n"
-            
-            table_text += "\n"
+        extracted_text = "".join(paragraph_parts)
         
         # Combine paragraph and table text
+        table_text = "".join(table_parts)
         if table_text.strip():
             extracted_text += f"\n{table_text}"
         
         # Add OCR text from images if any was found
+        ocr_text = "".join(ocr_parts)
         if ocr_text.strip():
             extracted_text += f"\n{ocr_text}"
         
         # Clean up the text
-        cleaned_text = extracted_text.strip()
-        if cleaned_text:
+        metrics.count("paragraphs", processed_paragraphs)
+        metrics.count("tables", table_count)
+        
+        with metrics.stage("normalize", characters=len(extracted_text)):
             # Normalize excessive whitespace but preserve paragraph breaks
-            lines = []
-            for line in cleaned_text.split('\n'):
-                cleaned_line = line.strip()
-                if cleaned_line or (lines and lines[-1]):  # Keep empty lines only if preceded by content
-                    lines.append(cleaned_line)
-            cleaned_text = '\n'.join(lines)
+            cleaned_text = normalize_text(extracted_text, keep_blank_lines=True)
         
         return {
             "success": True,
@@ -195,49 +261,134 @@ def extract_text_from_docx(docx_path, max_paragraphs=1000):
             "paragraphTexts": paragraph_texts,
             "hasText": bool(cleaned_text.strip()),
             "ocrAvailable": OCR_AVAILABLE,
-            "ocrTextFound": bool(ocr_text.strip())
+            "ocrTextFound": bool(ocr_text.strip()),
+            "timings": metrics.as_dict()
         }
         
-    except FileNotFoundError:
+    except Exception as e:
         return {
             "success": False,
-            "error": f"Word document not found: {docx_path}",
+            "error": describe_docx_error(e, docx_path),
             "text": "",
             "paragraphCount": 0
         }
+
+def describe_docx_error(error, docx_path):
+    """
+    Build a user-facing message for an exception raised while reading a Word document.
+    
+    Args:
+        error (Exception): The exception that was raised
+        docx_path (str): Path to the .docx file
+        
+    Returns:
+        str: Error message
+    """
+    if isinstance(error, FileNotFoundError):
+        return f"Word document not found: {docx_path}"
+    
+    error_msg = str(error)
+    if "not a zip file" in error_msg.lower():
+        return "Invalid Word document format. Please ensure the file is a valid .docx file (not .doc)."
+    elif "permission" in error_msg.lower():
+        return f"Permission denied accessing file: {docx_path}"
+    else:
+        return f"Unexpected error processing Word document: {error_msg}"
+
+def stream_text_from_docx(docx_path, max_paragraphs=None, out=None, metrics=None):
+    """
+    Write Word document blocks as NDJSON, one JSON object per line, as they are extracted.
+    
+    Each paragraph, table and OCR block is flushed as soon as it is produced so a
+    downstream reader (e.g. the chunker) can start before extraction finishes. A final
+    "summary" line carries the document counts; failures are reported as an "error" line.
+    
+    Args:
+        docx_path (str): Path to the .docx file
+        max_paragraphs (int): Optional maximum number of paragraphs to process (None for all)
+        out: Text stream to write to (defaults to stdout)
+        metrics (DocumentMetrics): Optional metrics; reported in the summary line
+        
+    Returns:
+        bool: True if the document was processed successfully
+    """
+    out = out or sys.stdout
+    metrics = metrics or DocumentMetrics("docx", logger)
+    
+    def emit(record):
+        out.write(json.dumps(record) + "\n")
+        out.flush()
+    
+    try:
+        metrics.count("bytes", os.path.getsize(docx_path))
+        with metrics.stage("parse"):
+            doc = Document(docx_path)
+        
+        counts = {"paragraph": 0, "table": 0, "ocr": 0}
+        error_paragraphs = 0
+        characters = 0
+        for block in iter_docx_blocks(doc, max_paragraphs, metrics):
+            counts[block["type"]] += 1
+            if block["type"] == "paragraph" and "error" in block:
+                error_paragraphs += 1
+            characters += len(block["text"])
+            emit(block)
+        
+        # As in batch mode, paragraphs that failed to extract are not counted as processed
+        processed_paragraphs = counts["paragraph"] - error_paragraphs
+        metrics.count("paragraphs", processed_paragraphs)
+        metrics.count("tables", counts["table"])
+        emit({
+            "type": "summary",
+            "success": True,
+            "paragraphCount": len(doc.paragraphs),
+            "processedParagraphs": processed_paragraphs,
+            "errorParagraphs": error_paragraphs,
+            "tableCount": counts["table"],
+            "ocrBlockCount": counts["ocr"],
+            "blockCount": sum(counts.values()),
+            "characterCount": characters,
+            "hasText": characters > 0,
+            "ocrAvailable": OCR_AVAILABLE,
+            "ocrTextFound": counts["ocr"] > 0,
+            "timings": metrics.as_dict()
+        })
+        return True
+        
     except Exception as e:
-        error_msg = str(e)
-        if "not a zip file" in error_msg.lower():
-            return {
-                "success": False,
-                "error": "Invalid Word document format. Please ensure the file is a valid .docx file (not .doc).",
-                "text": "",
-                "paragraphCount": 0
-            }
-        elif "permission" in error_msg.lower():
-            return {
-                "success": False,
-                "error": f"Permission denied accessing file: {docx_path}",
-                "text": "",
-                "paragraphCount": 0
-            }
-        else:
-            return {
-                "success": False,
-                "error": f"Unexpected error processing Word document: {error_msg}",
-                "text": "",
-                "paragraphCount": 0
-            }
+        emit({
+            "type": "error",
+            "success": False,
+            "error": describe_docx_error(e, docx_path)
+        })
+        return False
 
 def main():
     parser = argparse.ArgumentParser(description='Extract text from Microsoft Word (.docx) files')
     parser.add_argument('docx_path', help='Path to the .docx file')
-    parser.add_argument('--max-paragraphs', type=int, default=1000, help='Maximum paragraphs to process')
+    parser.add_argument('--max-paragraphs', type=int, default=None, help='Maximum paragraphs to process (default: all)')
+    parser.add_argument('--stream', action='store_true', help='Stream paragraph, table and OCR blocks as NDJSON')
+    add_logging_arguments(parser)
+    add_metrics_arguments(parser)
+    add_output_arguments(parser)
     
     args = parser.parse_args()
+    configure_logging(args.log_level, args.log_json)
+    
+    metrics = DocumentMetrics("docx", logger)
+    metrics.record_startup()
+    if args.profile_memory:
+        metrics.enable_memory_profiling()
+    
+    if args.stream:
+        success = stream_text_from_docx(args.docx_path, args.max_paragraphs, metrics=metrics)
+        if args.metrics_file:
+            metrics.write(args.metrics_file, args.metrics_format, success=success)
+        sys.exit(0 if success else 1)
     
-    result = extract_text_from_docx(args.docx_path, args.max_paragraphs)
-    print(json.dumps(result, indent=2))
+    result = extract_text_from_docx(args.docx_path, args.max_paragraphs, metrics)
+    write_output(serialize_result(result, metrics, args.metrics_file, args.metrics_format,
+                                 output_format=args.output_format, indent=2))
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,517 @@
+#!/usr/bin/env python3
+"""
+Batched Embedding Client for the Local Ollama Model
+Feeds chunk_text.py / ingest_pipeline.py chunks to Ollama's nomic-embed-text in
+batches (/api/embed takes a list of inputs), keeps a bounded number of requests in
+flight over a pool of keep-alive connections, retries failed requests with
+exponential backoff, and streams each embedding as an NDJSON line as soon as its
+batch returns. The `stub` command serves the same endpoints locally with
+deterministic vectors and configurable latency and failures, for tests and
+benchmarks without a model.
+"""
+
+import os
+import sys
+import json
+import time
+import array
+import random
+import asyncio
+import sqlite3
+import argparse
+import threading
+import concurrent.futures
+from urllib.parse import urlsplit
+
+from processor_output import iter_chunks
+from embedding_cache import EmbeddingCache, DEFAULT_CACHE_PATH, DEFAULT_MAX_MB
+from segs_loader import stand_in_embedding
+
+DEFAULT_BASE_URL = os.environ.get("OLLAMA_BASE_URL", "http://localhost:11434")
+DEFAULT_MODEL = "nomic-embed-text"
+DEFAULT_BATCH_SIZE = 32
+DEFAULT_CONCURRENCY = 4
+DEFAULT_MAX_RETRIES = 4
+DEFAULT_BACKOFF_SECONDS = 0.5
+DEFAULT_TIMEOUT_SECONDS = 120
+
+# A partial batch is sent once no new chunk has arrived for this long
+BATCH_IDLE_SECONDS = 0.05
+
+BATCH_ENDPOINT = "/api/embed"
+# Older Ollama releases only have the one-prompt-per-request endpoint
+SINGLE_ENDPOINT = "/api/embeddings"
+
+# Statuses worth retrying; anything else is reported as an error straight away
+RETRY_STATUSES = {408, 429, 500, 502, 503, 504}
+
+class EmbeddingRequestError(Exception):
+    """An embedding request failed and will not be retried (any more)."""
+
+    def __init__(self, message, status=None):
+        super().__init__(message)
+        self.status = status
+
+# Returned by BackgroundReader.get() once the input is exhausted
+READ_END = object()
+
+class BackgroundReader:
+    """
+    Reads a blocking iterable (such as iter_chunks() over piped NDJSON) on a daemon
+    thread into a bounded asyncio queue, so waiting for input never blocks the event
+    loop. get() returns READ_END, or raises the iterable's exception, once it ends.
+    """
+
+    def __init__(self, iterable, maxsize):
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue(maxsize)
+        self._stopped = threading.Event()
+        threading.Thread(target=self._feed, args=(iter(iterable),), daemon=True).start()
+
+    def _put(self, item):
+        future = asyncio.run_coroutine_threadsafe(self._queue.put(item), self._loop)
+        while True:
+            try:
+                future.result(timeout=0.1)
+                return True
+            except concurrent.futures.TimeoutError:
+                if self._stopped.is_set():
+                    future.cancel()
+                    return False
+
+    def _feed(self, items):
+        try:
+            for item in items:
+                if not self._put((item, None)):
+                    return
+            self._put((READ_END, None))
+        except Exception as e:
+            self._put((None, e))
+
+    async def get(self):
+        item, error = await self._queue.get()
+        if error is not None:
+            raise error
+        return item
+
+    def close(self):
+        """Stop reading; the thread exits at its next item (or at exit if blocked on input)."""
+        self._stopped.set()
+
+async def read_http_response(reader):
+    """
+    Read one HTTP/1.1 response.
+
+    Returns:
+        tuple: (status code, headers dict with lower-case names, body bytes)
+    """
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError("Connection closed before a response was received")
+    status = int(status_line.split(b" ", 2)[1])
+
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    if headers.get("transfer-encoding", "").lower() == "chunked":
+        parts = []
+        while True:
+            size = int((await reader.readline()).split(b";", 1)[0], 16)
+            if size == 0:
+                await reader.readline()
+                break
+            parts.append(await reader.readexactly(size))
+            await reader.readexactly(2)
+        body = b"".join(parts)
+    elif "content-length" in headers:
+        body = await reader.readexactly(int(headers["content-length"]))
+    else:
+        body = await reader.read()
+        headers["connection"] = "close"
+    return status, headers, body
+
+class ConnectionPool:
+    """Keep-alive HTTP/1.1 connections to one host, reused across requests."""
+
+    def __init__(self, base_url):
+        parts = urlsplit(base_url)
+        self.host = parts.hostname or "localhost"
+        self.ssl = parts.scheme == "https"
+        self.port = parts.port or (443 if self.ssl else 80)
+        self.base_path = parts.path.rstrip("/")
+        self._idle = []
+        self.opened = 0
+
+    async def _connect(self):
+        self.opened += 1
+        return await asyncio.open_connection(self.host, self.port, ssl=self.ssl or None)
+
+    async def post_json(self, path, payload, timeout):
+        """
+        POST a JSON body and return (status, body bytes).
+
+        A connection that turns out to be closed by the server while idle is
+        replaced once; other connection errors propagate.
+        """
+        body = json.dumps(payload).encode("utf-8")
+        request = (
+            f"POST {self.base_path}{path} HTTP/1.1\r\n"
+            f"Host: {self.host}:{self.port}\r\n"
+            "Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            "Connection: keep-alive\r\n\r\n"
+        ).encode("latin-1") + body
+
+        reused = bool(self._idle)
+        reader, writer = self._idle.pop() if reused else await self._connect()
+        try:
+            writer.write(request)
+            await writer.drain()
+            status, headers, response = await asyncio.wait_for(read_http_response(reader), timeout)
+        except (ConnectionError, asyncio.IncompleteReadError) as e:
+            writer.close()
+            if not reused:
+                raise ConnectionError(str(e)) from e
+            return await self.post_json(path, payload, timeout)
+        except BaseException:
+            writer.close()
+            raise
+
+        if headers.get("connection", "").lower() == "close":
+            writer.close()
+        else:
+            self._idle.append((reader, writer))
+        return status, response
+
+    async def close(self):
+        for _, writer in self._idle:
+            writer.close()
+        self._idle.clear()
+
+class OllamaEmbedClient:
+    """
+    Embeds batches of texts with at most `concurrency` requests in flight.
+
+    Counters for the run (batches, requests, retries, cache hits) are in self.stats;
+    connections opened are in self.pool.opened.
+    """
+
+    def __init__(self, base_url=DEFAULT_BASE_URL, model=DEFAULT_MODEL, concurrency=DEFAULT_CONCURRENCY,
+                 max_retries=DEFAULT_MAX_RETRIES, backoff=DEFAULT_BACKOFF_SECONDS, timeout=DEFAULT_TIMEOUT_SECONDS):
+        self.model = model
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.concurrency = concurrency
+        self.pool = ConnectionPool(base_url)
+        self._slots = asyncio.Semaphore(concurrency)
+        self._batch_endpoint = True
+        self.stats = {"batches": 0, "requests": 0, "retries": 0, "cacheHits": 0}
+
+    async def _request(self, path, payload):
+        """POST with retries; returns the parsed JSON response."""
+        attempt = 0
+        while True:
+            try:
+                async with self._slots:
+                    self.stats["requests"] += 1
+                    status, body = await self.pool.post_json(path, payload, self.timeout)
+                if status == 200:
+                    return json.loads(body)
+                error = EmbeddingRequestError(f"{path} returned HTTP {status}: {body[:200].decode('utf-8', 'replace')}", status)
+                if status not in RETRY_STATUSES:
+                    raise error
+            except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError) as e:
+                error = EmbeddingRequestError(f"{path} request failed: {str(e) or type(e).__name__}")
+
+            if attempt >= self.max_retries:
+                raise error
+            # Exponential backoff with jitter so retries from concurrent batches spread out
+            await asyncio.sleep(self.backoff * (2 ** attempt) * (0.5 + random.random()))
+            attempt += 1
+            self.stats["retries"] += 1
+
+    async def embed(self, texts):
+        """
+        Embed a batch of texts.
+
+        Returns:
+            list: One vector (list of floats) per text, in order
+        """
+        if self._batch_endpoint:
+            try:
+                response = await self._request(BATCH_ENDPOINT, {"model": self.model, "input": texts})
+                return response["embeddings"]
+            except EmbeddingRequestError as e:
+                if e.status != 404:
+                    raise
+                self._batch_endpoint = False
+        responses = await asyncio.gather(*(
+            self._request(SINGLE_ENDPOINT, {"model": self.model, "prompt": text}) for text in texts
+        ))
+        return [response["embedding"] for response in responses]
+
+    async def embed_chunks(self, chunks, batch_size=DEFAULT_BATCH_SIZE, cache=None):
+        """
+        Embed chunks, yielding results as each batch completes.
+
+        Input is read on a background thread, so a slow producer (piped NDJSON) never
+        stalls responses, retries or timeouts, and a partial batch is sent once no
+        chunk has arrived for BATCH_IDLE_SECONDS. At most concurrency + 1 batches are
+        read ahead of the responses, so memory stays bounded however long the input is.
+
+        With a cache, each group of chunks read is looked up before it is batched:
+        hits are yielded straight away, only misses are sent, and their vectors are
+        stored when their batch returns.
+
+        Args:
+            chunks (iterable): Chunk dicts with "id" and "text"
+            batch_size (int): Texts per request
+            cache (EmbeddingCache): Optional cache for this client's model
+
+        Yields:
+            tuple: (chunks of one batch, their vectors), in completion order
+        """
+        reader = BackgroundReader(chunks, batch_size)
+        pending = set()
+        unresolved = []
+        batch = []
+        read = None
+        exhausted = False
+        last_read = time.monotonic()
+        try:
+            while True:
+                idle = exhausted or time.monotonic() - last_read >= BATCH_IDLE_SECONDS
+                if unresolved and (len(unresolved) >= batch_size or idle):
+                    found = cache.get_many([chunk["text"] for chunk in unresolved])
+                    if found:
+                        self.stats["cacheHits"] += len(found)
+                        yield ([unresolved[position] for position in sorted(found)],
+                               [list(memoryview(found[position]).cast("f")) for position in sorted(found)])
+                    batch.extend(chunk for position, chunk in enumerate(unresolved) if position not in found)
+                    unresolved = []
+                while batch and len(pending) <= self.concurrency and (len(batch) >= batch_size or idle):
+                    pending.add(asyncio.ensure_future(self._embed_batch(batch[:batch_size], cache)))
+                    batch = batch[batch_size:]
+                if read is None and not exhausted and len(pending) <= self.concurrency and len(batch) < batch_size:
+                    read = asyncio.ensure_future(reader.get())
+                waiting = pending | {read} if read else pending
+                if not waiting:
+                    return
+
+                timeout = max(0.0, last_read + BATCH_IDLE_SECONDS - time.monotonic()) \
+                    if (batch or unresolved) and not exhausted else None
+                done, pending = await asyncio.wait(waiting, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if read is not None:
+                    pending.discard(read)
+                    if read in done:
+                        done.discard(read)
+                        chunk, read = read.result(), None
+                        if chunk is READ_END:
+                            exhausted = True
+                        else:
+                            (unresolved if cache is not None else batch).append(chunk)
+                            last_read = time.monotonic()
+                # Retrieve every exception so failures beyond the first are not logged as unhandled
+                failed = [task.exception() for task in done if task.exception() is not None]
+                if failed:
+                    raise failed[0]
+                for task in done:
+                    yield task.result()
+        finally:
+            reader.close()
+            for task in pending | ({read} if read else set()):
+                task.cancel()
+
+    async def _embed_batch(self, batch, cache=None):
+        self.stats["batches"] += 1
+        vectors = await self.embed([chunk["text"] for chunk in batch])
+        if cache is not None:
+            cache.put_many((chunk["text"], array.array("f", vector).tobytes()) for chunk, vector in zip(batch, vectors))
+        return batch, vectors
+
+    async def close(self):
+        await self.pool.close()
+
+async def embed_stream(chunks, out, base_url, model, batch_size, concurrency, max_retries, backoff, timeout,
+                       cache=None):
+    """
+    Embed chunks and write one {"type": "embedding", "id", "embedding"} NDJSON line
+    per chunk, then a "summary" line; a failure is reported as an "error" line.
+    With a cache, previously embedded chunk text is not sent to the model again.
+
+    Returns:
+        bool: True if every chunk was embedded
+    """
+    def emit(record):
+        out.write(json.dumps(record) + "\n")
+        out.flush()
+
+    start = time.perf_counter()
+    client = OllamaEmbedClient(base_url, model, concurrency, max_retries, backoff, timeout)
+    embedded = 0
+    dimensions = None
+    try:
+        async for batch, vectors in client.embed_chunks(chunks, batch_size, cache):
+            for chunk, vector in zip(batch, vectors):
+                emit({"type": "embedding", "id": chunk["id"], "embedding": vector})
+            embedded += len(batch)
+            dimensions = dimensions or (len(vectors[0]) if vectors else None)
+    except (EmbeddingRequestError, ValueError, KeyError) as e:
+        emit({"type": "error", "success": False, "error": str(e), "embedded": embedded})
+        return False
+    finally:
+        await client.close()
+
+    seconds = time.perf_counter() - start
+    summary = {
+        "type": "summary",
+        "success": True,
+        "model": model,
+        "embedded": embedded,
+        "dimensions": dimensions,
+        "batches": client.stats["batches"],
+        "requests": client.stats["requests"],
+        "retries": client.stats["retries"],
+        "connections": client.pool.opened,
+        "seconds": round(seconds, 3),
+        "chunksPerSecond": round(embedded / seconds, 1) if seconds > 0 else None
+    }
+    if cache is not None:
+        summary["cache"] = {"hits": client.stats["cacheHits"], **cache.stats()}
+    emit(summary)
+    return True
+
+async def serve_stub(host, port, request_ms, per_text_ms, fail_rate, seed=0):
+    """
+    Serve /api/embed and /api/embeddings with stand-in vectors.
+
+    Each request waits request_ms (per-request overhead, overlapping between
+    requests) and then per_text_ms per input while holding a single model lock, so
+    throughput is bounded the way one local model is. A fail_rate fraction of
+    requests answers HTTP 503 to exercise retries.
+    """
+    model_lock = asyncio.Lock()
+    rng = random.Random(seed)
+
+    async def handle(reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                _, path, _ = request_line.decode("latin-1").split(" ", 2)
+                length = 0
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    if name.strip().lower() == "content-length":
+                        length = int(value)
+                payload = json.loads(await reader.readexactly(length)) if length else {}
+
+                await asyncio.sleep(request_ms / 1000)
+                if path not in (BATCH_ENDPOINT, SINGLE_ENDPOINT):
+                    status, response = 404, {"error": "not found"}
+                elif rng.random() < fail_rate:
+                    status, response = 503, {"error": "stub failure"}
+                else:
+                    texts = payload.get("input", []) if path == BATCH_ENDPOINT else [payload.get("prompt", "")]
+                    texts = [texts] if isinstance(texts, str) else texts
+                    async with model_lock:
+                        await asyncio.sleep(per_text_ms * len(texts) / 1000)
+                    vectors = [list(memoryview(stand_in_embedding(text)).cast("f")) for text in texts]
+                    status = 200
+                    response = {"model": payload.get("model"), "embeddings": vectors} if path == BATCH_ENDPOINT \
+                        else {"embedding": vectors[0]}
+
+                body = json.dumps(response).encode("utf-8")
+                writer.write(
+                    f"HTTP/1.1 {status} {'OK' if status == 200 else 'Error'}\r\n"
+                    "Content-Type: application/json\r\n"
+                    f"Content-Length: {len(body)}\r\n\r\n".encode("latin-1") + body
+                )
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    server = await asyncio.start_server(handle, host, port)
+    print(json.dumps({"success": True, "listening": f"http://{host}:{server.sockets[0].getsockname()[1]}"}), flush=True)
+    async with server:
+        await server.serve_forever()
+
+def main():
+    parser = argparse.ArgumentParser(description='Embed chunks with the local Ollama model in concurrent batches, or run a stub server')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    embed_parser = subparsers.add_parser('embed', help='Embed chunks and stream the vectors as NDJSON')
+    embed_parser.add_argument('chunks', help='chunk_text.py JSON or ingest_pipeline.py --stream NDJSON file ("-" for stdin)')
+    embed_parser.add_argument('--base-url', default=DEFAULT_BASE_URL, help='Ollama server (default: $OLLAMA_BASE_URL or localhost:11434)')
+    embed_parser.add_argument('--model', default=DEFAULT_MODEL, help='Embedding model')
+    embed_parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE, help='Texts per request')
+    embed_parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY, help='Requests in flight')
+    embed_parser.add_argument('--max-retries', type=int, default=DEFAULT_MAX_RETRIES, help='Retries per request')
+    embed_parser.add_argument('--backoff', type=float, default=DEFAULT_BACKOFF_SECONDS, help='First retry delay in seconds, doubled per retry')
+    embed_parser.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT_SECONDS, help='Seconds to wait for a response')
+    embed_parser.add_argument('--embedding-cache', nargs='?', const=DEFAULT_CACHE_PATH, default=None, metavar='PATH',
+                              help=f'Reuse embeddings of previously seen chunk text from this cache (default path: {DEFAULT_CACHE_PATH})')
+    embed_parser.add_argument('--cache-max-mb', type=float, default=DEFAULT_MAX_MB, help='Embedding cache size limit in megabytes')
+
+    stub_parser = subparsers.add_parser('stub', help='Serve stand-in embeddings on the Ollama endpoints')
+    stub_parser.add_argument('--host', default='127.0.0.1', help='Address to listen on')
+    stub_parser.add_argument('--port', type=int, default=11435, help='Port (0 for any free port)')
+    stub_parser.add_argument('--request-ms', type=float, default=20.0, help='Per-request overhead in milliseconds')
+    stub_parser.add_argument('--per-text-ms', type=float, default=2.0, help='Model time per input in milliseconds')
+    stub_parser.add_argument('--fail-rate', type=float, default=0.0, help='Fraction of requests answered with HTTP 503')
+
+    args = parser.parse_args()
+
+    def fail(message):
+        print(json.dumps({"success": False, "error": message}))
+        sys.exit(1)
+
+    if args.command == "stub":
+        try:
+            asyncio.run(serve_stub(args.host, args.port, args.request_ms, args.per_text_ms, args.fail_rate))
+        except KeyboardInterrupt:
+            pass
+        except OSError as e:
+            fail(f"Could not start stub server: {str(e)}")
+        return
+
+    if args.batch_size <= 0 or args.concurrency <= 0:
+        fail("Batch size and concurrency must be greater than 0")
+
+    try:
+        stream = sys.stdin.buffer if args.chunks == "-" else open(args.chunks, "rb")
+    except OSError as e:
+        fail(f"Could not read chunks: {str(e)}")
+
+    try:
+        cache = EmbeddingCache(args.embedding_cache, args.model, int(args.cache_max_mb * 1024 * 1024)) \
+            if args.embedding_cache else None
+    except sqlite3.Error as e:
+        fail(f"Could not open the embedding cache: {str(e)}")
+
+    with stream:
+        try:
+            succeeded = asyncio.run(embed_stream(
+                iter_chunks(stream), sys.stdout, args.base_url, args.model, args.batch_size,
+                args.concurrency, args.max_retries, args.backoff, args.timeout, cache
+            ))
+        finally:
+            if cache is not None:
+                cache.close()
+    if not succeeded:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
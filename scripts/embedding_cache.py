@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Persistent Embedding Cache Keyed by Chunk Content
+Maps sha256(model name, chunk text) to the embedding vector in a SQLite file, so a
+re-chunked or re-uploaded document only pays for text that has not been embedded
+before. Vectors are stored as float32 bytes; the least recently used entries are
+evicted once the cache grows past its size limit, and hit/miss counts are kept for
+the lifetime of the file.
+"""
+
+import sys
+import json
+import time
+import sqlite3
+import hashlib
+import argparse
+from pathlib import Path
+
+DEFAULT_CACHE_PATH = "temp/embedding-cache.db"
+DEFAULT_MAX_MB = 512
+
+# After an eviction the cache is brought down to this fraction of its limit, so a
+# full cache is not trimmed again on every write
+EVICTION_TARGET = 0.9
+
+# Keys per IN (...) lookup, under SQLite's bound-parameter limit
+LOOKUP_BATCH = 500
+
+SCHEMA = """
+create table if not exists embeddings (
+    key blob primary key,
+    model text not null,
+    vector blob not null,
+    last_used real not null
+) without rowid;
+create index if not exists embeddings_last_used on embeddings (last_used);
+create table if not exists cache_stats (
+    name text primary key,
+    value integer not null
+);
+"""
+
+STAT_NAMES = ("hits", "misses", "stores", "evictions")
+
+def content_key(model, text):
+    """sha256 digest identifying one text embedded by one model."""
+    return hashlib.sha256(f"{model}\0{text}".encode("utf-8", "surrogatepass")).digest()
+
+class EmbeddingCache:
+    """
+    SQLite-backed cache of embedding vectors for one model.
+
+    Use get_many() before embedding and put_many() with the new vectors afterwards;
+    counters for the current session are in self.session.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, model="", max_bytes=DEFAULT_MAX_MB * 1024 * 1024):
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.model = model
+        self.max_bytes = max_bytes
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("pragma journal_mode = wal")
+        self.connection.execute("pragma synchronous = normal")
+        self.connection.executescript(SCHEMA)
+        self.session = dict.fromkeys(STAT_NAMES, 0)
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def get_many(self, texts):
+        """
+        Look up cached vectors.
+
+        Args:
+            texts (list): Chunk texts, exactly as they are sent to the model
+
+        Returns:
+            dict: Position in texts -> float32 vector bytes, for the hits only
+        """
+        text_keys = [content_key(self.model, text) for text in texts]
+        positions = {}
+        for position, key in enumerate(text_keys):
+            positions.setdefault(key, []).append(position)
+
+        found = {}
+        keys = list(positions)
+        for start in range(0, len(keys), LOOKUP_BATCH):
+            batch = keys[start:start + LOOKUP_BATCH]
+            placeholders = ",".join("?" * len(batch))
+            for key, vector in self.connection.execute(
+                    f"select key, vector from embeddings where key in ({placeholders})", batch):
+                for position in positions[key]:
+                    found[position] = vector
+
+        if found:
+            now = time.time()
+            self.connection.executemany("update embeddings set last_used = ? where key = ?",
+                                        [(now, key) for key in {text_keys[position] for position in found}])
+        self._count(hits=len(found), misses=len(texts) - len(found))
+        self.connection.commit()
+        return found
+
+    def put_many(self, items):
+        """
+        Store newly computed vectors, then evict if the cache is over its limit.
+
+        Args:
+            items (iterable): (text, float32 vector bytes) pairs
+
+        Returns:
+            int: Number of vectors stored
+        """
+        now = time.time()
+        rows = [(content_key(self.model, text), self.model, bytes(vector), now) for text, vector in items]
+        self.connection.executemany(
+            "insert or replace into embeddings (key, model, vector, last_used) values (?, ?, ?, ?)", rows)
+        self._count(stores=len(rows))
+        self.connection.commit()
+        self.evict()
+        return len(rows)
+
+    def size_bytes(self):
+        """Bytes of stored vectors (keys and page overhead excluded)."""
+        return self.connection.execute("select coalesce(sum(length(vector)), 0) from embeddings").fetchone()[0]
+
+    def evict(self, max_bytes=None):
+        """
+        Drop least recently used entries until the cache is under EVICTION_TARGET of
+        its limit; does nothing while it is within the limit.
+
+        Returns:
+            int: Number of entries removed
+        """
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+        size = self.size_bytes()
+        if size <= max_bytes:
+            return 0
+        excess = size - int(max_bytes * EVICTION_TARGET)
+        freed = 0
+        stale = []
+        cursor = self.connection.execute("select key, length(vector) from embeddings order by last_used")
+        for key, length in cursor:
+            stale.append((key,))
+            freed += length
+            if freed >= excess:
+                break
+        cursor.close()
+        self.connection.executemany("delete from embeddings where key = ?", stale)
+        self._count(evictions=len(stale))
+        self.connection.commit()
+        return len(stale)
+
+    def _count(self, **increments):
+        for name, amount in increments.items():
+            self.session[name] += amount
+        self.connection.executemany(
+            "insert into cache_stats (name, value) values (?, ?) "
+            "on conflict (name) do update set value = value + excluded.value",
+            [(name, amount) for name, amount in increments.items() if amount])
+
+    def stats(self):
+        """Entry count, size, and hit rates for this session and the file's lifetime."""
+        totals = dict.fromkeys(STAT_NAMES, 0)
+        totals.update(self.connection.execute("select name, value from cache_stats"))
+        entries = self.connection.execute("select count(*) from embeddings").fetchone()[0]
+
+        def hit_rate(counts):
+            lookups = counts["hits"] + counts["misses"]
+            return round(counts["hits"] / lookups, 4) if lookups else None
+
+        return {
+            "path": str(self.path),
+            "entries": entries,
+            "sizeBytes": self.size_bytes(),
+            "maxBytes": self.max_bytes,
+            "session": {**self.session, "hitRate": hit_rate(self.session)},
+            "lifetime": {**totals, "hitRate": hit_rate(totals)}
+        }
+
+def main():
+    parser = argparse.ArgumentParser(description='Inspect or trim the embedding cache used by segs_loader.py, embed_client.py and retrieval_eval.py')
+    parser.add_argument('command', choices=['stats', 'evict'], help='Report size and hit rates, or evict down to --max-mb')
+    parser.add_argument('--cache-path', default=DEFAULT_CACHE_PATH, help='Cache database file')
+    parser.add_argument('--max-mb', type=float, default=DEFAULT_MAX_MB, help='Size limit in megabytes')
+
+    args = parser.parse_args()
+
+    def fail(message):
+        print(json.dumps({"success": False, "error": message}))
+        sys.exit(1)
+
+    if not Path(args.cache_path).exists():
+        fail(f"Cache not found: {args.cache_path}")
+
+    try:
+        with EmbeddingCache(args.cache_path, max_bytes=int(args.max_mb * 1024 * 1024)) as cache:
+            result = {"success": True}
+            if args.command == "evict":
+                result["evicted"] = cache.evict()
+            result.update(cache.stats())
+    except sqlite3.Error as e:
+        fail(f"Could not read cache: {str(e)}")
+    print(json.dumps(result, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,385 @@
+#!/usr/bin/env python3
+"""
+HTML Text Extraction Script
+Extracts readable text from HTML exports with an incremental parser fed in fixed-size
+pieces, dropping boilerplate (scripts, styles, navigation, page headers/footers, sidebars,
+cookie banners, forms) and emitting headings, paragraphs and tables as blocks.
+"""
+
+import re
+import sys
+import json
+import codecs
+import argparse
+import os
+import logging
+from html.parser import HTMLParser
+
+from processor_log import get_logger, configure_logging, add_logging_arguments, log_event
+from processor_metrics import DocumentMetrics, add_metrics_arguments, serialize_result
+from processor_output import add_output_arguments, write_output
+
+logger = get_logger("html")
+
+# Characters fed to the parser at a time
+READ_CHUNK_CHARS = 64 * 1024
+
+# Bytes searched for a <meta charset> declaration
+CHARSET_WINDOW = 4096
+
+# Elements whose content is never document text
+SKIPPED_TAGS = {
+    "script", "style", "noscript", "template", "svg", "canvas", "iframe", "object",
+    "nav", "aside", "form", "button", "select"
+}
+
+# Page banners and footers, unless they belong to a piece of content (an article's
+# own header with its title, a section's footer)
+PAGE_CHROME_TAGS = {"header", "footer"}
+CONTENT_TAGS = {"article", "main", "section"}
+
+# ARIA landmark roles that mark page chrome rather than content
+BOILERPLATE_ROLES = {"navigation", "banner", "contentinfo", "complementary", "search"}
+
+# class/id words that mark page chrome on generic containers
+BOILERPLATE_WORDS = {
+    "nav", "navbar", "navigation", "menu", "sidebar", "footer", "cookie", "cookies",
+    "breadcrumb", "breadcrumbs", "advert", "ads", "share", "social", "newsletter"
+}
+
+# Elements that never have an end tag, so dropping one must not start a skipped region
+VOID_TAGS = {
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta",
+    "source", "track", "wbr"
+}
+
+BLOCK_TAGS = {
+    "p", "div", "section", "article", "main", "li", "dd", "dt", "blockquote", "pre",
+    "h1", "h2", "h3", "h4", "h5", "h6", "table", "ul", "ol", "dl", "figure",
+    "figcaption", "address", "hr", "body"
+}
+
+HEADING_TAGS = {"h1": 1, "h2": 2, "h3": 3, "h4": 4, "h5": 5, "h6": 6}
+
+CHARSET_PATTERN = re.compile(rb'<meta[^>]+charset\s*=\s*["\']?([A-Za-z0-9_\-]+)', re.IGNORECASE)
+WHITESPACE = re.compile(r"\s+")
+CELL_PADDING = re.compile(r" *\t *")
+WORD_SPLIT = re.compile(r"[\s\-_]+")
+
+def detect_html_encoding(html_path):
+    """Return the encoding declared in a <meta charset> near the top of the file, or UTF-8."""
+    with open(html_path, 'rb') as file:
+        head = file.read(CHARSET_WINDOW)
+    if head.startswith(codecs.BOM_UTF8):
+        return "utf-8-sig"
+    match = CHARSET_PATTERN.search(head)
+    if match:
+        try:
+            return codecs.lookup(match.group(1).decode("ascii")).name
+        except LookupError:
+            pass
+    return "utf-8"
+
+def is_boilerplate(tag, attrs, in_content=False):
+    """
+    True if an element is page chrome that should be dropped with its content.
+
+    Args:
+        tag (str): Element name
+        attrs (list): (name, value) attribute pairs
+        in_content (bool): Whether the element is inside an article, main or section
+    """
+    if tag in SKIPPED_TAGS or (tag in PAGE_CHROME_TAGS and not in_content):
+        return True
+    attributes = dict(attrs)
+    if attributes.get("role") in BOILERPLATE_ROLES or "hidden" in attributes or attributes.get("aria-hidden") == "true":
+        return True
+    words = WORD_SPLIT.split(f"{attributes.get('class') or ''} {attributes.get('id') or ''}".lower())
+    return any(word in BOILERPLATE_WORDS for word in words)
+
+class BlockParser(HTMLParser):
+    """
+    Incremental HTML parser that collects text blocks.
+
+    Completed blocks accumulate in self.blocks; callers drain the list after every
+    feed() so memory is bounded by the largest block, not the document.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.blocks = []
+        self.title = ""
+        self._buffer = []
+        self._kind = ("paragraph", None)
+        self._skip_tag = None
+        self._skip_depth = 0
+        self._in_title = False
+        self._pre_depth = 0
+        self._content_depth = 0
+        self._table_depth = 0
+
+    def flush(self):
+        text = "".join(self._buffer)
+        self._buffer = []
+        kind, level = self._kind
+        if kind == "code":
+            text = "\n".join(line.rstrip() for line in text.strip("\n").split("\n"))
+        else:
+            lines = (CELL_PADDING.sub("\t", line).strip(" \t") for line in text.split("\n"))
+            text = "\n".join(line for line in lines if line)
+        if not text.strip():
+            return
+        block = {"type": kind, "text": text}
+        if level:
+            block["level"] = level
+        self.blocks.append(block)
+
+    def _separate(self):
+        """Keep words of adjacent blocks inside a table cell apart."""
+        if self._buffer and not self._buffer[-1].endswith((" ", "\t", "\n")):
+            self._buffer.append(" ")
+
+    def handle_starttag(self, tag, attrs):
+        if self._skip_tag is not None:
+            if tag == self._skip_tag:
+                self._skip_depth += 1
+            return
+        if tag == "title":
+            self._in_title = True
+            return
+        if is_boilerplate(tag, attrs, self._content_depth > 0):
+            if tag not in VOID_TAGS:
+                self._skip_tag, self._skip_depth = tag, 1
+            return
+        if tag in CONTENT_TAGS:
+            self._content_depth += 1
+
+        if tag == "br":
+            self._buffer.append("\n")
+        elif tag in ("td", "th"):
+            self._buffer.append("\t")
+        elif tag == "tr":
+            self._buffer.append("\n")
+        elif self._table_depth:
+            # Paragraphs, divs and nested tables in cells stay part of the table's rows
+            if tag == "table":
+                self._table_depth += 1
+            if tag in BLOCK_TAGS:
+                self._separate()
+        elif tag in BLOCK_TAGS:
+            self.flush()
+            if tag in HEADING_TAGS:
+                self._kind = ("heading", HEADING_TAGS[tag])
+            elif tag == "table":
+                self._kind = ("table", None)
+                self._table_depth = 1
+            elif tag == "pre":
+                self._kind = ("code", None)
+                self._pre_depth += 1
+
+    def handle_startendtag(self, tag, attrs):
+        if self._skip_tag is None and tag == "br":
+            self._buffer.append("\n")
+
+    def handle_endtag(self, tag):
+        if self._skip_tag is not None:
+            if tag == self._skip_tag:
+                self._skip_depth -= 1
+                if self._skip_depth == 0:
+                    self._skip_tag = None
+            return
+        if tag == "title":
+            self._in_title = False
+            return
+        if tag in CONTENT_TAGS:
+            self._content_depth = max(0, self._content_depth - 1)
+        if self._table_depth:
+            if tag == "table":
+                self._table_depth -= 1
+            if self._table_depth:
+                if tag in BLOCK_TAGS:
+                    self._separate()
+                return
+        if tag in BLOCK_TAGS:
+            self.flush()
+            if tag == "pre":
+                self._pre_depth = max(0, self._pre_depth - 1)
+            self._kind = ("paragraph", None)
+
+    def handle_data(self, data):
+        if self._skip_tag is not None:
+            return
+        if self._in_title:
+            self.title = WHITESPACE.sub(" ", self.title + data).strip()
+            return
+        self._buffer.append(data if self._pre_depth else WHITESPACE.sub(" ", data))
+
+    def close(self):
+        super().close()
+        self.flush()
+
+def iter_html_blocks(html_path, info=None):
+    """
+    Yield text blocks from an HTML file, parsing it in READ_CHUNK_CHARS pieces.
+
+    Args:
+        html_path (str): Path to the HTML file
+        info (dict): Optional dict updated with the page title and encoding
+
+    Yields:
+        dict: {"type": "heading"|"paragraph"|"table"|"code", "position", "text"[, "level"]}
+    """
+    info = info if info is not None else {}
+    info["encoding"] = detect_html_encoding(html_path)
+    parser = BlockParser()
+    position = 0
+
+    with open(html_path, 'r', encoding=info["encoding"], errors="replace") as file:
+        while True:
+            data = file.read(READ_CHUNK_CHARS)
+            if data:
+                parser.feed(data)
+            else:
+                parser.close()
+            for block in parser.blocks:
+                position += 1
+                yield {"type": block.pop("type"), "position": position, **block}
+            parser.blocks = []
+            if not data:
+                break
+
+    info["title"] = parser.title
+
+def describe_html_error(error, html_path):
+    """
+    Build a user-facing message for an exception raised while reading an HTML file.
+
+    Returns:
+        str: Error message
+    """
+    if isinstance(error, FileNotFoundError):
+        return f"HTML file not found: {html_path}"
+    return f"Unexpected error processing HTML file: {str(error)}"
+
+def extract_text_from_html(html_path, metrics=None):
+    """
+    Extract readable text from an HTML file.
+
+    Args:
+        html_path (str): Path to the HTML file
+        metrics (DocumentMetrics): Optional metrics to record stages and counts into
+
+    Returns:
+        dict: Result containing success status, text, title, block counts and timings
+    """
+    metrics = metrics or DocumentMetrics("html", logger)
+    try:
+        metrics.count("bytes", os.path.getsize(html_path))
+        info = {}
+        parts = []
+        headings = 0
+        with metrics.stage("extract"):
+            for block in iter_html_blocks(html_path, info):
+                headings += block["type"] == "heading"
+                parts.append(block["text"])
+
+        text = "\n\n".join(parts)
+        metrics.count("blocks", len(parts))
+        log_event(logger, logging.INFO, "HTML extracted", blocks=len(parts), headings=headings)
+
+        return {
+            "success": True,
+            "text": text,
+            "title": info["title"],
+            "blockCount": len(parts),
+            "headingCount": headings,
+            "hasText": bool(text.strip()),
+            "timings": metrics.as_dict()
+        }
+
+    except Exception as e:
+        return {
+            "success": False,
+            "error": describe_html_error(e, html_path),
+            "text": "",
+            "blockCount": 0
+        }
+
+def stream_text_from_html(html_path, out=None, metrics=None):
+    """
+    Write HTML text blocks as NDJSON, one JSON object per line, as they are parsed.
+
+    A final "summary" line carries the title and counts; failures are reported as an
+    "error" line.
+
+    Returns:
+        bool: True if the file was processed successfully
+    """
+    out = out or sys.stdout
+    metrics = metrics or DocumentMetrics("html", logger)
+
+    def emit(record):
+        out.write(json.dumps(record) + "\n")
+        out.flush()
+
+    try:
+        metrics.count("bytes", os.path.getsize(html_path))
+        info = {}
+        blocks = 0
+        headings = 0
+        characters = 0
+        for block in iter_html_blocks(html_path, info):
+            blocks += 1
+            headings += block["type"] == "heading"
+            characters += len(block["text"])
+            emit(block)
+
+        metrics.count("blocks", blocks)
+        emit({
+            "type": "summary",
+            "success": True,
+            "title": info["title"],
+            "blockCount": blocks,
+            "headingCount": headings,
+            "characterCount": characters,
+            "hasText": characters > 0,
+            "timings": metrics.as_dict()
+        })
+        return True
+
+    except Exception as e:
+        emit({
+            "type": "error",
+            "success": False,
+            "error": describe_html_error(e, html_path)
+        })
+        return False
+
+def main():
+    parser = argparse.ArgumentParser(description='Extract readable text from HTML files')
+    parser.add_argument('html_path', help='Path to the HTML file')
+    parser.add_argument('--stream', action='store_true', help='Stream heading, paragraph and table blocks as NDJSON')
+    add_logging_arguments(parser)
+    add_metrics_arguments(parser)
+    add_output_arguments(parser)
+
+    args = parser.parse_args()
+    configure_logging(args.log_level, args.log_json)
+
+    metrics = DocumentMetrics("html", logger)
+    metrics.record_startup()
+    if args.profile_memory:
+        metrics.enable_memory_profiling()
+
+    if args.stream:
+        success = stream_text_from_html(args.html_path, metrics=metrics)
+        if args.metrics_file:
+            metrics.write(args.metrics_file, args.metrics_format, success=success)
+        sys.exit(0 if success else 1)
+
+    result = extract_text_from_html(args.html_path, metrics)
+    write_output(serialize_result(result, metrics, args.metrics_file, args.metrics_format,
+                                 output_format=args.output_format, indent=2))
+
+if __name__ == "__main__":
+    main()
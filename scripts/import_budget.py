@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Import-Time Budget Check for the Python Scripts
+Starts a fresh interpreter per script with -X importtime, reports how long its
+imports and the whole cold start take and which direct imports cost the most, and
+exits with status 1 when a script's imports exceed its budget.
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import subprocess
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Import-time budgets in milliseconds for each script module. Set with headroom over
+# what the scripts' own dependencies need (python-pptx and openpyxl are the heaviest);
+# a script that starts loading a library it does not use will exceed its budget.
+IMPORT_BUDGETS_MS = {
+    "pdf_processor": 150,
+    "docx_processor": 150,
+    "pptx_processor": 250,
+    "xlsx_processor": 300,
+    "csv_processor": 50,
+    "html_processor": 50,
+    "markdown_processor": 50,
+    "chunk_text": 100,
+    "ingest_pipeline": 100,
+    "bulk_ingest": 100,
+    "segs_loader": 50
+}
+
+def parse_importtime(stderr):
+    """
+    Parse -X importtime output.
+
+    Args:
+        stderr (str): Standard error of an interpreter started with -X importtime
+
+    Returns:
+        list: (module, depth, cumulative microseconds) per imported module, depth 0
+            being modules imported directly by the command
+    """
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[1].strip().isdigit():
+            continue  # Column header
+        name = fields[2][1:]
+        depth = (len(name) - len(name.lstrip(" "))) // 2
+        entries.append((name.strip(), depth, int(fields[1])))
+    return entries
+
+def measure_script(module, python=sys.executable):
+    """
+    Import a script module in a fresh interpreter and time it.
+
+    Args:
+        module (str): Module name of a script in this directory, e.g. "pdf_processor"
+        python (str): Interpreter to run
+
+    Returns:
+        dict: {"importMs", "startupMs", "imports"} where imports lists the script's
+            direct imports as (module, milliseconds) pairs
+    """
+    start = time.perf_counter()
+    completed = subprocess.run(
+        [python, "-X", "importtime", "-c", f"import {module}"],
+        cwd=SCRIPTS_DIR, capture_output=True, text=True
+    )
+    startup = time.perf_counter() - start
+    if completed.returncode != 0:
+        message = completed.stderr.strip().splitlines()
+        raise RuntimeError(message[-1] if message else f"import {module} failed")
+
+    # Children are listed before their parent, so the script's own imports are the
+    # entries between the previous top-level entry and the script's entry; top-level
+    # entries before that come from interpreter start-up (site, .pth files)
+    own_imports = []
+    import_us = 0
+    for name, depth, microseconds in parse_importtime(completed.stderr):
+        if depth == 0:
+            if name == module:
+                import_us = microseconds
+                break
+            own_imports = []
+        elif depth == 1:
+            own_imports.append((name, microseconds / 1000))
+
+    return {
+        "importMs": import_us / 1000,
+        "startupMs": startup * 1000,
+        "imports": own_imports
+    }
+
+def check_script(module, budget_ms, runs=3, top=5):
+    """
+    Measure a script several times (best run counts) and compare it with its budget.
+
+    One unmeasured run comes first so bytecode compilation is not counted.
+
+    Returns:
+        dict: Report entry for the script
+    """
+    try:
+        measure_script(module)
+        measurements = [measure_script(module) for _ in range(max(1, runs))]
+    except RuntimeError as e:
+        return {"script": module, "budgetMs": budget_ms, "withinBudget": False, "error": str(e)}
+
+    best = min(measurements, key=lambda measurement: measurement["importMs"])
+    slowest = sorted(best["imports"], key=lambda item: item[1], reverse=True)[:top]
+    return {
+        "script": module,
+        "importMs": round(best["importMs"], 1),
+        "startupMs": round(min(measurement["startupMs"] for measurement in measurements), 1),
+        "budgetMs": budget_ms,
+        "withinBudget": best["importMs"] <= budget_ms,
+        "slowestImports": [{"module": name, "ms": round(ms, 1)} for name, ms in slowest]
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='Report per-script import and startup times and fail when a script exceeds its import-time budget')
+    parser.add_argument('scripts', nargs='*', help='Script modules to check (default: all budgeted scripts)')
+    parser.add_argument('--budget-ms', type=float, default=None, help='Import-time budget for every script, overriding the defaults')
+    parser.add_argument('--runs', type=int, default=3, help='Measured runs per script (best is reported)')
+    parser.add_argument('--top', type=int, default=5, help='Slowest direct imports to list per script')
+
+    args = parser.parse_args()
+
+    modules = [name[:-3] if name.endswith(".py") else name for name in args.scripts] or list(IMPORT_BUDGETS_MS)
+    unknown = [module for module in modules if args.budget_ms is None and module not in IMPORT_BUDGETS_MS]
+    if unknown:
+        print(json.dumps({
+            "success": False,
+            "error": f"No import budget for: {', '.join(unknown)} (pass --budget-ms)"
+        }))
+        sys.exit(1)
+
+    report = [
+        check_script(module, args.budget_ms if args.budget_ms is not None else IMPORT_BUDGETS_MS[module], args.runs, args.top)
+        for module in modules
+    ]
+    over_budget = [entry["script"] for entry in report if not entry["withinBudget"]]
+
+    print(json.dumps({
+        "success": not over_budget,
+        "python": sys.version.split()[0],
+        "overBudget": over_budget,
+        "scripts": report
+    }, indent=2))
+    sys.exit(1 if over_budget else 0)
+
+if __name__ == "__main__":
+    main()
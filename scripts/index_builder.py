@@ -0,0 +1,473 @@
+#!/usr/bin/env python3
+"""
+Incremental Index Builder for segs
+Keeps a local vector index (quantized_store.py) and keyword index (bm25_index.py)
+in step with the segs table. Each run compares per-document fingerprints with the
+published index, writes the documents that were added or reloaded since as one
+new immutable segment, merges segments when there are too many or they are mostly
+stale, and publishes the result as a new version by atomically replacing the
+CURRENT pointer file. Readers resolve CURRENT once and only read immutable files,
+so they never block on a build or see a partial one.
+
+Layout of the index root:
+
+    CURRENT                 name of the published version, e.g. "v000012"
+    versions/v000012.json   manifest: segments, and which segment serves each document
+    segments/seg-000031/    vectors/ (QuantizedStore), lexical.bm25, chunks.ndjson
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+from pathlib import Path
+
+try:
+    import numpy as np
+except ImportError:
+    print(json.dumps({
+        "success": False,
+        "error": "numpy not installed. Please run: pip install numpy"
+    }))
+    sys.exit(1)
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+from segs_loader import connect_sqlite, connect_oracle, stand_in_embedding
+from quantized_store import QuantizedStore, DEFAULT_SHORTLIST
+from bm25_index import BM25Index, build_index
+
+MANIFEST_VERSION = 1
+
+DEFAULT_MAX_SEGMENTS = 8
+DEFAULT_INTERVAL_SECONDS = 60
+DEFAULT_TOP_K = 10
+
+# Segments with more than this share of their chunks superseded are always merged
+STALE_MERGE_FRACTION = 0.3
+
+# Published versions (and the segments they use) kept for readers that are opening them
+KEEP_VERSIONS = 2
+
+# Times a reader re-resolves CURRENT when garbage collection removes the version it
+# was opening
+READER_OPEN_ATTEMPTS = 3
+
+FINGERPRINT_SQL = (
+    "select doc, count(*), count(vec), max(id), sum(length(seg)) from segs group by doc"
+)
+DOCUMENT_ROWS_SQL = "select id, seg, vec from segs where doc = :doc and vec is not null order by id"
+
+def read_fingerprints(connection):
+    """
+    Fingerprint every fully embedded document in segs.
+
+    Documents with rows still waiting for their embedding are left out until the
+    embedding update has run.
+
+    Returns:
+        dict: doc -> [rows, max id, total characters]
+    """
+    cursor = connection.cursor()
+    try:
+        cursor.execute(FINGERPRINT_SQL)
+        return {
+            doc: [int(rows), int(max_id or 0), int(characters or 0)]
+            for doc, rows, embedded, max_id, characters in cursor
+            if rows and embedded == rows
+        }
+    finally:
+        cursor.close()
+
+def read_document_rows(connection, backend, doc):
+    """Return (ids, texts, (n, d) float32 vectors) for one document."""
+    cursor = connection.cursor()
+    ids, texts, vectors = [], [], []
+    try:
+        cursor.execute(DOCUMENT_ROWS_SQL, {"doc": doc})
+        for chunk_id, seg, vec in cursor:
+            ids.append(int(chunk_id))
+            texts.append(seg.read() if hasattr(seg, "read") else (seg or ""))
+            vectors.append(np.frombuffer(vec, dtype=np.float32) if backend == "sqlite"
+                           else np.asarray(vec, dtype=np.float32))
+    finally:
+        cursor.close()
+    return ids, texts, np.vstack(vectors) if vectors else None
+
+def directory_bytes(path):
+    return sum(file.stat().st_size for file in Path(path).rglob("*") if file.is_file())
+
+class IndexRoot:
+    """Paths, locking and version publishing for one index directory."""
+
+    def __init__(self, root):
+        self.root = Path(root)
+        self.versions = self.root / "versions"
+        self.segments = self.root / "segments"
+        self.current_file = self.root / "CURRENT"
+
+    def ensure(self):
+        self.versions.mkdir(parents=True, exist_ok=True)
+        self.segments.mkdir(parents=True, exist_ok=True)
+
+    def current_manifest(self):
+        """The published manifest, or an empty one before the first build."""
+        if not self.current_file.exists():
+            return {"version": 0, "format": MANIFEST_VERSION, "segments": [], "documents": {}, "nextSegment": 1}
+        name = self.current_file.read_text(encoding="utf-8").strip()
+        manifest = json.loads((self.versions / f"{name}.json").read_text(encoding="utf-8"))
+        if manifest.get("format") != MANIFEST_VERSION:
+            raise ValueError(f"Unsupported index manifest format: {manifest.get('format')}")
+        return manifest
+
+    def lock(self):
+        """Hold an exclusive lock so only one builder runs against this root."""
+        self.ensure()
+        handle = open(self.root / ".lock", "w")
+        if fcntl is not None:
+            try:
+                fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                handle.close()
+                raise RuntimeError(f"Another index build is running in {self.root}")
+        return handle
+
+    def publish(self, manifest):
+        """Write the manifest, then point CURRENT at it with one atomic rename."""
+        name = f"v{manifest['version']:06d}"
+        manifest_path = self.versions / f"{name}.json"
+        temporary = manifest_path.with_suffix(".json.tmp")
+        temporary.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+        os.replace(temporary, manifest_path)
+
+        pointer = self.root / "CURRENT.tmp"
+        with open(pointer, "w", encoding="utf-8") as file:
+            file.write(name + "\n")
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(pointer, self.current_file)
+
+    def collect_garbage(self):
+        """Delete versions older than the last KEEP_VERSIONS and segments none of those use."""
+        manifests = sorted(self.versions.glob("v*.json"))
+        kept = manifests[-KEEP_VERSIONS:]
+        for path in manifests[:-KEEP_VERSIONS]:
+            path.unlink()
+        in_use = set()
+        for path in kept:
+            in_use.update(segment["name"] for segment in json.loads(path.read_text(encoding="utf-8"))["segments"])
+        removed = 0
+        for segment_dir in self.segments.iterdir():
+            if segment_dir.name not in in_use:
+                shutil.rmtree(segment_dir, ignore_errors=True)
+                removed += 1
+        return removed
+
+def write_segment(root, manifest, documents):
+    """
+    Write one immutable segment from document rows.
+
+    Args:
+        root (IndexRoot): Index root
+        manifest (dict): Manifest being built (its nextSegment counter is advanced)
+        documents (list): (doc, ids, texts, vectors) tuples
+
+    Returns:
+        dict: Segment entry for the manifest
+    """
+    name = f"seg-{manifest['nextSegment']:06d}"
+    manifest["nextSegment"] += 1
+    staging = root.segments / f"{name}.tmp"
+    shutil.rmtree(staging, ignore_errors=True)
+    staging.mkdir(parents=True)
+
+    names = [doc for doc, _, _, _ in documents]
+    vectors = np.vstack([document_vectors for _, _, _, document_vectors in documents])
+    keys = np.asarray([[number, chunk_id] for number, (_, ids, _, _) in enumerate(documents) for chunk_id in ids],
+                      dtype=np.int64)
+    store = QuantizedStore.calibrate(vectors)
+    store.add(vectors, names, keys)
+    store.save(staging / "vectors")
+
+    rows = [{"id": chunk_id, "seg": text, "doc": doc}
+            for doc, ids, texts, _ in documents for chunk_id, text in zip(ids, texts)]
+    build_index(rows, staging / "lexical.bm25")
+    with open(staging / "chunks.ndjson", "w", encoding="utf-8") as file:
+        for row in rows:
+            file.write(json.dumps(row) + "\n")
+
+    os.replace(staging, root.segments / name)
+    return {"name": name, "chunks": len(rows), "bytes": directory_bytes(root.segments / name),
+            "documents": sorted(names)}
+
+def read_segment_documents(root, segment, docs):
+    """Read the given documents' rows back out of a segment, for merging."""
+    segment_dir = root.segments / segment["name"]
+    store = QuantizedStore.load(segment_dir / "vectors")
+    wanted = set(docs)
+    texts = {}
+    with open(segment_dir / "chunks.ndjson", encoding="utf-8") as file:
+        for line in file:
+            row = json.loads(line)
+            if row["doc"] in wanted:
+                texts[(row["doc"], row["id"])] = row["seg"]
+
+    keys = np.asarray(store.keys)
+    documents = []
+    for doc in docs:
+        number = store._document_numbers.get(doc)
+        if number is None:
+            continue
+        rows = np.flatnonzero(keys[:, 0] == number)
+        ids = [int(chunk_id) for chunk_id in keys[rows, 1]]
+        documents.append((doc, ids, [texts[(doc, chunk_id)] for chunk_id in ids], np.asarray(store.vectors[rows])))
+    return documents
+
+def live_chunks(manifest, segment):
+    """Chunks in a segment whose documents are still served from it."""
+    return sum(manifest["documents"][doc]["rows"] for doc in segment["documents"]
+               if manifest["documents"].get(doc, {}).get("segment") == segment["name"])
+
+def plan_merge(manifest, max_segments, force=False):
+    """
+    Choose segments to merge: all of them with force; otherwise mostly-stale ones,
+    plus the smallest ones while more than max_segments would remain.
+    """
+    segments = manifest["segments"]
+    if force:
+        return list(segments) if len(segments) > 1 or any(live_chunks(manifest, s) < s["chunks"] for s in segments) else []
+    chosen = [segment for segment in segments
+              if segment["chunks"] and 1 - live_chunks(manifest, segment) / segment["chunks"] > STALE_MERGE_FRACTION]
+    remaining = sorted((segment for segment in segments if segment not in chosen), key=lambda s: s["chunks"])
+    while len(remaining) + (1 if chosen else 0) > max_segments:
+        chosen.append(remaining.pop(0))
+    return chosen if len(chosen) > 1 or any(live_chunks(manifest, s) < s["chunks"] for s in chosen) else []
+
+def run_once(root_path, connection, backend, max_segments=DEFAULT_MAX_SEGMENTS, force_merge=False):
+    """
+    Bring the index up to date with segs and publish a new version if anything changed.
+
+    Returns:
+        dict: What changed, per-phase seconds, and the published index size
+    """
+    start = time.perf_counter()
+    root = IndexRoot(root_path)
+    lock = root.lock()
+    try:
+        previous = root.current_manifest()
+        manifest = json.loads(json.dumps(previous))
+        report = {"version": previous["version"], "published": False, "added": [], "removed": [],
+                  "mergedSegments": 0, "secondsByPhase": {}}
+
+        phase = time.perf_counter()
+        fingerprints = read_fingerprints(connection)
+        changed = sorted(doc for doc, fingerprint in fingerprints.items()
+                         if manifest["documents"].get(doc, {}).get("fingerprint") != fingerprint)
+        removed = sorted(doc for doc in manifest["documents"] if doc not in fingerprints)
+        report["secondsByPhase"]["scan"] = round(time.perf_counter() - phase, 3)
+
+        phase = time.perf_counter()
+        documents = []
+        for doc in changed:
+            ids, texts, vectors = read_document_rows(connection, backend, doc)
+            if vectors is not None:
+                documents.append((doc, ids, texts, vectors))
+        if documents:
+            segment = write_segment(root, manifest, documents)
+            manifest["segments"].append(segment)
+            for doc, ids, _, _ in documents:
+                manifest["documents"][doc] = {"segment": segment["name"], "rows": len(ids), "fingerprint": fingerprints[doc]}
+        for doc in removed:
+            del manifest["documents"][doc]
+        report["added"] = [doc for doc, _, _, _ in documents]
+        report["removed"] = removed
+        report["secondsByPhase"]["append"] = round(time.perf_counter() - phase, 3)
+
+        phase = time.perf_counter()
+        merging = plan_merge(manifest, max_segments, force_merge)
+        if merging:
+            documents = []
+            for segment in merging:
+                served = [doc for doc in segment["documents"]
+                          if manifest["documents"].get(doc, {}).get("segment") == segment["name"]]
+                documents.extend(read_segment_documents(root, segment, served))
+            merged_names = {segment["name"] for segment in merging}
+            manifest["segments"] = [segment for segment in manifest["segments"] if segment["name"] not in merged_names]
+            if documents:
+                merged = write_segment(root, manifest, documents)
+                manifest["segments"].append(merged)
+                for doc, _, _, _ in documents:
+                    manifest["documents"][doc]["segment"] = merged["name"]
+            report["mergedSegments"] = len(merging)
+        report["secondsByPhase"]["merge"] = round(time.perf_counter() - phase, 3)
+
+        if documents or removed or merging:
+            manifest["version"] = previous["version"] + 1
+            manifest["created"] = time.time()
+            root.publish(manifest)
+            report.update({"version": manifest["version"], "published": True,
+                           "removedSegmentDirs": root.collect_garbage()})
+
+        report.update({
+            "segments": len(manifest["segments"]),
+            "documents": len(manifest["documents"]),
+            "chunks": sum(live_chunks(manifest, segment) for segment in manifest["segments"]),
+            "indexBytes": sum(segment["bytes"] for segment in manifest["segments"]),
+            "seconds": round(time.perf_counter() - start, 3)
+        })
+        return report
+    finally:
+        lock.close()
+
+class IndexReader:
+    """
+    Query the published version of an index.
+
+    The manifest named by CURRENT when the reader opens is used for its whole life;
+    open a new reader to see later versions. Every segment is memory-mapped on open,
+    and the maps outlive the files, so garbage collection of the reader's version
+    after that does not affect it.
+    """
+
+    def __init__(self, root_path):
+        self.root = IndexRoot(root_path)
+        self._stores = {}
+        self._lexical = {}
+        for attempt in range(READER_OPEN_ATTEMPTS):
+            try:
+                self.manifest = self.root.current_manifest()
+                for segment in self.manifest["segments"]:
+                    segment_dir = self.root.segments / segment["name"]
+                    self._stores[segment["name"]] = QuantizedStore.load(segment_dir / "vectors")
+                    self._lexical[segment["name"]] = BM25Index(segment_dir / "lexical.bm25")
+                return
+            except FileNotFoundError:
+                # Collected while opening: a newer version has been published since
+                self.close()
+                if attempt == READER_OPEN_ATTEMPTS - 1:
+                    raise
+
+    def _served(self, segment):
+        return {doc for doc in segment["documents"]
+                if self.manifest["documents"].get(doc, {}).get("segment") == segment["name"]}
+
+    def search(self, query_vector, top_k=DEFAULT_TOP_K):
+        """Vector search across segments: cosine-scored {"doc", "id", "score"} dicts, best first."""
+        results = []
+        for segment in self.manifest["segments"]:
+            served = self._served(segment)
+            # Superseded rows can outrank live ones, so ask for enough to cover all of them
+            depth = top_k + segment["chunks"] - live_chunks(self.manifest, segment)
+            hits = self._stores[segment["name"]].search(query_vector, depth, shortlist=max(DEFAULT_SHORTLIST, depth))
+            results.extend(hit for hit in hits if hit["doc"] in served)
+        results.sort(key=lambda hit: -hit["score"])
+        return results[:top_k]
+
+    def keyword_search(self, query, top_k=DEFAULT_TOP_K):
+        """
+        BM25 search across segments. Each segment scores with its own statistics, so
+        scores are comparable only approximately until segments are merged.
+        """
+        results = []
+        for segment in self.manifest["segments"]:
+            served = self._served(segment)
+            depth = top_k + segment["chunks"] - live_chunks(self.manifest, segment)
+            results.extend(hit for hit in self._lexical[segment["name"]].search(query, depth) if hit["doc"] in served)
+        results.sort(key=lambda hit: -hit["score"])
+        return results[:top_k]
+
+    def close(self):
+        for index in self._lexical.values():
+            index.close()
+        self._lexical.clear()
+        self._stores.clear()
+
+def main():
+    parser = argparse.ArgumentParser(description='Build, refresh and query a versioned local index over segs')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = subparsers.add_parser('run', help='Refresh the index once and publish a new version if segs changed')
+    watch_parser = subparsers.add_parser('watch', help='Refresh every --interval seconds, one NDJSON report per run')
+    watch_parser.add_argument('--interval', type=float, default=DEFAULT_INTERVAL_SECONDS, help='Seconds between runs')
+    for subparser in (run_parser, watch_parser):
+        subparser.add_argument('index_root', help='Index directory')
+        subparser.add_argument('--max-segments', type=int, default=DEFAULT_MAX_SEGMENTS,
+                               help='Merge the smallest segments when there are more than this')
+        subparser.add_argument('--merge', action='store_true', help='Merge every segment into one')
+        subparser.add_argument('--backend', choices=['oracle', 'sqlite'], default='sqlite', help='Database holding segs')
+        subparser.add_argument('--sqlite-path', default='temp/segs.db', help='SQLite stand-in database file')
+        subparser.add_argument('--user', default=os.environ.get('ORACLE_USER'), help='Oracle user (default: $ORACLE_USER)')
+        subparser.add_argument('--dsn', default=os.environ.get('ORACLE_DSN'), help='Oracle connect string (default: $ORACLE_DSN)')
+
+    query_parser = subparsers.add_parser('query', help='Search the published version')
+    query_parser.add_argument('index_root', help='Index directory')
+    source = query_parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--vector', help='Query vector as a JSON list')
+    source.add_argument('--text', help='Query text, embedded with the SQLite stand-in model')
+    source.add_argument('--keywords', help='Keyword (BM25) query')
+    query_parser.add_argument('--top-k', type=int, default=DEFAULT_TOP_K, help='Number of results')
+
+    args = parser.parse_args()
+
+    def fail(message):
+        print(json.dumps({"success": False, "error": message}))
+        sys.exit(1)
+
+    if args.command == "query":
+        try:
+            start = time.perf_counter()
+            reader = IndexReader(args.index_root)
+            if args.keywords:
+                results = reader.keyword_search(args.keywords, args.top_k)
+            else:
+                vector = np.asarray(json.loads(args.vector), dtype=np.float32) if args.vector \
+                    else np.frombuffer(stand_in_embedding(args.text), dtype=np.float32)
+                results = reader.search(vector, args.top_k)
+            reader.close()
+        except (OSError, ValueError, KeyError) as e:
+            fail(f"Could not query index: {str(e)}")
+        print(json.dumps({
+            "success": True,
+            "version": reader.manifest["version"],
+            "results": results,
+            "queryMs": round((time.perf_counter() - start) * 1000, 3)
+        }, indent=2))
+        return
+
+    def connect():
+        if args.backend == "oracle":
+            if not args.user or not args.dsn:
+                fail("Oracle backend needs --user/--dsn (or ORACLE_USER/ORACLE_DSN) and ORACLE_PASSWORD")
+            return connect_oracle(args.user, args.dsn, os.environ.get('ORACLE_PASSWORD'))
+        return connect_sqlite(args.sqlite_path)
+
+    while True:
+        try:
+            connection = connect()
+        except ImportError:
+            fail("python-oracledb not installed. Please run: pip install oracledb")
+        except Exception as e:
+            fail(f"Could not connect to {args.backend}: {str(e)}")
+        try:
+            report = {"success": True, **run_once(args.index_root, connection, args.backend, args.max_segments, args.merge)}
+        except Exception as e:
+            report = {"success": False, "error": f"Index build failed: {str(e)}"}
+        finally:
+            connection.close()
+
+        if args.command == "run":
+            print(json.dumps(report, indent=2))
+            if not report["success"]:
+                sys.exit(1)
+            return
+        print(json.dumps(report), flush=True)
+        args.merge = False
+        time.sleep(args.interval)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,378 @@
+#!/usr/bin/env python3
+"""
+Document Ingestion Pipeline
+Extracts text from a PDF, Word, PowerPoint, Excel, CSV, HTML or Markdown file and
+chunks it in a single process. Page, paragraph, slide and row blocks from the processors are fed straight into the text
+splitter as a generator, so there is no second process, no JSON round trip of the
+full text and no extra copy of it.
+"""
+
+import os
+import sys
+import json
+import argparse
+import logging
+import zipfile
+from pathlib import Path
+
+from processor_log import get_logger, configure_logging, add_logging_arguments, log_event
+from processor_metrics import DocumentMetrics, add_metrics_arguments, serialize_result
+from processor_output import add_output_arguments, write_output
+from chunk_text import chunk_blocks
+
+logger = get_logger("pipeline")
+
+DOCUMENT_TYPES = {
+    ".pdf": "pdf",
+    ".docx": "docx",
+    ".pptx": "pptx",
+    ".xlsx": "xlsx",
+    ".csv": "csv",
+    ".html": "html",
+    ".htm": "html",
+    ".md": "markdown",
+    ".markdown": "markdown"
+}
+
+# Marker parts that identify an Office Open XML package's document type
+ZIP_MARKER_PARTS = {
+    "word/document.xml": "docx",
+    "ppt/presentation.xml": "pptx",
+    "xl/workbook.xml": "xlsx"
+}
+
+# Formats that are plain text and may carry no recognisable signature
+TEXT_DOCUMENT_TYPES = {"csv", "html", "markdown"}
+
+# Leading markup that identifies an HTML document (CSV and Markdown have no signature)
+HTML_SIGNATURES = (b"<!doctype html", b"<html")
+
+# PDF readers accept the header anywhere in the first 1 KB
+PDF_HEADER_WINDOW = 1024
+
+def sniff_document_type(path):
+    """
+    Determine a file's format from its leading bytes rather than its name.
+
+    Args:
+        path (str): Path to the file
+
+    Returns:
+        str: "pdf", "docx", "pptx", "xlsx", "html", "zip" for other ZIP archives,
+        "ole" for legacy binary Office files (.doc/.ppt/.xls), or None if unrecognised
+        (including plain-text formats such as CSV and Markdown)
+    """
+    with open(path, 'rb') as file:
+        head = file.read(PDF_HEADER_WINDOW)
+
+    if b"%PDF-" in head:
+        return "pdf"
+    if head.startswith(b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1"):
+        return "ole"
+    if head.startswith(b"PK\x03\x04") or head.startswith(b"PK\x05\x06"):
+        try:
+            with zipfile.ZipFile(path) as archive:
+                names = set(archive.namelist())
+        except zipfile.BadZipFile:
+            return None
+        for marker, document_type in ZIP_MARKER_PARTS.items():
+            if marker in names:
+                return document_type
+        return "zip"
+    if head.lstrip(b"\xef\xbb\xbf \t\r\n").lower().startswith(HTML_SIGNATURES):
+        return "html"
+    return None
+
+def detect_document_type(path):
+    """
+    Determine the document type from magic bytes, falling back to the file extension.
+
+    Args:
+        path (str): Path to the document
+
+    Returns:
+        str: A DOCUMENT_TYPES value, or None if unsupported
+    """
+    try:
+        sniffed = sniff_document_type(path)
+    except OSError:
+        sniffed = None
+    if sniffed in DOCUMENT_TYPES.values():
+        return sniffed
+    if sniffed is not None:
+        return None
+    return DOCUMENT_TYPES.get(Path(path).suffix.lower())
+
+def iter_document_blocks(path, document_type, max_pages=50, workers=None, cache_dir=None, metrics=None):
+    """
+    Yield extracted text blocks from a document using the matching processor.
+
+    Processors are imported on demand so a missing library only affects its own
+    document type.
+
+    Args:
+        path (str): Path to the document
+        document_type (str): A DOCUMENT_TYPES value
+        max_pages (int): Maximum PDF pages to process
+        workers (int): PowerPoint slide workers (0 or None for automatic)
+        cache_dir (str): Optional PowerPoint per-slide result cache directory
+        metrics (DocumentMetrics): Optional metrics for processors that record them
+
+    Yields:
+        dict: Page, paragraph/table/OCR, slide, row or HTML/Markdown blocks with their positions
+    """
+    if document_type == "pdf":
+        from pdf_processor import PyPDF2, iter_pdf_blocks
+        with open(path, 'rb') as file:
+            yield from iter_pdf_blocks(PyPDF2.PdfReader(file), max_pages, metrics)
+    elif document_type == "docx":
+        from docx_processor import Document, iter_docx_blocks
+        yield from iter_docx_blocks(Document(path), metrics=metrics)
+    elif document_type == "pptx":
+        from pptx_processor import Presentation, iter_pptx_blocks
+        yield from iter_pptx_blocks(Presentation(path), workers, cache_dir, metrics)
+    elif document_type == "xlsx":
+        from xlsx_processor import open_workbook, iter_xlsx_blocks
+        with open(path, 'rb') as file:
+            workbook = open_workbook(file)
+            try:
+                yield from iter_xlsx_blocks(workbook)
+            finally:
+                workbook.close()
+    elif document_type == "csv":
+        from csv_processor import iter_csv_blocks
+        yield from iter_csv_blocks(path)
+    elif document_type == "html":
+        from html_processor import iter_html_blocks
+        yield from iter_html_blocks(path)
+    elif document_type == "markdown":
+        from markdown_processor import iter_markdown_blocks
+        yield from iter_markdown_blocks(path)
+    else:
+        raise ValueError(f"Unsupported document type: {document_type}")
+
+def describe_pipeline_error(error, path, document_type):
+    """
+    Build a user-facing message for an exception raised while ingesting a document.
+
+    Args:
+        error (Exception): The exception that was raised
+        path (str): Path to the document
+        document_type (str): A DOCUMENT_TYPES value
+
+    Returns:
+        str: Error message
+    """
+    if document_type == "docx":
+        from docx_processor import describe_docx_error
+        return describe_docx_error(error, path)
+    if document_type == "xlsx":
+        from xlsx_processor import describe_xlsx_error
+        return describe_xlsx_error(error, path)
+    if isinstance(error, FileNotFoundError):
+        return f"File not found: {path}"
+    if document_type == "pdf" and type(error).__name__ == "PdfReadError":
+        return f"Failed to read PDF: {str(error)}. File may be corrupted or password-protected."
+    return f"Unexpected error processing {document_type}: {str(error)}"
+
+def validate_chunk_settings(chunk_size, overlap):
+    """
+    Check chunking arguments.
+
+    Returns:
+        str: Error message, or None if the settings are valid
+    """
+    if chunk_size <= 0:
+        return "Chunk size must be greater than 0"
+    if overlap < 0:
+        return "Overlap must be 0 or greater"
+    if overlap >= chunk_size:
+        return "Overlap must be less than chunk size"
+    return None
+
+def iter_document_chunks(path, document_type, chunk_size=1000, overlap=200, max_pages=50, workers=None, stats=None,
+                         cache_dir=None, metrics=None):
+    """
+    Extract and chunk a document, yielding chunks as soon as they are produced.
+
+    Args:
+        path (str): Path to the document
+        document_type (str): A DOCUMENT_TYPES value
+        chunk_size (int): Target size of each chunk in characters
+        overlap (int): Number of characters to overlap between chunks
+        max_pages (int): Maximum PDF pages to process
+        workers (int): PowerPoint slide workers (0 or None for automatic)
+        stats (dict): Optional dict updated with the number of blocks read
+        cache_dir (str): Optional PowerPoint per-slide result cache directory
+        metrics (DocumentMetrics): Optional metrics for processors that record them
+
+    Yields:
+        dict: Chunk with id, text, counts, character offsets and source blocks
+    """
+    stats = stats if stats is not None else {}
+    stats["blockCount"] = 0
+
+    def counted(blocks):
+        for block in blocks:
+            stats["blockCount"] += 1
+            yield block
+
+    blocks = iter_document_blocks(path, document_type, max_pages, workers, cache_dir, metrics)
+    yield from chunk_blocks(counted(blocks), chunk_size, overlap)
+
+def process_document(path, document_type=None, chunk_size=1000, overlap=200, max_pages=50, workers=None, metrics=None,
+                     cache_dir=None):
+    """
+    Extract and chunk a document in one pass.
+
+    Args:
+        path (str): Path to the document
+        document_type (str): A DOCUMENT_TYPES value (detected from content if None)
+        chunk_size (int): Target size of each chunk in characters
+        overlap (int): Number of characters to overlap between chunks
+        max_pages (int): Maximum PDF pages to process
+        workers (int): PowerPoint slide workers (0 or None for automatic)
+        metrics (DocumentMetrics): Optional metrics to record stages and counts into
+        cache_dir (str): Optional PowerPoint per-slide result cache directory
+
+    Returns:
+        dict: Result with success status, chunks, metadata and timings
+    """
+    document_type = document_type or detect_document_type(path)
+    metrics = metrics or DocumentMetrics(document_type or "unknown", logger)
+    metrics.document_type = document_type or "unknown"
+    if document_type not in DOCUMENT_TYPES.values():
+        return {"success": False, "error": f"Unsupported document type: {Path(path).suffix or path}", "chunks": []}
+
+    settings_error = validate_chunk_settings(chunk_size, overlap)
+    if settings_error:
+        return {"success": False, "error": settings_error, "chunks": []}
+
+    stats = {}
+    try:
+        metrics.count("bytes", os.path.getsize(path))
+        with metrics.stage("extract_and_chunk"):
+            chunks = list(iter_document_chunks(path, document_type, chunk_size, overlap, max_pages, workers, stats,
+                                               cache_dir, metrics))
+    except Exception as e:
+        return {"success": False, "error": describe_pipeline_error(e, path, document_type), "chunks": []}
+    metrics.count("blocks", stats["blockCount"])
+    metrics.count("chunks", len(chunks))
+
+    total_characters = sum(chunk["charCount"] for chunk in chunks)
+    return {
+        "success": True,
+        "documentType": document_type,
+        "chunks": chunks,
+        "metadata": {
+            "totalChunks": len(chunks),
+            "totalCharacters": total_characters,
+            "totalWords": sum(chunk["wordCount"] for chunk in chunks),
+            "averageChunkSize": total_characters // len(chunks) if chunks else 0,
+            "chunkSize": chunk_size,
+            "overlap": overlap,
+            "blockCount": stats["blockCount"]
+        },
+        "timings": metrics.as_dict()
+    }
+
+def stream_document(path, document_type=None, chunk_size=1000, overlap=200, max_pages=50, workers=None, out=None,
+                    cache_dir=None, metrics=None):
+    """
+    Write chunks as NDJSON while the document is still being extracted.
+
+    Each chunk is one {"type": "chunk", ...} line; a final "summary" line carries the
+    totals and timings and failures are reported as an "error" line.
+
+    Returns:
+        bool: True if the document was processed successfully
+    """
+    out = out or sys.stdout
+
+    def emit(record):
+        out.write(json.dumps(record) + "\n")
+        out.flush()
+
+    document_type = document_type or detect_document_type(path)
+    metrics = metrics or DocumentMetrics(document_type or "unknown", logger)
+    metrics.document_type = document_type or "unknown"
+    if document_type not in DOCUMENT_TYPES.values():
+        emit({"type": "error", "success": False, "error": f"Unsupported document type: {Path(path).suffix or path}"})
+        return False
+
+    settings_error = validate_chunk_settings(chunk_size, overlap)
+    if settings_error:
+        emit({"type": "error", "success": False, "error": settings_error})
+        return False
+
+    stats = {}
+    total_chunks = 0
+    total_characters = 0
+    try:
+        metrics.count("bytes", os.path.getsize(path))
+        with metrics.stage("extract_and_chunk"):
+            for chunk in iter_document_chunks(path, document_type, chunk_size, overlap, max_pages, workers, stats,
+                                              cache_dir, metrics):
+                total_chunks += 1
+                total_characters += chunk["charCount"]
+                emit({"type": "chunk", **chunk})
+    except Exception as e:
+        emit({"type": "error", "success": False, "error": describe_pipeline_error(e, path, document_type),
+              "timings": metrics.as_dict()})
+        return False
+    metrics.count("blocks", stats["blockCount"])
+    metrics.count("chunks", total_chunks)
+
+    emit({
+        "type": "summary",
+        "success": True,
+        "documentType": document_type,
+        "totalChunks": total_chunks,
+        "totalCharacters": total_characters,
+        "chunkSize": chunk_size,
+        "overlap": overlap,
+        "blockCount": stats["blockCount"],
+        "timings": metrics.as_dict()
+    })
+    return True
+
+def main():
+    parser = argparse.ArgumentParser(description='Extract and chunk a PDF, Word, PowerPoint, Excel, CSV, HTML or Markdown document in one process')
+    parser.add_argument('path', help='Path to the document')
+    parser.add_argument('--type', choices=sorted(set(DOCUMENT_TYPES.values())), help='Document type (default: detected from content)')
+    parser.add_argument('--chunk-size', type=int, default=1000, help='Target chunk size in characters')
+    parser.add_argument('--overlap', type=int, default=200, help='Characters of overlap between chunks')
+    parser.add_argument('--max-pages', type=int, default=50, help='Maximum PDF pages to process')
+    parser.add_argument('--workers', type=int, default=0, help='PowerPoint slides to extract concurrently (0 for automatic)')
+    parser.add_argument('--cache-dir', help='Directory of PowerPoint per-slide results; unchanged slides are reused from it')
+    parser.add_argument('--stream', action='store_true', help='Stream chunks as NDJSON as they are produced')
+    add_logging_arguments(parser)
+    add_metrics_arguments(parser)
+    add_output_arguments(parser)
+
+    args = parser.parse_args()
+    configure_logging(args.log_level, args.log_json)
+
+    metrics = DocumentMetrics(args.type or "unknown", logger)
+    metrics.record_startup()
+    if args.profile_memory:
+        metrics.enable_memory_profiling()
+
+    if args.stream:
+        success = stream_document(args.path, args.type, args.chunk_size, args.overlap, args.max_pages, args.workers,
+                                  cache_dir=args.cache_dir, metrics=metrics)
+        if args.metrics_file:
+            metrics.write(args.metrics_file, args.metrics_format, success=success)
+        sys.exit(0 if success else 1)
+
+    result = process_document(args.path, args.type, args.chunk_size, args.overlap, args.max_pages, args.workers, metrics,
+                              args.cache_dir)
+    log_event(logger, logging.INFO, "Document ingested", success=result["success"],
+              chunks=len(result["chunks"]))
+    write_output(serialize_result(result, metrics, args.metrics_file, args.metrics_format,
+                                 output_format=args.output_format))
+    if not result["success"]:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+"""
+Markdown Text Extraction Script
+Converts Markdown files to plain text line by line, so large files stream in bounded
+memory: front matter, link targets, images, HTML tags and emphasis markers are
+removed, and headings, paragraphs, lists, tables and code blocks become blocks.
+"""
+
+import re
+import sys
+import json
+import argparse
+import os
+import logging
+from itertools import chain
+
+from processor_log import get_logger, configure_logging, add_logging_arguments, log_event
+from processor_metrics import DocumentMetrics, add_metrics_arguments, serialize_result
+from processor_output import add_output_arguments, write_output
+
+logger = get_logger("markdown")
+
+ATX_HEADING = re.compile(r"^\s{0,3}(#{1,6})\s+(.*?)(?:\s+#+)?\s*$")
+SETEXT_UNDERLINE = re.compile(r"^\s{0,3}(=+|-+)\s*$")
+FENCE = re.compile(r"^\s{0,3}(`{3,}|~{3,})")
+HORIZONTAL_RULE = re.compile(r"^\s{0,3}([-*_])(?:\s*\1){2,}\s*$")
+REFERENCE_DEFINITION = re.compile(r"^\s{0,3}\[[^\]]+\]:\s+\S+")
+LIST_MARKER = re.compile(r"^\s*(?:[-*+]|\d+[.)])\s+(?:\[[ xX]\]\s+)?")
+BLOCKQUOTE = re.compile(r"^\s{0,3}(?:>\s?)+")
+TABLE_SEPARATOR = re.compile(r"^\s*\|?\s*:?-+:?\s*(?:\|\s*:?-+:?\s*)*\|?\s*$")
+
+IMAGE = re.compile(r"!\[([^\]]*)\]\([^)]*\)")
+LINK = re.compile(r"\[([^\]]+)\](?:\([^)]*\)|\[[^\]]*\])")
+AUTOLINK = re.compile(r"<((?:https?|mailto):[^>\s]+)>")
+HTML_TAG = re.compile(r"</?[A-Za-z][^>]*>")
+CODE_SPAN = re.compile(r"`+([^`]+)`+")
+STRONG = re.compile(r"(\*\*|__)(?=\S)(.+?)(?<=\S)\1")
+EMPHASIS = re.compile(r"(?<![\w*])([*_])(?=\S)(.+?)(?<=\S)\1(?![\w*])")
+STRIKETHROUGH = re.compile(r"~~(?=\S)(.+?)(?<=\S)~~")
+
+def strip_inline(text):
+    """Remove inline Markdown markup, keeping the visible text."""
+    text = IMAGE.sub(r"\1", text)
+    text = LINK.sub(r"\1", text)
+    text = AUTOLINK.sub(r"\1", text)
+    text = HTML_TAG.sub("", text)
+    text = CODE_SPAN.sub(r"\1", text)
+    text = STRONG.sub(r"\2", text)
+    text = EMPHASIS.sub(r"\2", text)
+    text = STRIKETHROUGH.sub(r"\1", text)
+    return text.strip()
+
+def iter_markdown_blocks(md_path, info=None):
+    """
+    Yield text blocks from a Markdown file, reading it one line at a time.
+
+    Args:
+        md_path (str): Path to the Markdown file
+        info (dict): Optional dict updated with the title (first level-1 heading)
+
+    Yields:
+        dict: {"type": "heading"|"paragraph"|"list"|"table"|"code", "position", "text"[, "level"]}
+    """
+    info = info if info is not None else {}
+    info.setdefault("title", "")
+    position = 0
+    lines = []
+    kind = "paragraph"
+    fence = None
+    code = []
+
+    def block(block_type, text, level=None):
+        nonlocal position
+        position += 1
+        record = {"type": block_type, "position": position, "text": text}
+        if level:
+            record["level"] = level
+            if level == 1 and not info["title"]:
+                info["title"] = text
+        return record
+
+    def flush():
+        nonlocal lines, kind
+        text = "\n".join(line for line in lines if line)
+        record = block(kind, text) if text else None
+        lines, kind = [], "paragraph"
+        return record
+
+    with open(md_path, 'r', encoding="utf-8-sig", errors="replace") as file:
+        first = file.readline()
+        if first.strip() == "---":
+            # Skip YAML front matter
+            for line in file:
+                if line.strip() in ("---", "..."):
+                    break
+            first = ""
+
+        for raw in chain([first], file):
+            line = raw.rstrip("\n").rstrip("\r")
+
+            if fence is not None:
+                if line.lstrip().startswith(fence):
+                    fence = None
+                    text = "\n".join(code).strip("\n")
+                    code = []
+                    if text.strip():
+                        yield block("code", text)
+                else:
+                    code.append(line.rstrip())
+                continue
+
+            match = FENCE.match(line)
+            if match:
+                record = flush()
+                if record:
+                    yield record
+                fence = match.group(1)
+                continue
+
+            if not line.strip():
+                record = flush()
+                if record:
+                    yield record
+                continue
+
+            match = SETEXT_UNDERLINE.match(line)
+            if match and kind == "paragraph" and len(lines) == 1:
+                yield block("heading", lines[0], 1 if match.group(1)[0] == "=" else 2)
+                lines = []
+                continue
+
+            if HORIZONTAL_RULE.match(line) or REFERENCE_DEFINITION.match(line):
+                record = flush()
+                if record:
+                    yield record
+                continue
+
+            match = ATX_HEADING.match(line)
+            if match:
+                record = flush()
+                if record:
+                    yield record
+                text = strip_inline(match.group(2))
+                if text:
+                    yield block("heading", text, len(match.group(1)))
+                continue
+
+            line = BLOCKQUOTE.sub("", line)
+            if "|" in line and line.strip().startswith("|"):
+                if kind != "table":
+                    record = flush()
+                    if record:
+                        yield record
+                    kind = "table"
+                if not TABLE_SEPARATOR.match(line):
+                    cells = [strip_inline(cell) for cell in line.strip().strip("|").split("|")]
+                    lines.append("\t".join(cells))
+                continue
+
+            if LIST_MARKER.match(line):
+                if kind != "list":
+                    record = flush()
+                    if record:
+                        yield record
+                    kind = "list"
+                lines.append(strip_inline(LIST_MARKER.sub("", line)))
+                continue
+
+            text = strip_inline(line)
+            if kind == "paragraph" and lines:
+                # Soft line break inside a paragraph
+                lines[-1] = f"{lines[-1]} {text}"
+            elif kind == "list" and lines and raw[:1].isspace():
+                # Continuation of the previous list item
+                lines[-1] = f"{lines[-1]} {text}"
+            else:
+                if kind != "paragraph":
+                    record = flush()
+                    if record:
+                        yield record
+                lines.append(text)
+
+    if fence is not None and code:
+        text = "\n".join(code).strip("\n")
+        if text.strip():
+            yield block("code", text)
+    record = flush()
+    if record:
+        yield record
+
+def describe_markdown_error(error, md_path):
+    """
+    Build a user-facing message for an exception raised while reading a Markdown file.
+
+    Returns:
+        str: Error message
+    """
+    if isinstance(error, FileNotFoundError):
+        return f"Markdown file not found: {md_path}"
+    return f"Unexpected error processing Markdown file: {str(error)}"
+
+def extract_text_from_markdown(md_path, metrics=None):
+    """
+    Extract plain text from a Markdown file.
+
+    Args:
+        md_path (str): Path to the Markdown file
+        metrics (DocumentMetrics): Optional metrics to record stages and counts into
+
+    Returns:
+        dict: Result containing success status, text, title, block counts and timings
+    """
+    metrics = metrics or DocumentMetrics("markdown", logger)
+    try:
+        metrics.count("bytes", os.path.getsize(md_path))
+        info = {}
+        parts = []
+        headings = 0
+        with metrics.stage("extract"):
+            for block in iter_markdown_blocks(md_path, info):
+                headings += block["type"] == "heading"
+                parts.append(block["text"])
+
+        text = "\n\n".join(parts)
+        metrics.count("blocks", len(parts))
+        log_event(logger, logging.INFO, "Markdown extracted", blocks=len(parts), headings=headings)
+
+        return {
+            "success": True,
+            "text": text,
+            "title": info["title"],
+            "blockCount": len(parts),
+            "headingCount": headings,
+            "hasText": bool(text.strip()),
+            "timings": metrics.as_dict()
+        }
+
+    except Exception as e:
+        return {
+            "success": False,
+            "error": describe_markdown_error(e, md_path),
+            "text": "",
+            "blockCount": 0
+        }
+
+def stream_text_from_markdown(md_path, out=None, metrics=None):
+    """
+    Write Markdown text blocks as NDJSON, one JSON object per line, as they are read.
+
+    A final "summary" line carries the title and counts; failures are reported as an
+    "error" line.
+
+    Returns:
+        bool: True if the file was processed successfully
+    """
+    out = out or sys.stdout
+    metrics = metrics or DocumentMetrics("markdown", logger)
+
+    def emit(record):
+        out.write(json.dumps(record) + "\n")
+        out.flush()
+
+    try:
+        metrics.count("bytes", os.path.getsize(md_path))
+        info = {}
+        blocks = 0
+        headings = 0
+        characters = 0
+        for block in iter_markdown_blocks(md_path, info):
+            blocks += 1
+            headings += block["type"] == "heading"
+            characters += len(block["text"])
+            emit(block)
+
+        metrics.count("blocks", blocks)
+        emit({
+            "type": "summary",
+            "success": True,
+            "title": info["title"],
+            "blockCount": blocks,
+            "headingCount": headings,
+            "characterCount": characters,
+            "hasText": characters > 0,
+            "timings": metrics.as_dict()
+        })
+        return True
+
+    except Exception as e:
+        emit({
+            "type": "error",
+            "success": False,
+            "error": describe_markdown_error(e, md_path)
+        })
+        return False
+
+def main():
+    parser = argparse.ArgumentParser(description='Extract plain text from Markdown files')
+    parser.add_argument('md_path', help='Path to the Markdown file')
+    parser.add_argument('--stream', action='store_true', help='Stream heading, paragraph, list, table and code blocks as NDJSON')
+    add_logging_arguments(parser)
+    add_metrics_arguments(parser)
+    add_output_arguments(parser)
+
+    args = parser.parse_args()
+    configure_logging(args.log_level, args.log_json)
+
+    metrics = DocumentMetrics("markdown", logger)
+    metrics.record_startup()
+    if args.profile_memory:
+        metrics.enable_memory_profiling()
+
+    if args.stream:
+        success = stream_text_from_markdown(args.md_path, metrics=metrics)
+        if args.metrics_file:
+            metrics.write(args.metrics_file, args.metrics_format, success=success)
+        sys.exit(0 if success else 1)
+
+    result = extract_text_from_markdown(args.md_path, metrics)
+    write_output(serialize_result(result, metrics, args.metrics_file, args.metrics_format,
+                                 output_format=args.output_format, indent=2))
+
+if __name__ == "__main__":
+    main()
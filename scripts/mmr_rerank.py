@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Maximal-Marginal-Relevance Re-ranking of Retrieved Chunks
+Takes the top-k vector hits with their embeddings and character offsets (from
+chunk_text.py or ingest_pipeline.py output), merges chunks that overlap or touch
+in the same document into single spans so overlapping text is sent once, orders
+the spans by MMR (relevance to the query minus similarity to spans already picked,
+computed with one similarity matrix) and keeps spans while they fit a token budget.
+"""
+
+import sys
+import json
+import argparse
+
+try:
+    import numpy as np
+except ImportError:
+    print(json.dumps({
+        "success": False,
+        "error": "numpy not installed. Please run: pip install numpy"
+    }))
+    sys.exit(1)
+
+from segs_loader import stand_in_embedding
+from ann_index import normalize_rows
+from processor_output import read_chunks
+
+DEFAULT_LAMBDA = 0.7
+DEFAULT_TOKEN_BUDGET = 2000
+
+# Rough characters per token for English text, used when no tokenizer is available
+CHARS_PER_TOKEN = 4
+
+CONTEXT_SEPARATOR = "\n\n"
+
+def estimate_tokens(text):
+    """Approximate token count of a text (CHARS_PER_TOKEN characters per token)."""
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+def merge_spans(chunks):
+    """
+    Merge chunks that overlap or touch within a document into contiguous spans.
+
+    Chunk text must be the document text between "start" and "end", as chunk_text()
+    and chunk_blocks() produce; each merged span's text is rebuilt from its chunks without repeating the
+    overlapping characters. Chunks without offsets stay spans of their own.
+
+    Args:
+        chunks (list): Chunk dicts with "id", "text" and optional "doc", "start", "end"
+
+    Returns:
+        list: Span dicts with "doc", "start", "end", "text", "chunkIds" and "members"
+            (indexes into chunks), in document then offset order
+    """
+    spans = []
+    positioned = []
+    for number, chunk in enumerate(chunks):
+        if chunk.get("start") is None or chunk.get("end") is None:
+            spans.append({"doc": chunk.get("doc"), "start": None, "end": None, "text": chunk["text"],
+                          "chunkIds": [chunk["id"]], "members": [number]})
+        else:
+            positioned.append(number)
+
+    positioned.sort(key=lambda number: (str(chunks[number].get("doc")), chunks[number]["start"], chunks[number]["end"]))
+    current = None
+    for number in positioned:
+        chunk = chunks[number]
+        if current is not None and chunk.get("doc") == current["doc"] and chunk["start"] <= current["end"]:
+            if chunk["end"] > current["end"]:
+                current["text"] += chunk["text"][current["end"] - chunk["start"]:]
+                current["end"] = chunk["end"]
+            current["chunkIds"].append(chunk["id"])
+            current["members"].append(number)
+            continue
+        current = {"doc": chunk.get("doc"), "start": chunk["start"], "end": chunk["end"], "text": chunk["text"],
+                   "chunkIds": [chunk["id"]], "members": [number]}
+        spans.append(current)
+    return spans
+
+def mmr_order(relevance, similarity, diversity_lambda=DEFAULT_LAMBDA):
+    """
+    Order items by maximal marginal relevance.
+
+    Args:
+        relevance (ndarray): (n,) similarity of each item to the query
+        similarity (ndarray): (n, n) similarity between items
+        diversity_lambda (float): 1 ranks by relevance alone; lower values favour
+            items unlike those already picked
+
+    Returns:
+        list: Item indexes, best first
+    """
+    count = len(relevance)
+    order = []
+    if not count:
+        return order
+    closest = np.full(count, -np.inf, dtype=np.float32)
+    available = np.ones(count, dtype=bool)
+    for _ in range(count):
+        redundancy = np.where(np.isfinite(closest), closest, 0.0)
+        marginal = diversity_lambda * relevance - (1.0 - diversity_lambda) * redundancy
+        marginal[~available] = -np.inf
+        picked = int(np.argmax(marginal))
+        order.append(picked)
+        available[picked] = False
+        np.maximum(closest, similarity[:, picked], out=closest)
+    return order
+
+def rerank(chunks, query_vector, diversity_lambda=DEFAULT_LAMBDA, token_budget=DEFAULT_TOKEN_BUDGET, embed=None):
+    """
+    Merge overlapping candidates, order the spans by MMR and fill a token budget.
+
+    Args:
+        chunks (list): Candidate chunks; "embedding" (list of floats) is used when
+            present, otherwise the text is embedded with embed
+        query_vector (ndarray): (d,) query embedding
+        diversity_lambda (float): MMR trade-off between relevance and novelty
+        token_budget (int): Maximum estimated tokens of selected span text
+        embed (callable): text -> float32 vector bytes for chunks without embeddings
+
+    Returns:
+        dict: "spans" (selected, in MMR order, with relevance and token estimates)
+            and "stats" comparing the candidates with the packed context
+    """
+    embed = embed or stand_in_embedding
+    vectors = normalize_rows(np.vstack([
+        np.asarray(chunk["embedding"], dtype=np.float32) if chunk.get("embedding") is not None
+        else np.frombuffer(embed(chunk["text"]), dtype=np.float32)
+        for chunk in chunks
+    ])) if chunks else np.empty((0, len(query_vector)), dtype=np.float32)
+    query_vector = normalize_rows(np.asarray(query_vector, dtype=np.float32).reshape(-1))
+    chunk_relevance = vectors @ query_vector
+
+    spans = merge_spans(chunks)
+    span_vectors = normalize_rows(np.vstack([vectors[span["members"]].mean(axis=0) for span in spans])) \
+        if spans else vectors[:0]
+    relevance = np.asarray([chunk_relevance[span["members"]].max() for span in spans], dtype=np.float32)
+    order = mmr_order(relevance, span_vectors @ span_vectors.T, diversity_lambda)
+
+    selected = []
+    used = 0
+    for number in order:
+        span = spans[number]
+        tokens = estimate_tokens(span["text"])
+        if used + tokens > token_budget:
+            continue
+        used += tokens
+        selected.append({
+            "doc": span["doc"],
+            "start": span["start"],
+            "end": span["end"],
+            "chunkIds": span["chunkIds"],
+            "relevance": round(float(relevance[number]), 4),
+            "tokens": tokens,
+            "text": span["text"]
+        })
+
+    return {
+        "spans": selected,
+        "stats": {
+            "candidates": len(chunks),
+            "mergedSpans": len(spans),
+            "selectedSpans": len(selected),
+            "candidateTokens": sum(estimate_tokens(chunk["text"]) for chunk in chunks),
+            "mergedTokens": sum(estimate_tokens(span["text"]) for span in spans),
+            "contextTokens": used,
+            "tokenBudget": token_budget
+        }
+    }
+
+def attach_embeddings(chunks, path):
+    """Add vectors from embed_client.py NDJSON output ({"type": "embedding", "id", "embedding"}) by chunk id."""
+    vectors = {}
+    with open(path, encoding="utf-8") as file:
+        for line in file:
+            if line.strip():
+                record = json.loads(line)
+                if record.get("type") == "embedding":
+                    vectors[(record.get("doc"), record["id"])] = record["embedding"]
+    for chunk in chunks:
+        vector = vectors.get((chunk.get("doc"), chunk["id"]), vectors.get((None, chunk["id"])))
+        if vector is not None and chunk.get("embedding") is None:
+            chunk["embedding"] = vector
+
+def main():
+    parser = argparse.ArgumentParser(description='Merge overlapping retrieved chunks, diversify them with MMR and fit a token budget')
+    parser.add_argument('candidates', help='Candidate chunks (JSON list, {"candidates"}/{"chunks"} object or NDJSON; "-" for stdin)')
+    query = parser.add_mutually_exclusive_group(required=True)
+    query.add_argument('--query-vector', help='Query embedding as a JSON list')
+    query.add_argument('--query-text', help='Query text, embedded with the SQLite stand-in model')
+    parser.add_argument('--embeddings', help='embed_client.py NDJSON output with the candidates\' vectors')
+    parser.add_argument('--lambda', dest='diversity_lambda', type=float, default=DEFAULT_LAMBDA,
+                        help='MMR trade-off: 1 ranks by relevance only, lower values favour diversity')
+    parser.add_argument('--token-budget', type=int, default=DEFAULT_TOKEN_BUDGET, help='Maximum estimated context tokens')
+    parser.add_argument('--separator', default=CONTEXT_SEPARATOR, help='Text placed between spans in "context"')
+
+    args = parser.parse_args()
+
+    def fail(message):
+        print(json.dumps({"success": False, "error": message}))
+        sys.exit(1)
+
+    if not 0.0 <= args.diversity_lambda <= 1.0:
+        fail("Lambda must be between 0 and 1")
+
+    try:
+        chunks = read_chunks(args.candidates)
+        if args.embeddings:
+            attach_embeddings(chunks, args.embeddings)
+    except (OSError, ValueError, KeyError) as e:
+        fail(f"Could not read candidates: {str(e)}")
+
+    if args.query_vector:
+        try:
+            query_vector = np.asarray(json.loads(args.query_vector), dtype=np.float32)
+        except ValueError as e:
+            fail(f"Invalid query vector: {str(e)}")
+    else:
+        query_vector = np.frombuffer(stand_in_embedding(args.query_text), dtype=np.float32)
+
+    try:
+        result = rerank(chunks, query_vector, args.diversity_lambda, args.token_budget)
+    except (KeyError, ValueError) as e:
+        fail(f"Re-ranking failed: {str(e)}")
+
+    print(json.dumps({
+        "success": True,
+        "context": args.separator.join(span["text"] for span in result["spans"]),
+        **result
+    }, indent=2))
+
+if __name__ == "__main__":
+    main()
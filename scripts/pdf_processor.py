@@ -4,11 +4,19 @@ PDF Text Extraction Script
 Extracts text from PDF files using PyPDF2 and handles various edge cases.
 """
 
+import os
 import sys
 import json
 import argparse
+import logging
+import time
 from pathlib import Path
 
+from processor_log import get_logger, configure_logging, add_logging_arguments, log_event
+from processor_metrics import DocumentMetrics, add_metrics_arguments, serialize_result
+from processor_output import add_output_arguments, write_output
+from text_normalize import normalize_text
+
 try:
     import PyPDF2
 except ImportError:
@@ -20,52 +28,97 @@ except ImportError:
     }))
     sys.exit(1)
 
-def extract_text_from_pdf(pdf_path, max_pages=50):
+logger = get_logger("pdf")
+
+def iter_pdf_blocks(pdf_reader, max_pages=50, metrics=None):
+    """
+    Yield one block per non-empty PDF page as it is extracted, with its text
+    normalized (see normalize_text(); words hyphenated across lines are rejoined).
+    
+    Args:
+        pdf_reader: PyPDF2 PdfReader object
+        max_pages (int): Maximum number of pages to process
+        metrics (DocumentMetrics): Optional metrics to record page extraction time and page count into
+        
+    Yields:
+        dict: Block with type, position, page number and text
+    """
+    position = 0
+    
+    for page_num in range(min(len(pdf_reader.pages), max_pages)):
+        if metrics is not None:
+            metrics.count("pages")
+        try:
+            start = time.perf_counter()
+            page = pdf_reader.pages[page_num]
+            page_text = normalize_text(page.extract_text(), dehyphenate=True)
+            if metrics is not None:
+                metrics.record("pages", time.perf_counter() - start)
+            
+            if page_text:
+                position += 1
+                yield {
+                    "type": "page",
+                    "position": position,
+                    "page": page_num + 1,
+                    "text": page_text
+                }
+        
+        except Exception as page_error:
+            log_event(logger, logging.WARNING, "Error extracting page", page=page_num + 1, error=str(page_error))
+            position += 1
+            yield {
+                "type": "page",
+                "position": position,
+                "page": page_num + 1,
+                "text": f"[Error extracting text from page {page_num + 1}: {str(page_error)}]",
+                "error": str(page_error)
+            }
+
+def extract_text_from_pdf(pdf_path, max_pages=50, metrics=None):
     """
     Extract text from PDF file.
     
     Args:
         pdf_path (str): Path to the PDF file
         max_pages (int): Maximum number of pages to process
+        metrics (DocumentMetrics): Optional metrics to record stages and counts into
         
     Returns:
-        dict: Result containing success status, text, and metadata
+        dict: Result containing success status, text, metadata and timings
     """
+    metrics = metrics or DocumentMetrics("pdf", logger)
     try:
         with open(pdf_path, 'rb') as file:
-            pdf_reader = PyPDF2.PdfReader(file)
+            metrics.count("bytes", os.fstat(file.fileno()).st_size)
+            with metrics.stage("parse"):
+                pdf_reader = PyPDF2.PdfReader(file)
+                
+                # Get basic metadata
+                num_pages = len(pdf_reader.pages)
+                pages_to_process = min(num_pages, max_pages)
             
-            # Get basic metadata
-            num_pages = len(pdf_reader.pages)
-            pages_to_process = min(num_pages, max_pages)
+            log_event(logger, logging.INFO, "PDF opened", pages=num_pages, processing=pages_to_process)
             
-            extracted_text = ""
+            page_parts = []
             page_texts = []
             
-            for page_num in range(pages_to_process):
-                try:
-                    page = pdf_reader.pages[page_num]
-                    page_text = page.extract_text()
-                    
-                    if page_text.strip():
-                        page_texts.append({
-                            "page": page_num + 1,
-                            "text": page_text.strip()
-                        })
-                        extracted_text += f"\n--- Page {page_num + 1} ---\n{page_text}\n"
-                    
-                except Exception as page_error:
+            with metrics.stage("pages", pages=pages_to_process):
+                for block in iter_pdf_blocks(pdf_reader, max_pages):
                     page_texts.append({
-                        "page": page_num + 1,
-                        "text": f"[Error extracting text from page {page_num + 1}: {str(page_error)}]"
+                        "page": block["page"],
+                        "text": block["text"]
                     })
-                    extracted_text += f"\n--- Page {page_num + 1} ---\n[Error extracting text]\n"
+                    if "error" in block:
+                        page_parts.append(f"\n--- Page {block['page']} ---\n[Error extracting text]\n")
+                    else:
+                        page_parts.append(f"\n--- Page {block['page']} ---\n{block['text']}\n")
+            extracted_text = "".join(page_parts)
+            metrics.count("pages", pages_to_process)
             
             # Clean up the text
-            cleaned_text = extracted_text.strip()
-            if cleaned_text:
-                # Normalize whitespace but preserve paragraph breaks
-                cleaned_text = '\n'.join(line.strip() for line in cleaned_text.split('\n') if line.strip())
+            with metrics.stage("normalize", characters=len(extracted_text)):
+                cleaned_text = normalize_text(extracted_text, dehyphenate=True)
             
             return {
                 "success": True,
@@ -73,7 +126,8 @@ def extract_text_from_pdf(pdf_path, max_pages=50):
                 "pageCount": num_pages,
                 "processedPages": pages_to_process,
                 "pageTexts": page_texts,
-                "hasText": bool(cleaned_text.strip())
+                "hasText": bool(cleaned_text.strip()),
+                "timings": metrics.as_dict()
             }
             
     except FileNotFoundError:
@@ -102,11 +156,20 @@ def main():
     parser = argparse.ArgumentParser(description='Extract text from PDF files')
     parser.add_argument('pdf_path', help='Path to the PDF file')
     parser.add_argument('--max-pages', type=int, default=50, help='Maximum pages to process')
+    add_logging_arguments(parser)
+    add_metrics_arguments(parser)
+    add_output_arguments(parser)
     
     args = parser.parse_args()
+    configure_logging(args.log_level, args.log_json)
     
-    result = extract_text_from_pdf(args.pdf_path, args.max_pages)
-    print(json.dumps(result, indent=2))
+    metrics = DocumentMetrics("pdf", logger)
+    metrics.record_startup()
+    if args.profile_memory:
+        metrics.enable_memory_profiling()
+    result = extract_text_from_pdf(args.pdf_path, args.max_pages, metrics)
+    write_output(serialize_result(result, metrics, args.metrics_file, args.metrics_format,
+                                 output_format=args.output_format, indent=2))
 
 if __name__ == "__main__":
     main()
@@ -8,11 +8,24 @@ Includes OCR capability for extracting text from images.
 import sys
 import json
 import argparse
+import hashlib
 import io
+import os
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from pathlib import Path
 
+from processor_log import get_logger, configure_logging, add_logging_arguments, log_event, preview
+from processor_metrics import DocumentMetrics, add_metrics_arguments, serialize_result
+from processor_output import add_output_arguments, write_output
+from text_normalize import normalize_text
+from processor_imports import module_available, load_ocr
+
 try:
     from pptx import Presentation
+    from pptx.opc.constants import RELATIONSHIP_TYPE as RT
 except ImportError:
     print(json.dumps({
         "success": False,
@@ -22,43 +35,58 @@ except ImportError:
     }))
     sys.exit(1)
 
-# OCR dependencies - optional
-OCR_AVAILABLE = False
-try:
-    from PIL import Image
-    import pytesseract
-    OCR_AVAILABLE = True
-except ImportError:
-    pass  # OCR will be skipped if dependencies not available
+# OCR dependencies - optional, imported on the first picture (see load_ocr)
+OCR_AVAILABLE = module_available("PIL", "pytesseract")
+
+logger = get_logger("pptx")
+
+# Bump when slide extraction output changes so cached slide results are not reused
+SLIDE_CACHE_VERSION = 1
+
+DEFAULT_SLIDE_CACHE_MAX_MB = 256
 
-def extract_text_from_images(shape):
+# After an eviction the cache is brought down to this fraction of its limit, so a
+# full cache is not trimmed again after every presentation
+SLIDE_CACHE_EVICTION_TARGET = 0.9
+
+def extract_text_from_images(shape, metrics=None):
     """
     Extract text from images using OCR if available.
     
     Args:
         shape: PowerPoint shape that might contain an image
+        metrics (DocumentMetrics): Optional metrics to record OCR time and image count into
         
     Returns:
         str: Extracted text from image, empty string if no text or OCR unavailable
     """
     if not OCR_AVAILABLE:
-        print(f"OCR not available for shape type: {getattr(shape, 'shape_type', 'unknown')}", file=sys.stderr)
+        log_event(logger, logging.DEBUG, "OCR not available", shapeType=getattr(shape, 'shape_type', 'unknown'))
         return ""
     
     try:
         # Import shape types
         from pptx.enum.shapes import MSO_SHAPE_TYPE
         
-        print(f"Shape type: {shape.shape_type}, Shape name: {getattr(shape, 'name', 'no name')}", file=sys.stderr)
+        log_event(logger, logging.DEBUG, "OCR candidate", shapeType=shape.shape_type, shapeName=getattr(shape, 'name', 'no name'))
+        
+        # Only pictures and shapes with an image pay for importing PIL and pytesseract
+        is_picture = shape.shape_type == MSO_SHAPE_TYPE.PICTURE
+        if not is_picture and not hasattr(shape, 'image'):
+            return ""
+        ocr = load_ocr()
+        if ocr is None:
+            log_event(logger, logging.WARNING, "OCR libraries failed to import - skipping image text extraction")
+            return ""
+        Image, pytesseract = ocr
         
         # Check if shape is a picture
-        if shape.shape_type == MSO_SHAPE_TYPE.PICTURE:
-            print("Found picture shape, attempting OCR...", file=sys.stderr)
+        if is_picture:
             # Get image data
             image_stream = io.BytesIO(shape.image.blob)
             image = Image.open(image_stream)
             
-            print(f"Image size: {image.size}, Image mode: {image.mode}", file=sys.stderr)
+            log_event(logger, logging.DEBUG, "Image loaded", size=image.size, mode=image.mode)
             
             # Perform OCR with multiple PSM modes for better results
             ocr_configs = [
@@ -69,229 +97,448 @@ def extract_text_from_images(shape):
                 '--psm 13'   # Raw line. Treat the image as a single text line
             ]
             
+            metrics = metrics or DocumentMetrics("pptx")
             best_text = ""
-            for config in ocr_configs:
-                try:
-                    ocr_text = pytesseract.image_to_string(image, config=config).strip()
-                    if len(ocr_text) > len(best_text):
-                        best_text = ocr_text
-                except:
-                    continue
+            with metrics.stage("ocr"):
+                for config in ocr_configs:
+                    try:
+                        ocr_text = pytesseract.image_to_string(image, config=config).strip()
+                        if len(ocr_text) > len(best_text):
+                            best_text = ocr_text
+                    except:
+                        continue
+            metrics.count("images")
             
             if best_text:
-                print(f"OCR extracted: {best_text[:100]}...", file=sys.stderr)
+                log_event(logger, logging.DEBUG, "OCR text extracted", characters=len(best_text), preview=preview(best_text, 100))
             else:
-                print("No text found in image", file=sys.stderr)
+                log_event(logger, logging.DEBUG, "No text found in image")
             
             return best_text
         
         # Also check for other shape types that might contain images
-        elif hasattr(shape, 'image'):
-            print(f"Shape has image attribute, attempting OCR on shape type {shape.shape_type}...", file=sys.stderr)
+        else:
             try:
                 image_stream = io.BytesIO(shape.image.blob)
                 image = Image.open(image_stream)
                 ocr_text = pytesseract.image_to_string(image, config='--psm 6')
                 result = ocr_text.strip()
                 if result:
-                    print(f"OCR extracted from non-picture shape: {result[:100]}...", file=sys.stderr)
+                    log_event(logger, logging.DEBUG, "OCR text extracted from non-picture shape",
+                              characters=len(result), preview=preview(result, 100))
                 return result
             except Exception as e:
-                print(f"Error processing image in shape: {e}", file=sys.stderr)
+                log_event(logger, logging.WARNING, "Error processing image in shape", error=str(e))
                 return ""
         
     except Exception as e:
-        print(f"OCR processing error: {e}", file=sys.stderr)
+        log_event(logger, logging.WARNING, "OCR processing error", error=str(e))
         return ""
     
     return ""
 
-def extract_text_from_shape(shape):
+def extract_text_from_shape(shape, seen=None):
     """
     Comprehensive text extraction from a PowerPoint shape.
     
+    Walks the shape once, reading each text container (text frame, table cell,
+    group member, chart title) exactly once. Containers are deduplicated by their
+    XML node, so repeated phrases in different containers are all kept.
+    
     Args:
         shape: PowerPoint shape object
+        seen (set): XML nodes already visited, shared across calls to skip repeats
         
     Returns:
-        str: Extracted text from the shape
+        str: Extracted text from the shape, one line per text container
+    """
+    lines = []
+    collect_text_from_shape(shape, lines, set() if seen is None else seen)
+    return "\n".join(lines) + "\n" if lines else ""
+
+def collect_text_from_shape(shape, lines, seen):
     """
-    text_content = ""
+    Append the text of every container in a shape to lines in a single traversal.
+    
+    Args:
+        shape: PowerPoint shape object
+        lines (list): Output list of text lines
+        seen (set): XML nodes already visited
+    """
+    element = shape._element
+    if element in seen:
+        return
+    seen.add(element)
     
     try:
-        # Method 1: Direct text attribute
-        if hasattr(shape, "text") and shape.text.strip():
-            text_content += shape.text.strip() + "\n"
-            print(f"    Direct text: {shape.text.strip()[:50]}...", file=sys.stderr)
-        
-        # Method 2: Text frame (for text boxes and placeholders)
-        if hasattr(shape, "text_frame") and shape.text_frame:
-            if hasattr(shape.text_frame, "text") and shape.text_frame.text.strip():
-                frame_text = shape.text_frame.text.strip()
-                if frame_text not in text_content:  # Avoid duplicates
-                    text_content += frame_text + "\n"
-                    print(f"    Text frame: {frame_text[:50]}...", file=sys.stderr)
-            
-            # Method 3: Paragraph-level extraction
-            if hasattr(shape.text_frame, "paragraphs"):
-                for para in shape.text_frame.paragraphs:
-                    if hasattr(para, "text") and para.text.strip():
-                        para_text = para.text.strip()
-                        if para_text not in text_content:  # Avoid duplicates
-                            text_content += para_text + "\n"
-                            print(f"    Paragraph: {para_text[:50]}...", file=sys.stderr)
-                    
-                    # Method 4: Run-level extraction (for styled text)
-                    if hasattr(para, "runs"):
-                        for run in para.runs:
-                            if hasattr(run, "text") and run.text.strip():
-                                run_text = run.text.strip()
-                                if run_text not in text_content:  # Avoid duplicates
-                                    text_content += run_text + "\n"
-                                    print(f"    Run: {run_text[:50]}...", file=sys.stderr)
+        # Text frames (text boxes and placeholders): the frame text already
+        # contains every paragraph and run, so it is read once
+        if getattr(shape, "has_text_frame", False):
+            frame_text = shape.text_frame.text.strip()
+            if frame_text:
+                lines.append(frame_text)
+                log_event(logger, logging.DEBUG, "Text frame", characters=len(frame_text), preview=preview(frame_text))
         
-        # Method 5: Table extraction
-        if hasattr(shape, "table"):
-            print(f"    Found table with {len(shape.table.rows)} rows", file=sys.stderr)
+        # Tables: one line per row, cells separated by tabs
+        if getattr(shape, "has_table", False):
+            log_event(logger, logging.DEBUG, "Table", rows=len(shape.table.rows))
             for row in shape.table.rows:
-                row_text = ""
-                for cell in row.cells:
-                    if hasattr(cell, "text") and cell.text.strip():
-                        row_text += cell.text.strip() + "\t"
-                    # Also check cell text frame
-                    if hasattr(cell, "text_frame") and cell.text_frame:
-                        if hasattr(cell.text_frame, "text") and cell.text_frame.text.strip():
-                            cell_frame_text = cell.text_frame.text.strip()
-                            if cell_frame_text not in row_text:
-                                row_text += cell_frame_text + "\t"
-                if row_text.strip():
-                    text_content += row_text.strip() + "\n"
-                    print(f"    Table row: {row_text.strip()[:50]}...", file=sys.stderr)
+                cell_texts = (cell.text_frame.text.strip() for cell in row.cells)
+                row_text = "\t".join(text for text in cell_texts if text)
+                if row_text:
+                    lines.append(row_text)
         
-        # Method 6: Group shape extraction (recursive)
-        if hasattr(shape, "shapes"):  # Group shape
-            print(f"    Found group with {len(shape.shapes)} sub-shapes", file=sys.stderr)
+        # Group shapes (recursive)
+        if hasattr(shape, "shapes"):
+            log_event(logger, logging.DEBUG, "Group", shapes=len(shape.shapes))
             for sub_shape in shape.shapes:
-                sub_text = extract_text_from_shape(sub_shape)
-                if sub_text and sub_text not in text_content:
-                    text_content += sub_text
+                collect_text_from_shape(sub_shape, lines, seen)
         
-        # Method 7: Chart extraction (if text is in chart)
-        if hasattr(shape, "chart"):
-            print(f"    Found chart shape", file=sys.stderr)
-            # Try to extract chart title
-            if hasattr(shape.chart, "chart_title") and shape.chart.chart_title:
-                if hasattr(shape.chart.chart_title, "text_frame") and shape.chart.chart_title.text_frame:
-                    if hasattr(shape.chart.chart_title.text_frame, "text"):
-                        chart_title = shape.chart.chart_title.text_frame.text.strip()
-                        if chart_title:
-                            text_content += chart_title + "\n"
-                            print(f"    Chart title: {chart_title[:50]}...", file=sys.stderr)
+        # Charts: only the title carries text
+        if getattr(shape, "has_chart", False) and shape.chart.has_title:
+            chart_title = shape.chart.chart_title.text_frame.text.strip()
+            if chart_title:
+                lines.append(chart_title)
+                log_event(logger, logging.DEBUG, "Chart title", preview=preview(chart_title))
         
     except Exception as e:
-        print(f"    Error extracting text from shape: {e}", file=sys.stderr)
+        log_event(logger, logging.WARNING, "Error extracting text from shape", error=str(e))
+
+def extract_text_from_slide(slide, slide_number, metrics=None):
+    """
+    Extract shape text, notes and OCR text from a single slide.
+    
+    Args:
+        slide: python-pptx Slide object
+        slide_number (int): 1-based slide number (used for logging)
+        metrics (DocumentMetrics): Optional metrics to record OCR time and image count into
+        
+    Returns:
+        dict: Slide number, combined text and whether OCR text was found
+    """
+    start = time.perf_counter()
+    slide_text = ""
+    slide_ocr_text = ""
+    
+    log_event(logger, logging.DEBUG, "Processing slide", slide=slide_number, shapes=len(slide.shapes))
+    seen = set()
+    
+    for j, shape in enumerate(slide.shapes):
+        log_event(logger, logging.DEBUG, "Shape", slide=slide_number, shape=j + 1,
+                  shapeType=getattr(shape, 'shape_type', 'unknown'))
+        
+        # Extract comprehensive text from shape
+        shape_text = extract_text_from_shape(shape, seen)
+        if shape_text.strip():
+            slide_text += shape_text
+        
+        # Extract text from images using OCR
+        if OCR_AVAILABLE:
+            ocr_result = extract_text_from_images(shape, metrics)
+            if ocr_result:
+                slide_ocr_text += ocr_result + "\n"
+    
+    # Also check slide notes (if any). has_notes_slide avoids creating a notes
+    # part on access, which keeps the shared package read-only across workers.
+    if slide.has_notes_slide:
+        for notes_shape in slide.notes_slide.shapes:
+            if hasattr(notes_shape, "text") and notes_shape.text.strip():
+                notes_text = notes_shape.text.strip()
+                # Skip the default notes placeholder text
+                if "Click to add notes" not in notes_text:
+                    slide_text += "\n[Notes]\n" + notes_text + "\n"
+                    log_event(logger, logging.DEBUG, "Notes", slide=slide_number, preview=preview(notes_text))
+    
+    # Combine regular text and OCR text
+    combined_text = slide_text
+    if slide_ocr_text.strip():
+        combined_text += "\n[OCR Text from Images]\n" + slide_ocr_text
+    
+    log_event(logger, logging.DEBUG, "Slide extracted", slide=slide_number,
+              durationMs=round((time.perf_counter() - start) * 1000, 3))
+    
+    return {
+        "slide": slide_number,
+        "text": combined_text.strip(),
+        "hasOcrText": bool(slide_ocr_text.strip())
+    }
+
+def compute_slide_hash(slide):
+    """
+    Hash a slide's XML part together with the parts its output depends on.
+    
+    Covers the slide XML plus every internal relationship target except the shared
+    layout (images, media, charts, notes), and the OCR setting, since OCR
+    availability changes the extracted text.
+    
+    Args:
+        slide: python-pptx Slide object
+        
+    Returns:
+        str: Hex SHA-256 digest identifying the slide's content
+    """
+    digest = hashlib.sha256(f"v{SLIDE_CACHE_VERSION};ocr={OCR_AVAILABLE}".encode())
+    digest.update(slide.part.blob)
+    
+    for rel in sorted(slide.part.rels.values(), key=lambda rel: rel.rId):
+        if rel.is_external or rel.reltype == RT.SLIDE_LAYOUT:
+            continue
+        digest.update(rel.reltype.encode())
+        digest.update(hashlib.sha256(rel.target_part.blob).digest())
+    
+    return digest.hexdigest()
+
+class SlideCache:
+    """
+    Per-slide extraction results persisted as one JSON file per slide hash.
     
-    return text_content
+    Writes go through a temporary file and an atomic rename, so concurrent uploads
+    never read a partially written entry. Reads refresh an entry's mtime, and evict()
+    removes the least recently used entries once the directory outgrows its limit.
+    """
+    
+    def __init__(self, cache_dir, max_bytes=DEFAULT_SLIDE_CACHE_MAX_MB * 1024 * 1024):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+    
+    def _path(self, slide_hash):
+        return self.cache_dir / f"{slide_hash}.json"
+    
+    def get(self, slide_hash):
+        path = self._path(slide_hash)
+        try:
+            with open(path, 'r', encoding='utf-8') as file:
+                entry = json.load(file)
+            os.utime(path)
+        except (FileNotFoundError, ValueError):
+            return None
+        return entry
+    
+    def put(self, slide_hash, result):
+        entry = {"text": result["text"], "hasOcrText": result["hasOcrText"]}
+        temp_path = self._path(slide_hash).with_suffix(f".{os.getpid()}.tmp")
+        with open(temp_path, 'w', encoding='utf-8') as file:
+            json.dump(entry, file)
+        os.replace(temp_path, self._path(slide_hash))
+    
+    def evict(self):
+        """
+        Remove least recently used entries while the cache is over its size limit.
+        
+        Returns:
+            int: Number of entries removed
+        """
+        entries = []
+        for path in self.cache_dir.glob("*.json"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue  # Evicted by a concurrent upload
+            entries.append((stat.st_mtime, stat.st_size, path))
+        size = sum(entry_size for _, entry_size, _ in entries)
+        if size <= self.max_bytes:
+            return 0
+        
+        target = int(self.max_bytes * SLIDE_CACHE_EVICTION_TARGET)
+        removed = 0
+        for _, entry_size, path in sorted(entries):
+            if size <= target:
+                break
+            try:
+                path.unlink()
+                removed += 1
+            except FileNotFoundError:
+                pass
+            size -= entry_size
+        return removed
+
+def resolve_worker_count(workers, slide_count):
+    """
+    Decide how many slide workers to use.
+    
+    Slides are extracted on threads because python-pptx objects cannot be sent to
+    other processes; the win comes from OCR, where tesseract runs as a subprocess
+    and releases the GIL. With no OCR there is nothing to overlap, so auto mode
+    stays sequential.
+    
+    Args:
+        workers (int): Requested worker count; 0 or None selects automatically
+        slide_count (int): Number of slides in the deck
+        
+    Returns:
+        int: Number of workers to use (at least 1)
+    """
+    if not workers:
+        workers = (os.cpu_count() or 1) if OCR_AVAILABLE else 1
+    return max(1, min(workers, slide_count))
+
+def iter_slide_results(slides, workers=None, cache=None, metrics=None):
+    """
+    Yield each slide's extraction result in slide order, reusing cached slides.
+    
+    Slide hashes are looked up in the cache before the first result; the remaining
+    slides are extracted on a thread pool (or one at a time as they are requested)
+    and stored back in the cache. Time spent waiting on extraction is recorded as
+    the "slides" stage, so a streaming consumer's own work is not counted.
+    
+    Args:
+        slides (list): python-pptx Slide objects
+        workers (int): Number of slides extracted concurrently (0 or None for automatic)
+        cache (SlideCache): Optional cache of per-slide results
+        metrics (DocumentMetrics): Optional metrics to record stages and counts into
+        
+    Yields:
+        tuple: (result, slide hash or None, whether the result came from the cache)
+    """
+    metrics = metrics or DocumentMetrics("pptx", logger)
+    worker_count = resolve_worker_count(workers, len(slides))
+    cached = [None] * len(slides)
+    slide_hashes = [None] * len(slides)
+    
+    if cache:
+        with metrics.stage("cache_lookup"):
+            slide_hashes = [compute_slide_hash(slide) for slide in slides]
+            for index, slide_hash in enumerate(slide_hashes):
+                entry = cache.get(slide_hash)
+                if entry is not None:
+                    cached[index] = {"slide": index + 1, **entry}
+    
+    pending = [index for index, result in enumerate(cached) if result is None]
+    metrics.count("slides", len(slides))
+    if cache:
+        metrics.count("cacheHits", len(slides) - len(pending))
+        metrics.count("cacheMisses", len(pending))
+    log_event(logger, logging.INFO, "Slides to extract", extract=len(pending),
+              reused=len(slides) - len(pending), workers=worker_count)
+    
+    extract_slide = partial(extract_text_from_slide, metrics=metrics)
+    executor = ThreadPoolExecutor(max_workers=worker_count) if worker_count > 1 and len(pending) > 1 else None
+    waited = 0.0
+    stored = False
+    try:
+        futures = {index: executor.submit(extract_slide, slides[index], index + 1) for index in pending} if executor else {}
+        for index, slide in enumerate(slides):
+            if cached[index] is not None:
+                yield cached[index], slide_hashes[index], True
+                continue
+            # Includes OCR time; the "ocr" stage sums OCR time across all workers
+            start = time.perf_counter()
+            result = futures[index].result() if executor else extract_slide(slide, index + 1)
+            waited += time.perf_counter() - start
+            if cache:
+                cache.put(slide_hashes[index], result)
+                stored = True
+            yield result, slide_hashes[index], False
+    finally:
+        if executor:
+            executor.shutdown(cancel_futures=True)
+        metrics.record("slides", waited)
+        log_event(logger, logging.INFO, "stage", stage="slides", durationMs=round(waited * 1000, 3),
+                  slides=len(pending), workers=worker_count)
+        if stored:
+            evicted = cache.evict()
+            if evicted:
+                metrics.count("cacheEvictions", evicted)
+
+def iter_pptx_blocks(presentation, workers=None, cache_dir=None, metrics=None, cache_max_mb=DEFAULT_SLIDE_CACHE_MAX_MB):
+    """
+    Yield one block per non-empty slide, in slide order, as slides are extracted,
+    with its text normalized (see normalize_text()).
+    
+    Args:
+        presentation: python-pptx Presentation object
+        workers (int): Number of slides extracted concurrently (0 or None for automatic)
+        cache_dir (str): Optional directory of per-slide results (see SlideCache)
+        metrics (DocumentMetrics): Optional metrics to record stages and counts into
+        cache_max_mb (float): Slide cache size limit in megabytes
+        
+    Yields:
+        dict: Block with type, position, slide number, text and whether OCR text was found
+    """
+    cache = SlideCache(cache_dir, int(cache_max_mb * 1024 * 1024)) if cache_dir else None
+    position = 0
+    for result, _, _ in iter_slide_results(list(presentation.slides), workers, cache, metrics):
+        text = normalize_text(result["text"], keep_blank_lines=True)
+        if text:
+            position += 1
+            yield {"type": "slide", "position": position, **result, "text": text}
 
-def extract_text_from_pptx(pptx_path, slide_by_slide=False):
+def extract_text_from_pptx(pptx_path, slide_by_slide=False, workers=None, cache_dir=None, metrics=None,
+                           cache_max_mb=DEFAULT_SLIDE_CACHE_MAX_MB):
     """
     Extract text from PowerPoint file including OCR from images.
     
     Args:
         pptx_path (str): Path to the .pptx file
         slide_by_slide (bool): If True, format output for slide-by-slide processing
+        workers (int): Number of slides extracted concurrently (0 or None for automatic)
+        cache_dir (str): Optional directory of per-slide results; slides whose hash is
+            already cached are reused instead of re-extracted
+        metrics (DocumentMetrics): Optional metrics to record stages and counts into
+        cache_max_mb (float): Slide cache size limit in megabytes; least recently
+            used slides are evicted beyond it
         
     Returns:
-        dict: Result containing success status, text, and metadata
+        dict: Result containing success status, text, metadata and timings
     """
+    metrics = metrics or DocumentMetrics("pptx", logger)
     try:
-        presentation = Presentation(pptx_path)
+        metrics.count("bytes", os.path.getsize(pptx_path))
+        with metrics.stage("parse"):
+            presentation = Presentation(pptx_path)
+            slides = list(presentation.slides)
+        worker_count = resolve_worker_count(workers, len(slides))
         
-        extracted_text = ""
-        slide_texts = []
-        ocr_text_found = False
+        log_event(logger, logging.INFO, "Presentation opened", slides=len(slides),
+                  workers=worker_count, ocrAvailable=OCR_AVAILABLE)
         
-        print(f"Processing {len(presentation.slides)} slides...", file=sys.stderr)
-        print(f"OCR Available: {OCR_AVAILABLE}", file=sys.stderr)
+        cache = SlideCache(cache_dir, int(cache_max_mb * 1024 * 1024)) if cache_dir else None
+        slide_results = []
+        slide_hashes = []
+        reused_slides = []
+        changed_slides = []
+        for result, slide_hash, reused in iter_slide_results(slides, workers, cache, metrics):
+            slide_results.append(result)
+            slide_hashes.append(slide_hash)
+            (reused_slides if reused else changed_slides).append(result["slide"])
         
-        for i, slide in enumerate(presentation.slides):
-            print(f"\nProcessing slide {i + 1}...", file=sys.stderr)
-            slide_text = ""
-            slide_ocr_text = ""
-            
-            print(f"Slide {i + 1} has {len(slide.shapes)} shapes", file=sys.stderr)
-            
-            for j, shape in enumerate(slide.shapes):
-                print(f"  Shape {j + 1}: Type={getattr(shape, 'shape_type', 'unknown')}", file=sys.stderr)
-                
-                # Extract comprehensive text from shape
-                shape_text = extract_text_from_shape(shape)
-                if shape_text.strip():
-                    slide_text += shape_text
-                
-                # Extract text from images using OCR
-                if OCR_AVAILABLE:
-                    print(f"    Attempting OCR on shape {j + 1}...", file=sys.stderr)
-                    ocr_result = extract_text_from_images(shape)
-                    if ocr_result:
-                        slide_ocr_text += ocr_result + "\n"
-                        ocr_text_found = True
-                        print(f"    OCR successful: {ocr_result[:50]}...", file=sys.stderr)
-                    else:
-                        print(f"    No OCR text found", file=sys.stderr)
-            
-            # Also check slide notes (if any)
-            if hasattr(slide, 'notes_slide') and slide.notes_slide:
-                print(f"  Found notes slide", file=sys.stderr)
-                for notes_shape in slide.notes_slide.shapes:
-                    if hasattr(notes_shape, "text") and notes_shape.text.strip():
-                        notes_text = notes_shape.text.strip()
-                        # Skip the default notes placeholder text
-                        if "Click to add notes" not in notes_text:
-                            slide_text += "\n[Notes]\n" + notes_text + "\n"
-                            print(f"  Notes: {notes_text[:50]}...", file=sys.stderr)
-            
-            # Combine regular text and OCR text
-            combined_text = slide_text
-            if slide_ocr_text.strip():
-                combined_text += "\n[OCR Text from Images]\n" + slide_ocr_text
-            
-            combined_text = combined_text.strip()
-            if combined_text:  # Only include non-empty text
-                slide_texts.append({
-                    "slide": i + 1,
-                    "text": combined_text,
-                    "hasOcrText": bool(slide_ocr_text.strip())
-                })
-                
-                if slide_by_slide:
-                    # For slide-by-slide mode, format each slide separately
-                    extracted_text += f"\n\n**Slide {i + 1}:**\n{combined_text}\n"
-                else:
-                    # For standard mode, use existing format
-                    extracted_text += f"\n--- Slide {i + 1} ---\n{combined_text}\n"
+        # Reassemble in slide order; only include non-empty text
+        slide_texts = [result for result in slide_results if result["text"]]
+        ocr_text_found = any(result["hasOcrText"] for result in slide_texts)
+        
+        if slide_by_slide:
+            # For slide-by-slide mode, format each slide separately
+            slide_format = "\n\n**Slide {slide}:**\n{text}\n"
+        else:
+            # For standard mode, use existing format
+            slide_format = "\n--- Slide {slide} ---\n{text}\n"
+        extracted_text = "".join(slide_format.format(**result) for result in slide_texts)
         
         # Clean up the text
-        cleaned_text = extracted_text.strip()
-        if cleaned_text:
+        with metrics.stage("normalize", characters=len(extracted_text)):
             # Normalize excessive whitespace but preserve breaks
-            lines = []
-            for line in cleaned_text.split('\n'):
-                cleaned_line = line.strip()
-                if cleaned_line or (lines and lines[-1]):  # Keep empty lines only if preceded by content
-                    lines.append(cleaned_line)
-            cleaned_text = '\n'.join(lines)
+            cleaned_text = normalize_text(extracted_text, keep_blank_lines=True)
         
-        return {
+        result = {
             "success": True,
             "text": cleaned_text,
-            "slideCount": len(presentation.slides),
+            "slideCount": len(slides),
             "slideTexts": slide_texts,
             "hasText": bool(cleaned_text.strip()),
             "ocrAvailable": OCR_AVAILABLE,
-            "ocrTextFound": ocr_text_found
+            "ocrTextFound": ocr_text_found,
+            "timings": metrics.as_dict()
         }
         
+        if cache:
+            # Let downstream re-chunking and re-embedding skip unchanged slides
+            result["slideHashes"] = slide_hashes
+            result["reusedSlides"] = reused_slides
+            result["changedSlides"] = changed_slides
+        
+        return result
+        
     except FileNotFoundError:
         return {
             "success": False,
@@ -311,11 +558,26 @@ def main():
     parser = argparse.ArgumentParser(description='Extract text from Microsoft PowerPoint (.pptx) files')
     parser.add_argument('pptx_path', help='Path to the .pptx file')
     parser.add_argument('--slide-by-slide', action='store_true', help='Format output for slide-by-slide processing')
+    parser.add_argument('--workers', type=int, default=0, help='Slides to extract concurrently (default: CPU count when OCR is available, otherwise 1)')
+    parser.add_argument('--cache-dir', help='Directory of per-slide results; unchanged slides are reused from it')
+    parser.add_argument('--cache-max-mb', type=float, default=DEFAULT_SLIDE_CACHE_MAX_MB,
+                        help='Slide cache size limit in megabytes; least recently used slides are evicted beyond it')
+    add_logging_arguments(parser)
+    add_metrics_arguments(parser)
+    add_output_arguments(parser)
     
     args = parser.parse_args()
+    configure_logging(args.log_level, args.log_json)
     
-    result = extract_text_from_pptx(args.pptx_path, slide_by_slide=args.slide_by_slide)
-    print(json.dumps(result, indent=2))
+    metrics = DocumentMetrics("pptx", logger)
+    metrics.record_startup()
+    if args.profile_memory:
+        metrics.enable_memory_profiling()
+    result = extract_text_from_pptx(args.pptx_path, slide_by_slide=args.slide_by_slide,
+                                    workers=args.workers, cache_dir=args.cache_dir, metrics=metrics,
+                                    cache_max_mb=args.cache_max_mb)
+    write_output(serialize_result(result, metrics, args.metrics_file, args.metrics_format,
+                                 output_format=args.output_format, indent=2))
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+Deferred Imports for Optional Processor Dependencies
+Checks whether optional libraries are installed without importing them, and imports
+them on first use, so a document that never reaches OCR never pays for loading PIL
+and pytesseract.
+"""
+
+import importlib.util
+from functools import lru_cache
+
+def module_available(*names):
+    """
+    True if every named top-level module can be imported.
+
+    Uses importlib.util.find_spec, which locates a module without executing it.
+
+    Args:
+        *names (str): Top-level module names, e.g. "PIL", "pytesseract"
+
+    Returns:
+        bool: True if all modules were found
+    """
+    try:
+        return all(importlib.util.find_spec(name) is not None for name in names)
+    except (ImportError, ValueError):
+        return False
+
+@lru_cache(maxsize=None)
+def load_ocr():
+    """
+    Import the OCR libraries on first call.
+
+    Returns:
+        tuple: (PIL.Image, pytesseract) modules, or None if either fails to import
+    """
+    try:
+        from PIL import Image
+        import pytesseract
+    except ImportError:
+        return None
+    return Image, pytesseract
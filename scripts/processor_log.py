@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Structured Logging for the Document Processing Scripts
+Leveled stderr logging with optional JSON event output and per-stage timing events.
+
+The level comes from --log-level or RAG_PROCESSOR_LOG_LEVEL and defaults to
+"warning", so per-shape and per-image debug output costs nothing in production.
+JSON output (--log-json or RAG_PROCESSOR_LOG_FORMAT=json) writes one event object
+per line.
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+from contextlib import contextmanager
+
+LOG_LEVEL_ENV = "RAG_PROCESSOR_LOG_LEVEL"
+LOG_FORMAT_ENV = "RAG_PROCESSOR_LOG_FORMAT"
+DEFAULT_LOG_LEVEL = "warning"
+
+LOG_LEVELS = {
+    "off": logging.CRITICAL + 10,
+    "error": logging.ERROR,
+    "warning": logging.WARNING,
+    "info": logging.INFO,
+    "debug": logging.DEBUG
+}
+
+ROOT_LOGGER_NAME = "processors"
+
+# Library use (e.g. benchmarks importing a processor) stays silent until configured
+logging.getLogger(ROOT_LOGGER_NAME).addHandler(logging.NullHandler())
+
+class JsonEventFormatter(logging.Formatter):
+    """Format each record as a single-line JSON event."""
+
+    def format(self, record):
+        event = {
+            "ts": round(record.created, 3),
+            "level": record.levelname.lower(),
+            "logger": record.name,
+            "event": record.getMessage()
+        }
+        event.update(getattr(record, "fields", {}))
+        if record.exc_info:
+            event["exception"] = self.formatException(record.exc_info)
+        return json.dumps(event, default=str)
+
+class TextEventFormatter(logging.Formatter):
+    """Format each record as 'level logger: event key=value ...'."""
+
+    def format(self, record):
+        line = f"{record.levelname.lower()} {record.name}: {record.getMessage()}"
+        fields = getattr(record, "fields", None)
+        if fields:
+            line += " " + " ".join(f"{key}={value!r}" for key, value in fields.items())
+        if record.exc_info:
+            line += "\n" + self.formatException(record.exc_info)
+        return line
+
+def get_logger(name):
+    """
+    Get the logger for a processor script.
+
+    Args:
+        name (str): Short script name, e.g. "pptx"
+
+    Returns:
+        logging.Logger: Child of the shared "processors" logger
+    """
+    return logging.getLogger(f"{ROOT_LOGGER_NAME}.{name}")
+
+def configure_logging(level=None, json_output=None, stream=None):
+    """
+    Attach a stderr handler to the shared processors logger.
+
+    Args:
+        level (str): One of LOG_LEVELS; defaults to RAG_PROCESSOR_LOG_LEVEL or "warning"
+        json_output (bool): Emit JSON events; defaults to RAG_PROCESSOR_LOG_FORMAT == "json"
+        stream: Output stream (defaults to stderr)
+    """
+    level = (level or os.environ.get(LOG_LEVEL_ENV) or DEFAULT_LOG_LEVEL).lower()
+    if json_output is None:
+        json_output = os.environ.get(LOG_FORMAT_ENV, "").lower() == "json"
+
+    root = logging.getLogger(ROOT_LOGGER_NAME)
+    root.setLevel(LOG_LEVELS.get(level, logging.WARNING))
+    root.propagate = False
+
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+
+    handler = logging.StreamHandler(stream or sys.stderr)
+    handler.setFormatter(JsonEventFormatter() if json_output else TextEventFormatter())
+    root.addHandler(handler)
+
+def add_logging_arguments(parser):
+    """Add --log-level and --log-json options to an argparse parser."""
+    parser.add_argument('--log-level', choices=list(LOG_LEVELS),
+                        help=f'Log verbosity (default: ${LOG_LEVEL_ENV} or {DEFAULT_LOG_LEVEL})')
+    parser.add_argument('--log-json', action='store_true', default=None,
+                        help='Write log events to stderr as JSON lines')
+
+def log_event(logger, level, event, **fields):
+    """
+    Log a structured event; fields are only formatted when the level is enabled.
+
+    Args:
+        logger (logging.Logger): Logger to write to
+        level (int): logging level
+        event (str): Event name or message
+        **fields: Structured fields attached to the event
+    """
+    if logger.isEnabledFor(level):
+        logger.log(level, event, extra={"fields": fields})
+
+def preview(text, length=50):
+    """Shorten text for debug events."""
+    return text if len(text) <= length else text[:length] + "..."
+
+@contextmanager
+def log_stage(logger, stage, **fields):
+    """
+    Time a processing stage and emit a "stage" event with its duration at info level.
+
+    Args:
+        logger (logging.Logger): Logger to write to
+        stage (str): Stage name, e.g. "parse" or "ocr"
+        **fields: Extra fields attached to the event
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        log_event(logger, logging.INFO, "stage", stage=stage,
+                  durationMs=round((time.perf_counter() - start) * 1000, 3), **fields)
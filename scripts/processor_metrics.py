@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+"""
+Per-Stage Metrics for the Document Processing Scripts
+Records stage durations (interpreter start, imports, parsing, OCR, normalization,
+serialization, ...) and counters (bytes, pages, slides, images, cache hits) for one
+document, returns them as the "timings" block of a result, and can append them to a
+local metrics file in Prometheus text or NDJSON form. With memory profiling enabled,
+tracemalloc also attributes allocations to stages and peak memory is reported.
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import resource
+import threading
+import tracemalloc
+from contextlib import contextmanager
+
+from processor_log import log_event
+from processor_output import serialize_output
+
+# Marks when the first processing module was imported; everything imported after
+# this (PyPDF2, python-docx, langchain, ...) is attributed to the "imports" stage
+_IMPORT_MARK = time.perf_counter()
+
+METRICS_FILE_ENV = "RAG_PROCESSOR_METRICS_FILE"
+METRIC_PREFIX = "rag_processor"
+PROFILE_MEMORY_ENV = "RAG_PROCESSOR_PROFILE_MEMORY"
+
+# Allocation sites listed per stage when memory profiling is enabled
+TOP_ALLOCATION_SITES = 5
+
+MB = 1024 * 1024
+
+def process_uptime():
+    """
+    Seconds since this process started, or None where /proc is unavailable.
+
+    Used to attribute interpreter start-up time, which happens before any of our
+    code runs.
+    """
+    try:
+        with open("/proc/self/stat", "r") as file:
+            # Field 22 is the start time in clock ticks after boot; the command name
+            # (field 2) may contain spaces, so split after its closing parenthesis
+            start_ticks = int(file.read().rsplit(")", 1)[1].split()[19])
+        with open("/proc/uptime", "r") as file:
+            uptime = float(file.read().split()[0])
+        return max(0.0, uptime - start_ticks / os.sysconf("SC_CLK_TCK"))
+    except (OSError, ValueError, IndexError):
+        return None
+
+_INTERPRETER_SECONDS = process_uptime()
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB, as reported by the OS."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    return peak / MB if sys.platform == "darwin" else peak / 1024
+
+def allocation_site(frame):
+    """Short "package/module.py:line" label for a tracemalloc frame."""
+    directory, name = os.path.split(frame.filename)
+    return f"{os.path.basename(directory)}/{name}:{frame.lineno}"
+
+class DocumentMetrics:
+    """
+    Stage durations and counters for processing one document.
+
+    Stage times accumulate, so a stage entered repeatedly (e.g. OCR per image, or
+    from several slide workers at once) reports its total time. Allocation sites
+    accumulate the same way when memory profiling is enabled; tracemalloc is
+    process-wide, so stages running concurrently on other threads share them.
+    """
+
+    def __init__(self, document_type, logger=None):
+        self.document_type = document_type
+        self.logger = logger
+        self.stages = {}
+        self.counters = {}
+        self.allocations = None
+        self.top_allocations = TOP_ALLOCATION_SITES
+        self._lock = threading.Lock()
+        self._start = time.perf_counter()
+
+    def enable_memory_profiling(self, top=TOP_ALLOCATION_SITES):
+        """
+        Trace allocations with tracemalloc and report them per stage.
+
+        Tracing slows processing down noticeably, so it is only enabled on request.
+
+        Args:
+            top (int): Allocation sites to list per stage
+        """
+        self.allocations = {}
+        self.top_allocations = top
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def record_startup(self):
+        """Record interpreter start-up and import time for a command-line run."""
+        if _INTERPRETER_SECONDS is not None:
+            self.record("interpreter", _INTERPRETER_SECONDS)
+        self.record("imports", self._start - _IMPORT_MARK)
+
+    def record(self, stage, seconds):
+        """Add seconds to a stage."""
+        with self._lock:
+            self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+
+    def count(self, name, amount=1):
+        """Add amount to a counter."""
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    @contextmanager
+    def stage(self, stage, **fields):
+        """
+        Time a stage, accumulate it and emit a "stage" log event.
+
+        Args:
+            stage (str): Stage name
+            **fields: Extra fields attached to the log event
+        """
+        before = self._snapshot() if self.allocations is not None else None
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self.record(stage, elapsed)
+            if before is not None:
+                self._record_allocations(stage, before)
+            if self.logger is not None:
+                log_event(self.logger, logging.INFO, "stage", stage=stage,
+                          durationMs=round(elapsed * 1000, 3), **fields)
+
+    @staticmethod
+    def _snapshot():
+        return tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__)
+        ))
+
+    def _record_allocations(self, stage, before):
+        """Add the allocations still held since snapshot before to a stage."""
+        differences = self._snapshot().compare_to(before, "lineno")
+        with self._lock:
+            sites = self.allocations.setdefault(stage, {})
+            for difference in differences:
+                if difference.size_diff <= 0:
+                    continue
+                site = allocation_site(difference.traceback[0])
+                size, count = sites.get(site, (0, 0))
+                sites[site] = (size + difference.size_diff, count + difference.count_diff)
+
+    def memory_profile(self):
+        """
+        Build the "memory" block of the timings when profiling is enabled.
+
+        Returns:
+            dict: Peak traced and peak RSS memory, and per stage the net bytes
+            still allocated when it finished with its top allocation sites
+        """
+        current, peak = tracemalloc.get_traced_memory()
+        stages = {}
+        for stage, sites in self.allocations.items():
+            ranked = sorted(sites.items(), key=lambda item: item[1][0], reverse=True)
+            stages[stage] = {
+                "allocatedKB": round(sum(size for size, _ in sites.values()) / 1024, 1),
+                "topAllocations": [
+                    {"site": site, "sizeKB": round(size / 1024, 1), "count": count}
+                    for site, (size, count) in ranked[:self.top_allocations]
+                ]
+            }
+        return {
+            "peakTracedMB": round(peak / MB, 3),
+            "currentTracedMB": round(current / MB, 3),
+            "peakRssMB": round(peak_rss_mb(), 3),
+            "stages": stages
+        }
+
+    def as_dict(self):
+        """
+        Build the "timings" block for a result.
+
+        Returns:
+            dict: Stage durations in milliseconds, counters and total wall time, plus
+            a "memory" block when memory profiling is enabled
+        """
+        with self._lock:
+            timings = {
+                "documentType": self.document_type,
+                "totalMs": round((time.perf_counter() - self._start) * 1000, 3),
+                "stagesMs": {stage: round(seconds * 1000, 3) for stage, seconds in self.stages.items()},
+                "counters": dict(self.counters)
+            }
+        if self.allocations is not None:
+            timings["memory"] = self.memory_profile()
+        return timings
+
+    def write(self, metrics_file, metrics_format=None, success=True):
+        """
+        Append this document's metrics to a local file.
+
+        Args:
+            metrics_file (str): Path to append to
+            metrics_format (str): "prometheus" or "ndjson"; defaults to prometheus for
+                .prom files and NDJSON otherwise
+            success (bool): Whether processing succeeded
+        """
+        if metrics_format is None:
+            metrics_format = "prometheus" if metrics_file.endswith(".prom") else "ndjson"
+
+        timings = self.as_dict()
+        timestamp = time.time()
+
+        if metrics_format == "prometheus":
+            content = format_prometheus(timings, success, timestamp,
+                                        include_headers=not os.path.exists(metrics_file))
+        else:
+            content = json.dumps({"ts": round(timestamp, 3), "success": success, **timings}) + "\n"
+
+        with open(metrics_file, "a", encoding="utf-8") as file:
+            file.write(content)
+
+def format_prometheus(timings, success, timestamp, include_headers=True):
+    """
+    Render a timings block as Prometheus text exposition samples.
+
+    Args:
+        timings (dict): Output of DocumentMetrics.as_dict()
+        success (bool): Whether processing succeeded
+        timestamp (float): Unix time of the sample
+        include_headers (bool): Emit HELP/TYPE lines (only needed once per file)
+
+    Returns:
+        str: Sample lines
+    """
+    millis = int(timestamp * 1000)
+    document_type = timings["documentType"]
+    outcome = "success" if success else "failure"
+    lines = []
+
+    if include_headers:
+        lines += [
+            f"# HELP {METRIC_PREFIX}_stage_seconds Time spent in a document processing stage",
+            f"# TYPE {METRIC_PREFIX}_stage_seconds gauge",
+            f"# HELP {METRIC_PREFIX}_document_seconds Total processing time for a document",
+            f"# TYPE {METRIC_PREFIX}_document_seconds gauge",
+            f"# HELP {METRIC_PREFIX}_items Items processed for a document (bytes, pages, slides, images, cache hits)",
+            f"# TYPE {METRIC_PREFIX}_items gauge",
+            f"# HELP {METRIC_PREFIX}_memory_bytes Peak memory while processing a document (memory profiling only)",
+            f"# TYPE {METRIC_PREFIX}_memory_bytes gauge"
+        ]
+
+    for stage, milliseconds in timings["stagesMs"].items():
+        lines.append(f'{METRIC_PREFIX}_stage_seconds{{document_type="{document_type}",stage="{stage}"}} '
+                     f'{milliseconds / 1000:.6f} {millis}')
+    lines.append(f'{METRIC_PREFIX}_document_seconds{{document_type="{document_type}",outcome="{outcome}"}} '
+                 f'{timings["totalMs"] / 1000:.6f} {millis}')
+    for name, value in timings["counters"].items():
+        lines.append(f'{METRIC_PREFIX}_items{{document_type="{document_type}",item="{name}"}} {value} {millis}')
+    if "memory" in timings:
+        for kind, key in (("peak_traced", "peakTracedMB"), ("peak_rss", "peakRssMB")):
+            lines.append(f'{METRIC_PREFIX}_memory_bytes{{document_type="{document_type}",kind="{kind}"}} '
+                         f'{int(timings["memory"][key] * MB)} {millis}')
+
+    return "\n".join(lines) + "\n"
+
+def profile_memory_requested():
+    """True if memory profiling is switched on through the environment."""
+    return os.environ.get(PROFILE_MEMORY_ENV, "").lower() in ("1", "true", "yes", "on")
+
+def add_metrics_arguments(parser):
+    """Add --metrics-file, --metrics-format and --profile-memory options to an argparse parser."""
+    parser.add_argument('--metrics-file', default=os.environ.get(METRICS_FILE_ENV),
+                        help=f'Append per-stage metrics to this file (default: ${METRICS_FILE_ENV})')
+    parser.add_argument('--metrics-format', choices=['prometheus', 'ndjson'],
+                        help='Metrics file format (default: prometheus for .prom files, otherwise ndjson)')
+    parser.add_argument('--profile-memory', action='store_true', default=profile_memory_requested(),
+                        help=f'Trace allocations and report peak memory and top allocation sites per stage '
+                             f'in the timings (default: ${PROFILE_MEMORY_ENV})')
+
+def serialize_result(result, metrics, metrics_file=None, metrics_format=None, output_format="json", **dumps_options):
+    """
+    Attach the timings block to a result, serialize it and record the metrics.
+
+    Serialization time is measured after the timings block is built, so it only
+    appears in the metrics file.
+
+    Args:
+        result (dict): Script result
+        metrics (DocumentMetrics): Metrics for this run
+        metrics_file (str): Optional metrics file to append to
+        metrics_format (str): Optional metrics file format
+        output_format (str): "json", or "binary" for processor_output frames
+        **dumps_options: Passed to json.dumps in JSON mode
+
+    Returns:
+        str | bytes: Serialized result (bytes in binary mode)
+    """
+    result["timings"] = metrics.as_dict()
+    with metrics.stage("serialize"):
+        output = serialize_output(result, output_format, **dumps_options)
+    metrics.count("outputBytes", len(output))
+    if metrics_file:
+        metrics.write(metrics_file, metrics_format, success=bool(result.get("success")))
+    return output
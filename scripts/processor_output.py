@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Compact Binary Output for the Document Processing Scripts
+Writes a script result as length-prefixed frames instead of indented JSON: a compact
+JSON header (orjson when installed) in which every long string is replaced by a
+reference, followed by those strings as raw UTF-8 frames. Large extracted text is
+then never escaped, pretty-printed or re-parsed as JSON by the caller.
+
+Layout (integers are unsigned 32-bit big-endian):
+
+    b"RPO1" | header length | header | text length | text | text length | text ...
+
+Each {"$frame": n} object in the header stands for the n-th text frame (from 0).
+Output that does not start with the magic bytes is plain JSON, which is what the
+scripts print for errors raised before the output format is known.
+"""
+
+import os
+import sys
+import json
+import struct
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+OUTPUT_FORMAT_ENV = "RAG_PROCESSOR_OUTPUT_FORMAT"
+OUTPUT_FORMATS = ("json", "binary")
+
+BINARY_MAGIC = b"RPO1"
+FRAME_KEY = "$frame"
+
+# Strings at least this long are moved out of the header into their own frame
+LARGE_TEXT_CHARS = 256
+
+_LENGTH = struct.Struct(">I")
+
+def dumps_compact(value):
+    """Serialize to compact UTF-8 JSON bytes, with orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+def encode_binary(result, large_text_chars=LARGE_TEXT_CHARS):
+    """
+    Encode a result as a header frame followed by raw UTF-8 text frames.
+
+    Args:
+        result (dict): JSON-serializable script result
+        large_text_chars (int): Minimum length of strings written as text frames
+
+    Returns:
+        bytes: Encoded output
+    """
+    frames = []
+
+    def extract(value):
+        if isinstance(value, str):
+            if len(value) < large_text_chars:
+                return value
+            frames.append(value.encode("utf-8", "surrogatepass"))
+            return {FRAME_KEY: len(frames) - 1}
+        if isinstance(value, dict):
+            return {key: extract(item) for key, item in value.items()}
+        if isinstance(value, (list, tuple)):
+            return [extract(item) for item in value]
+        return value
+
+    header = dumps_compact(extract(result))
+    parts = [BINARY_MAGIC, _LENGTH.pack(len(header)), header]
+    for frame in frames:
+        parts.append(_LENGTH.pack(len(frame)))
+        parts.append(frame)
+    return b"".join(parts)
+
+def decode_binary(data):
+    """
+    Decode output written by encode_binary(); plain JSON output is parsed as JSON.
+
+    Args:
+        data (bytes): Script output
+
+    Returns:
+        dict: The result
+    """
+    if not data.startswith(BINARY_MAGIC):
+        return json.loads(data)
+
+    offset = len(BINARY_MAGIC)
+    (header_length,) = _LENGTH.unpack_from(data, offset)
+    offset += _LENGTH.size
+    header = json.loads(data[offset:offset + header_length])
+    offset += header_length
+
+    frames = []
+    while offset < len(data):
+        (length,) = _LENGTH.unpack_from(data, offset)
+        offset += _LENGTH.size
+        frames.append(data[offset:offset + length].decode("utf-8", "surrogatepass"))
+        offset += length
+
+    def restore(value):
+        if isinstance(value, dict):
+            if len(value) == 1 and FRAME_KEY in value:
+                return frames[value[FRAME_KEY]]
+            return {key: restore(item) for key, item in value.items()}
+        if isinstance(value, list):
+            return [restore(item) for item in value]
+        return value
+
+    return restore(header)
+
+def document_chunks(data):
+    """
+    Chunks of a whole JSON or binary document: a list of chunks, or a result object
+    with "chunks" (chunk_text.py, ingest_pipeline.py) or "candidates".
+
+    Raises:
+        ValueError: If the document reports a failure
+    """
+    if isinstance(data, list):
+        return data
+    if not data.get("success", True):
+        raise ValueError(data.get("error", "Chunk input reported a failure"))
+    return data.get("candidates", data.get("chunks", []))
+
+def iter_chunks(stream):
+    """
+    Yield chunks from chunk_text.py output (JSON or binary), a JSON list of chunks or
+    ingest_pipeline.py --stream NDJSON, reading NDJSON line by line so consumers can
+    start before the input is complete.
+
+    Args:
+        stream: Binary file object
+
+    Yields:
+        dict: Chunks with at least "id" and "text"
+
+    Raises:
+        ValueError: If the input reports a failure or contains an "error" record
+    """
+    first = stream.readline()
+    if first.startswith(BINARY_MAGIC):
+        yield from document_chunks(decode_binary(first + stream.read()))
+        return
+
+    try:
+        record = json.loads(first) if first.strip() else None
+    except json.JSONDecodeError:
+        record = None
+    if not isinstance(record, dict) or not ("type" in record or "text" in record):
+        # A (possibly indented) JSON document: read the rest and parse it whole
+        yield from document_chunks(json.loads(first + stream.read()) if record is None else record)
+        return
+
+    line = first
+    while line:
+        if line.strip():
+            record = json.loads(line)
+            if record.get("type") == "error":
+                raise ValueError(record.get("error", "Chunk stream reported an error"))
+            if record.get("type", "chunk") == "chunk":
+                yield record
+        line = stream.readline()
+
+def read_chunks(source):
+    """
+    Read every chunk from a file (see iter_chunks()).
+
+    Args:
+        source (str): File path, or "-" for stdin
+
+    Returns:
+        list: Chunk dicts with at least "id" and "text"
+    """
+    if source == "-":
+        return list(iter_chunks(sys.stdin.buffer))
+    with open(source, "rb") as stream:
+        return list(iter_chunks(stream))
+
+def serialize_output(result, output_format="json", **dumps_options):
+    """
+    Serialize a result in the requested output format.
+
+    Args:
+        result (dict): Script result
+        output_format (str): "json" or "binary"
+        **dumps_options: Passed to json.dumps in JSON mode
+
+    Returns:
+        str | bytes: JSON text, or encoded bytes in binary mode
+    """
+    if output_format == "binary":
+        return encode_binary(result)
+    return json.dumps(result, **dumps_options)
+
+def write_output(output, out=None):
+    """Write serialized output to stdout: text with a trailing newline, bytes as-is."""
+    out = out or sys.stdout
+    if isinstance(output, bytes):
+        out.flush()
+        out.buffer.write(output)
+        out.buffer.flush()
+    else:
+        print(output, file=out)
+
+def add_output_arguments(parser):
+    """Add the --output-format option to an argparse parser."""
+    parser.add_argument('--output-format', choices=OUTPUT_FORMATS,
+                        default=os.environ.get(OUTPUT_FORMAT_ENV) or "json",
+                        help=f'Result encoding: indented JSON, or length-prefixed binary frames with '
+                             f'large text as raw UTF-8 (default: ${OUTPUT_FORMAT_ENV} or json; '
+                             f'ignored with --stream)')
@@ -0,0 +1,415 @@
+#!/usr/bin/env python3
+"""
+Quantized Embedding Store with Exact Re-ranking
+Keeps each segs vector as a 1-bit (sign) code and an int8 (per-dimension scalar) code
+in contiguous memory-mapped arrays. A query scans one of them with vectorized NumPy
+(Hamming distance or int8 inner products), then re-ranks a short list with the
+float32 vectors, which stay on disk and are only paged in for the short list.
+Reports the memory each representation takes and recall@k against an exact scan.
+"""
+
+import sys
+import json
+import time
+import argparse
+from pathlib import Path
+
+try:
+    import numpy as np
+except ImportError:
+    print(json.dumps({
+        "success": False,
+        "error": "numpy not installed. Please run: pip install numpy"
+    }))
+    sys.exit(1)
+
+from ann_index import (
+    normalize_rows, load_embeddings, exact_search, parse_query_vector,
+    staging_directory, publish_directory, key_codes, last_occurrences
+)
+
+STORE_VERSION = 1
+
+PRESEARCH_METHODS = ("binary", "int8")
+
+DEFAULT_TOP_K = 10
+DEFAULT_SHORTLIST = 100
+
+INT8_LIMIT = 127
+
+# Rows scanned per block, bounding the temporary arrays of a pre-search
+SCAN_BLOCK_ROWS = 65536
+
+# int8 rows widened to float32 per block; small enough for the buffer to stay in cache
+INT8_BLOCK_ROWS = 1024
+
+# numpy < 2.0 has no bitwise_count; fall back to a byte lookup table
+_bitwise_count = getattr(np, "bitwise_count", None)
+_BYTE_POPCOUNT = np.array([bin(value).count("1") for value in range(256)], dtype=np.uint8)
+
+def binary_width(dimensions):
+    """Bytes per binary code: one bit per dimension, padded to whole 64-bit words."""
+    return -(-dimensions // 64) * 8
+
+def popcount_rows(words):
+    """Number of set bits in each row of a 2-D uint8 array whose rows are whole 64-bit words."""
+    if _bitwise_count is not None:
+        return _bitwise_count(words.view(np.uint64)).sum(axis=1, dtype=np.uint16)
+    return _BYTE_POPCOUNT[words].sum(axis=1, dtype=np.uint16)
+
+class QuantizedStore:
+    """
+    Binary and int8 codes for unit-length vectors, with the float32 vectors for re-ranking.
+
+    Binary codes are the signs of the vectors after subtracting the corpus mean, so
+    the bits split evenly; int8 codes are the vectors divided by a per-dimension scale
+    (the largest magnitude seen in calibration, over 127) and rounded.
+    """
+
+    def __init__(self, center, scales, documents=None):
+        self.center = np.asarray(center, dtype=np.float32)
+        self.scales = np.asarray(scales, dtype=np.float32)
+        self.dimensions = len(self.center)
+        self.documents = list(documents or [])
+        self._document_numbers = {doc: number for number, doc in enumerate(self.documents)}
+        self.binary = np.empty((0, binary_width(self.dimensions)), dtype=np.uint8)
+        self.int8 = np.empty((0, self.dimensions), dtype=np.int8)
+        self.keys = np.empty((0, 2), dtype=np.int64)
+        self.vectors = np.empty((0, self.dimensions), dtype=np.float32)
+
+    @classmethod
+    def calibrate(cls, vectors, sample=100000, seed=0):
+        """
+        Derive the binary threshold and int8 scales from (a sample of) vectors.
+
+        Args:
+            vectors (ndarray): (n, d) vectors; normalized here
+            sample (int): Maximum vectors examined
+            seed (int): Random seed
+
+        Returns:
+            QuantizedStore: Empty store
+        """
+        rng = np.random.default_rng(seed)
+        rows = np.sort(rng.choice(len(vectors), min(len(vectors), sample), replace=False))
+        data = normalize_rows(vectors[rows])
+        limits = np.abs(data).max(axis=0)
+        return cls(data.mean(axis=0), np.where(limits > 0, limits, 1.0) / INT8_LIMIT)
+
+    def quantize_binary(self, vectors):
+        """Pack the signs of mean-centred vectors into (n, binary_width) bytes."""
+        bits = np.packbits(vectors > self.center, axis=-1)
+        padding = binary_width(self.dimensions) - bits.shape[-1]
+        if padding:
+            bits = np.pad(bits, [(0, 0)] * (bits.ndim - 1) + [(0, padding)])
+        return bits
+
+    def quantize_int8(self, vectors):
+        """Scale, round and clip vectors to int8 codes."""
+        return np.clip(np.rint(vectors / self.scales), -INT8_LIMIT, INT8_LIMIT).astype(np.int8)
+
+    def add(self, vectors, documents, keys):
+        """
+        Quantize and append vectors with their segs keys.
+
+        Keys that are already stored are replaced (their earlier rows are dropped);
+        within vectors, the last row for a key wins.
+
+        Args:
+            vectors (ndarray): (n, d) vectors
+            documents (list): Document names that keys refer to by number
+            keys (ndarray): (n, 2) [document number, chunk id] rows
+
+        Returns:
+            tuple: (new keys added, existing keys replaced)
+        """
+        if vectors.shape[1] != self.dimensions:
+            raise ValueError(f"Expected {self.dimensions}-dimensional vectors, got {vectors.shape[1]}")
+        mapping = np.empty(len(documents), dtype=np.int64)
+        for number, doc in enumerate(documents):
+            if doc not in self._document_numbers:
+                self._document_numbers[doc] = len(self.documents)
+                self.documents.append(doc)
+            mapping[number] = self._document_numbers[doc]
+        keys = np.asarray(keys, dtype=np.int64).reshape(-1, 2)
+        keys = np.column_stack([mapping[keys[:, 0]], keys[:, 1]]) if len(keys) else keys
+        if len(keys):
+            unique_rows = last_occurrences(keys)
+            if len(unique_rows) < len(keys):
+                vectors, keys = vectors[unique_rows], keys[unique_rows]
+        replaced = 0
+        if len(keys) and len(self.keys):
+            kept = ~np.isin(key_codes(self.keys), key_codes(keys))
+            replaced = len(kept) - int(kept.sum())
+            if replaced:
+                self.vectors = np.asarray(self.vectors)[kept]
+                self.binary = np.asarray(self.binary)[kept]
+                self.int8 = np.asarray(self.int8)[kept]
+                self.keys = np.asarray(self.keys)[kept]
+
+        added_vectors = []
+        added_binary = []
+        added_int8 = []
+        for start in range(0, len(vectors), SCAN_BLOCK_ROWS):
+            block = normalize_rows(vectors[start:start + SCAN_BLOCK_ROWS])
+            added_vectors.append(block)
+            added_binary.append(self.quantize_binary(block))
+            added_int8.append(self.quantize_int8(block))
+
+        if added_vectors:
+            self.vectors = np.concatenate([np.asarray(self.vectors), *added_vectors])
+            self.binary = np.concatenate([np.asarray(self.binary), *added_binary])
+            self.int8 = np.concatenate([np.asarray(self.int8), *added_int8])
+            self.keys = np.concatenate([np.asarray(self.keys), keys])
+        return len(keys) - replaced, replaced
+
+    def presearch_scores(self, query, method):
+        """
+        Approximate similarity of a normalized query to every stored vector.
+
+        Binary scores are 1 - 2 * Hamming distance / d, in [-1, 1]; int8 scores are
+        inner products of the codes with the query scaled back to float.
+        """
+        scores = np.empty(len(self.keys), dtype=np.float32)
+        if method == "binary":
+            query_bits = self.quantize_binary(query)
+            for start in range(0, len(scores), SCAN_BLOCK_ROWS):
+                distances = popcount_rows(np.bitwise_xor(self.binary[start:start + SCAN_BLOCK_ROWS], query_bits))
+                scores[start:start + len(distances)] = 1.0 - 2.0 * distances / self.dimensions
+        elif method == "int8":
+            weights = (query * self.scales).astype(np.float32)
+            widened = np.empty((INT8_BLOCK_ROWS, self.dimensions), dtype=np.float32)
+            for start in range(0, len(scores), INT8_BLOCK_ROWS):
+                block = self.int8[start:start + INT8_BLOCK_ROWS]
+                np.copyto(widened[:len(block)], block)
+                np.matmul(widened[:len(block)], weights, out=scores[start:start + len(block)])
+        else:
+            raise ValueError(f"Unknown pre-search method: {method}")
+        return scores
+
+    def search(self, query, top_k=DEFAULT_TOP_K, presearch="binary", shortlist=DEFAULT_SHORTLIST):
+        """
+        Find the vectors most similar to a query.
+
+        Args:
+            query (ndarray): (d,) query vector
+            top_k (int): Number of results
+            presearch (str): "binary" (Hamming) or "int8" scan of every vector
+            shortlist (int): Best pre-search candidates re-scored with float32
+                vectors (0 to return pre-search scores)
+
+        Returns:
+            list: {"doc", "id", "score"} dicts, best first; scores are cosine
+                similarities (approximate when shortlist is 0)
+        """
+        if top_k <= 0 or not len(self.keys):
+            return []
+        query = normalize_rows(query.reshape(-1))
+        approximate = self.presearch_scores(query, presearch)
+
+        keep = min(max(top_k, shortlist), len(approximate))
+        candidates = np.argpartition(-approximate, keep - 1)[:keep]
+        if shortlist > 0:
+            # Sorted rows read the mapped float vectors front to back
+            candidates = np.sort(candidates)
+            scores = np.asarray(self.vectors[candidates] @ query)
+        else:
+            scores = approximate[candidates]
+
+        ranked = np.lexsort((candidates, -scores))[:top_k]
+        return [
+            {"doc": self.documents[int(self.keys[candidate, 0])], "id": int(self.keys[candidate, 1]),
+             "score": round(float(score), 4)}
+            for candidate, score in zip(candidates[ranked], scores[ranked])
+        ]
+
+    def memory_report(self):
+        """Bytes held by each representation, and how much smaller the codes are than float32."""
+        count = len(self.keys)
+        float_bytes = count * self.dimensions * 4
+        int8_bytes = count * self.dimensions + self.scales.nbytes
+        binary_bytes = count * binary_width(self.dimensions) + self.center.nbytes
+        return {
+            "count": count,
+            "float32Bytes": float_bytes,
+            "int8Bytes": int8_bytes,
+            "binaryBytes": binary_bytes,
+            "int8Ratio": round(float_bytes / int8_bytes, 2) if int8_bytes else None,
+            "binaryRatio": round(float_bytes / binary_bytes, 2) if binary_bytes else None
+        }
+
+    def save(self, store_dir):
+        """Write the store as .npy files plus meta.json, replacing store_dir in one rename."""
+        staging = staging_directory(store_dir)
+        np.save(staging / "center.npy", self.center)
+        np.save(staging / "scales.npy", self.scales)
+        np.save(staging / "binary.npy", np.asarray(self.binary))
+        np.save(staging / "int8.npy", np.asarray(self.int8))
+        np.save(staging / "keys.npy", np.asarray(self.keys))
+        np.save(staging / "vectors.npy", np.asarray(self.vectors))
+        (staging / "meta.json").write_text(json.dumps({
+            "version": STORE_VERSION,
+            "dimensions": self.dimensions,
+            "count": len(self.keys),
+            "documents": self.documents
+        }), encoding="utf-8")
+        publish_directory(staging, store_dir)
+
+    @classmethod
+    def load(cls, store_dir):
+        """Open a saved store; codes, keys and vectors are memory-mapped."""
+        store_dir = Path(store_dir)
+        meta = json.loads((store_dir / "meta.json").read_text(encoding="utf-8"))
+        if meta.get("version") != STORE_VERSION:
+            raise ValueError(f"Unsupported quantized store version: {meta.get('version')}")
+        store = cls(np.load(store_dir / "center.npy"), np.load(store_dir / "scales.npy"), meta["documents"])
+        store.binary = np.load(store_dir / "binary.npy", mmap_mode="r")
+        store.int8 = np.load(store_dir / "int8.npy", mmap_mode="r")
+        store.keys = np.load(store_dir / "keys.npy", mmap_mode="r")
+        store.vectors = np.load(store_dir / "vectors.npy", mmap_mode="r")
+        return store
+
+def benchmark(store, queries, top_k, settings):
+    """
+    Measure recall@k against an exact float32 scan, and per-query latency.
+
+    Args:
+        store (QuantizedStore): Loaded store
+        queries (ndarray): (q, d) query vectors
+        top_k (int): k for recall
+        settings (list): (presearch method, shortlist) pairs to measure
+
+    Returns:
+        list: One dict per setting with recall and latency percentiles; the
+            exact scan itself is reported with presearch "float32"
+    """
+    keys = np.asarray(store.keys)
+    truth = []
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        best = exact_search(store.vectors, query, top_k)
+        latencies.append(time.perf_counter() - start)
+        truth.append({tuple(keys[number]) for number in best})
+
+    def report(presearch, shortlist, hits):
+        latencies.sort()
+        return {
+            "presearch": presearch,
+            "shortlist": shortlist,
+            "recallAtK": round(hits / (len(queries) * top_k), 4),
+            "p50Ms": round(latencies[len(latencies) // 2] * 1000, 3),
+            "p95Ms": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000, 3)
+        }
+
+    reports = [report("float32", 0, len(queries) * top_k)]
+    for presearch, shortlist in settings:
+        latencies = []
+        hits = 0
+        for query, expected in zip(queries, truth):
+            start = time.perf_counter()
+            results = store.search(query, top_k, presearch, shortlist)
+            latencies.append(time.perf_counter() - start)
+            found = {(store._document_numbers[result["doc"]], result["id"]) for result in results}
+            hits += len(found & expected)
+        reports.append(report(presearch, shortlist, hits))
+    return reports
+
+def main():
+    parser = argparse.ArgumentParser(description='Search segs embeddings through binary/int8 codes with float32 re-ranking')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    build_parser = subparsers.add_parser('build', help='Quantize exported embeddings (see ann_index.py export) into a new store')
+    build_parser.add_argument('embeddings', help='Exported .npy file')
+    build_parser.add_argument('store_dir', help='Store directory to write')
+
+    add_parser = subparsers.add_parser('add', help='Append newly exported chunks using the existing scales')
+    add_parser.add_argument('store_dir', help='Store directory')
+    add_parser.add_argument('embeddings', help='Exported .npy file with the new chunks')
+
+    query_parser = subparsers.add_parser('query', help='Return the chunks most similar to a vector')
+    query_parser.add_argument('store_dir', help='Store directory')
+    source = query_parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--vector', help='Query vector as a JSON list')
+    source.add_argument('--text', help='Query text, embedded with the SQLite stand-in model')
+    query_parser.add_argument('--presearch', choices=PRESEARCH_METHODS, default='binary', help='Codes scanned before re-ranking')
+    query_parser.add_argument('--shortlist', type=int, default=DEFAULT_SHORTLIST, help='Candidates re-scored with float32 vectors (0 to skip)')
+
+    bench_parser = subparsers.add_parser('bench', help='Report memory use, recall@k and latency against an exact scan')
+    bench_parser.add_argument('store_dir', help='Store directory')
+    bench_parser.add_argument('--queries', type=int, default=200, help='Stored vectors (plus noise) used as queries')
+    bench_parser.add_argument('--shortlist-values', type=int, nargs='+', default=[0, 20, 50, 100, 200],
+                              help='Shortlist sizes to measure for each pre-search method')
+
+    for subparser in (query_parser, bench_parser):
+        subparser.add_argument('--top-k', type=int, default=DEFAULT_TOP_K, help='Number of results')
+
+    args = parser.parse_args()
+
+    def fail(message):
+        print(json.dumps({"success": False, "error": message}))
+        sys.exit(1)
+
+    if args.command in ("build", "add"):
+        start = time.perf_counter()
+        try:
+            vectors, documents, keys = load_embeddings(args.embeddings)
+        except (OSError, ValueError, KeyError) as e:
+            fail(f"Could not read embeddings: {str(e)}")
+        try:
+            if args.command == "build":
+                store = QuantizedStore.calibrate(vectors)
+            else:
+                store = QuantizedStore.load(args.store_dir)
+            added, replaced = store.add(vectors, documents, keys)
+            store.save(args.store_dir)
+        except (OSError, ValueError) as e:
+            fail(f"Could not {args.command} store: {str(e)}")
+        print(json.dumps({
+            "success": True,
+            "storeDir": args.store_dir,
+            "added": added,
+            "replaced": replaced,
+            "memory": store.memory_report(),
+            "seconds": round(time.perf_counter() - start, 3)
+        }, indent=2))
+        return
+
+    try:
+        start = time.perf_counter()
+        store = QuantizedStore.load(args.store_dir)
+        loaded = time.perf_counter()
+    except (OSError, ValueError, KeyError) as e:
+        fail(f"Could not open store: {str(e)}")
+
+    if args.command == "query":
+        try:
+            query = parse_query_vector(args, store.dimensions)
+        except ValueError as e:
+            fail(str(e))
+        searched = time.perf_counter()
+        results = store.search(query, args.top_k, args.presearch, args.shortlist)
+        print(json.dumps({
+            "success": True,
+            "results": results,
+            "loadMs": round((loaded - start) * 1000, 3),
+            "queryMs": round((time.perf_counter() - searched) * 1000, 3)
+        }, indent=2))
+        return
+
+    rng = np.random.default_rng(1)
+    sample = rng.choice(len(store.keys), min(args.queries, len(store.keys)), replace=False)
+    queries = np.asarray(store.vectors[np.sort(sample)])
+    # Perturb each query by about 10% of its length so it is not an exact match
+    queries = queries + rng.normal(0, 0.1 / np.sqrt(store.dimensions), queries.shape).astype(np.float32)
+    settings = [(presearch, shortlist) for presearch in PRESEARCH_METHODS for shortlist in args.shortlist_values]
+    print(json.dumps({
+        "success": True,
+        "memory": store.memory_report(),
+        "queries": len(queries),
+        "topK": args.top_k,
+        "settings": benchmark(store, queries, args.top_k, settings)
+    }, indent=2))
+
+if __name__ == "__main__":
+    main()
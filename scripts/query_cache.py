@@ -0,0 +1,382 @@
+#!/usr/bin/env python3
+"""
+Semantic Query Cache for RAG Retrieval
+Remembers recent questions with their embeddings and top-k segs (doc, id) results
+in a SQLite file. A repeated question (same words after case and whitespace
+folding) is answered without embedding it; a reworded one is answered when its
+embedding's cosine similarity to a cached question reaches a threshold, skipping
+the vector scan. Loading a document bumps its generation, which invalidates the
+entries retrieved from it; entries also expire after a maximum age.
+
+`retrieve` runs the whole lookup-then-search flow against Oracle (VECTOR_EMBEDDING
+and vector_distance, as Vectorize.tsx does) or the SQLite stand-in.
+"""
+
+import os
+import sys
+import json
+import time
+import array
+import sqlite3
+import hashlib
+import argparse
+from pathlib import Path
+
+try:
+    import numpy as np
+except ImportError:
+    print(json.dumps({
+        "success": False,
+        "error": "numpy not installed. Please run: pip install numpy"
+    }))
+    sys.exit(1)
+
+from segs_loader import EMBEDDING_MODEL, DEFAULT_QUERY_CACHE_PATH, connect_sqlite, connect_oracle, stand_in_embedding
+
+DEFAULT_CACHE_PATH = DEFAULT_QUERY_CACHE_PATH
+DEFAULT_THRESHOLD = 0.92
+DEFAULT_MAX_ENTRIES = 1000
+DEFAULT_MAX_AGE_SECONDS = 3600
+DEFAULT_TOP_K = 5
+
+# Scope of questions asked across all documents; loading any document invalidates it
+ALL_DOCUMENTS = ""
+
+SCHEMA = """
+create table if not exists queries (
+    id integer primary key,
+    scope text not null,
+    question_key blob not null,
+    question text not null,
+    vector blob not null,
+    top_k integer not null,
+    results text not null,
+    generation integer not null,
+    created real not null,
+    last_used real not null
+);
+create index if not exists queries_scope_key on queries (scope, question_key);
+create index if not exists queries_last_used on queries (last_used);
+create table if not exists generations (
+    scope text primary key,
+    generation integer not null
+);
+create table if not exists cache_stats (
+    name text primary key,
+    value integer not null
+);
+"""
+
+STAT_NAMES = ("exactHits", "semanticHits", "misses", "stores", "invalidations", "evictions")
+
+ORACLE_EMBED_SQL = f"select vector_embedding({EMBEDDING_MODEL} using :question as data) from dual"
+ORACLE_SEARCH_SQL = {
+    "doc": ("select doc, id from segs where doc = :doc "
+            "order by vector_distance(vec, :vec, COSINE) fetch first :k rows only"),
+    "all": "select doc, id from segs order by vector_distance(vec, :vec, COSINE) fetch first :k rows only"
+}
+
+def question_key(question):
+    """sha256 of the question with case and whitespace folded."""
+    return hashlib.sha256(" ".join(question.lower().split()).encode("utf-8", "surrogatepass")).digest()
+
+class QueryCache:
+    """
+    SQLite-backed cache of question embeddings and their retrieval results.
+
+    lookup() returns a cached result or None; on None, retrieve as usual and pass the
+    results, with the generation lookup() read, to store(). Call invalidate_document()
+    whenever a document's chunks change.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, threshold=DEFAULT_THRESHOLD, max_entries=DEFAULT_MAX_ENTRIES,
+                 max_age=DEFAULT_MAX_AGE_SECONDS):
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("pragma journal_mode = wal")
+        self.connection.execute("pragma synchronous = normal")
+        self.connection.executescript(SCHEMA)
+        self.session = dict.fromkeys(STAT_NAMES, 0)
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def generation(self, scope):
+        row = self.connection.execute("select generation from generations where scope = ?", (scope,)).fetchone()
+        return row[0] if row else 0
+
+    def lookup(self, question, scope=ALL_DOCUMENTS, top_k=DEFAULT_TOP_K, embed=None):
+        """
+        Answer a question from the cache if possible.
+
+        Args:
+            question (str): The user's question
+            scope (str): Document the search is restricted to (ALL_DOCUMENTS for none)
+            top_k (int): Results needed; entries stored with fewer cannot answer
+            embed (callable): question -> float32 vector bytes, called only when
+                there is no exact match (None to check exact matches only)
+
+        Returns:
+            tuple: (hit, vector bytes or None, generation); hit is None on a miss,
+                otherwise a dict with "match" ("exact" or "semantic"), "similarity",
+                "question" and the first top_k "results". The vector is returned so a
+                miss does not embed the question twice, and the scope's generation so
+                store() can tag results with the data they were searched against.
+        """
+        generation = self.generation(scope)
+        oldest = time.time() - self.max_age
+        row = self.connection.execute(
+            "select id, question, results from queries where scope = ? and question_key = ? and top_k >= ? "
+            "and generation = ? and created >= ? order by created desc limit 1",
+            (scope, question_key(question), top_k, generation, oldest)).fetchone()
+        if row:
+            return self._hit(row, "exact", 1.0, top_k), None, generation
+        if embed is None:
+            self._count(misses=1)
+            self.connection.commit()
+            return None, None, generation
+
+        vector = embed(question)
+        rows = self.connection.execute(
+            "select id, question, results, vector from queries where scope = ? and top_k >= ? "
+            "and generation = ? and created >= ?", (scope, top_k, generation, oldest)).fetchall()
+        if rows:
+            query = np.frombuffer(vector, dtype=np.float32)
+            matrix = np.frombuffer(b"".join(row[3] for row in rows), dtype=np.float32).reshape(len(rows), -1)
+            norms = np.linalg.norm(matrix, axis=1) * (np.linalg.norm(query) or 1.0)
+            similarities = (matrix @ query) / np.where(norms > 0, norms, 1.0)
+            best = int(np.argmax(similarities))
+            if similarities[best] >= self.threshold:
+                return self._hit(rows[best][:3], "semantic", float(similarities[best]), top_k), vector, generation
+
+        self._count(misses=1)
+        self.connection.commit()
+        return None, vector, generation
+
+    def _hit(self, row, match, similarity, top_k):
+        entry_id, question, results = row
+        self.connection.execute("update queries set last_used = ? where id = ?", (time.time(), entry_id))
+        self._count(**{f"{match}Hits": 1})
+        self.connection.commit()
+        return {"match": match, "similarity": round(similarity, 4), "question": question,
+                "results": json.loads(results)[:top_k]}
+
+    def store(self, question, vector, results, scope=ALL_DOCUMENTS, top_k=DEFAULT_TOP_K, generation=None):
+        """
+        Cache a question's results (as returned by the search), then evict the least
+        recently used entries beyond max_entries.
+
+        Args:
+            generation (int): Generation returned by the lookup() that preceded the
+                search. Results searched before an invalidation are tagged with the
+                old generation, so lookups never return them; None reads the current
+                generation, which is only safe when nothing can load concurrently.
+        """
+        current = self.generation(scope)
+        if generation is None:
+            generation = current
+        elif generation != current:
+            return  # Invalidated while the search ran
+        now = time.time()
+        self.connection.execute(
+            "insert into queries (scope, question_key, question, vector, top_k, results, generation, created, last_used) "
+            "values (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (scope, question_key(question), question, bytes(vector), top_k, json.dumps(results),
+             generation, now, now))
+        self._count(stores=1)
+        excess = self.connection.execute("select count(*) from queries").fetchone()[0] - self.max_entries
+        if excess > 0:
+            self.connection.execute(
+                "delete from queries where id in (select id from queries order by last_used limit ?)", (excess,))
+            self._count(evictions=excess)
+        self.connection.commit()
+
+    def invalidate_document(self, doc):
+        """
+        Invalidate entries for a document whose chunks changed, and every entry
+        searched across all documents. Stale rows are deleted here; the bumped
+        generations also stop lookups from returning entries stored concurrently.
+
+        Returns:
+            int: Entries removed
+        """
+        scopes = [doc, ALL_DOCUMENTS]
+        self.connection.executemany(
+            "insert into generations (scope, generation) values (?, 1) "
+            "on conflict (scope) do update set generation = generation + 1", [(scope,) for scope in scopes])
+        removed = self.connection.execute(
+            "delete from queries where scope in (?, ?)", scopes).rowcount
+        self._count(invalidations=removed)
+        self.connection.commit()
+        return removed
+
+    def _count(self, **increments):
+        for name, amount in increments.items():
+            self.session[name] += amount
+        self.connection.executemany(
+            "insert into cache_stats (name, value) values (?, ?) "
+            "on conflict (name) do update set value = value + excluded.value",
+            [(name, amount) for name, amount in increments.items() if amount])
+
+    def stats(self):
+        """Entry count and hit rates for this session and the file's lifetime."""
+        totals = dict.fromkeys(STAT_NAMES, 0)
+        totals.update(self.connection.execute("select name, value from cache_stats"))
+
+        def hit_rate(counts):
+            hits = counts["exactHits"] + counts["semanticHits"]
+            lookups = hits + counts["misses"]
+            return round(hits / lookups, 4) if lookups else None
+
+        return {
+            "path": str(self.path),
+            "entries": self.connection.execute("select count(*) from queries").fetchone()[0],
+            "threshold": self.threshold,
+            "session": {**self.session, "hitRate": hit_rate(self.session)},
+            "lifetime": {**totals, "hitRate": hit_rate(totals)}
+        }
+
+def search_segs(connection, backend, vector, scope, top_k):
+    """
+    Full vector search over segs.
+
+    Returns:
+        list: {"doc", "id"} dicts, nearest first
+    """
+    cursor = connection.cursor()
+    try:
+        if backend == "oracle":
+            statement = ORACLE_SEARCH_SQL["doc" if scope else "all"]
+            parameters = {"vec": array.array("f", vector), "k": top_k}
+            if scope:
+                parameters["doc"] = scope
+            cursor.execute(statement, parameters)
+            return [{"doc": doc, "id": int(chunk_id)} for doc, chunk_id in cursor]
+
+        if scope:
+            cursor.execute("select doc, id, vec from segs where doc = ? and vec is not null", (scope,))
+        else:
+            cursor.execute("select doc, id, vec from segs where vec is not null")
+        rows = cursor.fetchall()
+    finally:
+        cursor.close()
+    if not rows:
+        return []
+    matrix = np.frombuffer(b"".join(row[2] for row in rows), dtype=np.float32).reshape(len(rows), -1)
+    scores = matrix @ np.frombuffer(vector, dtype=np.float32)
+    best = np.argsort(-scores, kind="stable")[:top_k]
+    return [{"doc": rows[number][0], "id": int(rows[number][1])} for number in best]
+
+def embedder_for(connection, backend):
+    """question -> float32 vector bytes, with the database's model (or the SQLite stand-in)."""
+    if backend == "sqlite":
+        return stand_in_embedding
+
+    def embed(question):
+        cursor = connection.cursor()
+        try:
+            cursor.execute(ORACLE_EMBED_SQL, {"question": question})
+            return array.array("f", cursor.fetchone()[0]).tobytes()
+        finally:
+            cursor.close()
+    return embed
+
+def main():
+    parser = argparse.ArgumentParser(description='Answer repeated RAG questions from a semantic cache of retrieval results')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    retrieve_parser = subparsers.add_parser('retrieve', help='Return the top-k chunks for a question, from the cache when possible')
+    retrieve_parser.add_argument('question', help='The question')
+    retrieve_parser.add_argument('--doc', default=ALL_DOCUMENTS, help='Restrict the search to one document')
+    retrieve_parser.add_argument('--top-k', type=int, default=DEFAULT_TOP_K, help='Number of chunks')
+    retrieve_parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                                 help='Cosine similarity at which a cached question answers a new one')
+    retrieve_parser.add_argument('--max-entries', type=int, default=DEFAULT_MAX_ENTRIES, help='Entries kept (least recently used are evicted)')
+    retrieve_parser.add_argument('--max-age', type=float, default=DEFAULT_MAX_AGE_SECONDS, help='Seconds an entry stays valid')
+    retrieve_parser.add_argument('--backend', choices=['oracle', 'sqlite'], default='sqlite', help='Database holding segs')
+    retrieve_parser.add_argument('--sqlite-path', default='temp/segs.db', help='SQLite stand-in database file')
+    retrieve_parser.add_argument('--user', default=os.environ.get('ORACLE_USER'), help='Oracle user (default: $ORACLE_USER)')
+    retrieve_parser.add_argument('--dsn', default=os.environ.get('ORACLE_DSN'), help='Oracle connect string (default: $ORACLE_DSN)')
+
+    invalidate_parser = subparsers.add_parser('invalidate', help="Drop cached results for a document whose chunks changed")
+    invalidate_parser.add_argument('doc', help='Document name (segs.doc)')
+
+    subparsers.add_parser('stats', help='Report entries and hit rates')
+
+    for subparser in subparsers.choices.values():
+        subparser.add_argument('--cache-path', default=DEFAULT_CACHE_PATH, help='Cache database file')
+
+    args = parser.parse_args()
+
+    def fail(message):
+        print(json.dumps({"success": False, "error": message}))
+        sys.exit(1)
+
+    if args.command != "retrieve":
+        try:
+            with QueryCache(args.cache_path) as cache:
+                result = {"success": True}
+                if args.command == "invalidate":
+                    result.update({"doc": args.doc, "removed": cache.invalidate_document(args.doc)})
+                result.update(cache.stats())
+        except sqlite3.Error as e:
+            fail(f"Could not open cache: {str(e)}")
+        print(json.dumps(result, indent=2))
+        return
+
+    if args.top_k <= 0:
+        fail("Top-k must be greater than 0")
+
+    try:
+        if args.backend == "oracle":
+            if not args.user or not args.dsn:
+                fail("Oracle backend needs --user/--dsn (or ORACLE_USER/ORACLE_DSN) and ORACLE_PASSWORD")
+            connection = connect_oracle(args.user, args.dsn, os.environ.get('ORACLE_PASSWORD'))
+        else:
+            connection = connect_sqlite(args.sqlite_path)
+    except ImportError:
+        fail("python-oracledb not installed. Please run: pip install oracledb")
+    except Exception as e:
+        fail(f"Could not connect to {args.backend}: {str(e)}")
+
+    timings = {}
+    try:
+        with QueryCache(args.cache_path, args.threshold, args.max_entries, args.max_age) as cache:
+            start = time.perf_counter()
+            hit, vector, generation = cache.lookup(args.question, args.doc, args.top_k,
+                                                   embedder_for(connection, args.backend))
+            timings["lookupMs"] = round((time.perf_counter() - start) * 1000, 3)
+            if hit is None:
+                start = time.perf_counter()
+                results = search_segs(connection, args.backend, vector, args.doc, args.top_k)
+                timings["searchMs"] = round((time.perf_counter() - start) * 1000, 3)
+                cache.store(args.question, vector, results, args.doc, args.top_k, generation)
+                hit = {"match": None, "results": results}
+            stats = cache.stats()
+    except Exception as e:
+        fail(f"Retrieval failed: {str(e)}")
+    finally:
+        connection.close()
+
+    print(json.dumps({
+        "success": True,
+        "cache": hit["match"] or "miss",
+        **{key: value for key, value in hit.items() if key not in ("match", "results")},
+        "results": hit["results"],
+        "timings": timings,
+        "hitRate": stats["lifetime"]["hitRate"]
+    }, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,356 @@
+#!/usr/bin/env python3
+"""
+Retrieval Evaluation Across Chunking Configurations
+Extracts a document set once, chunks it with chunk_text.py's splitter for every
+chunk size / overlap in a grid, embeds the chunks with a pluggable local embedder
+and runs a file of queries against each configuration. Reports recall@k, MRR,
+passage coverage, chunk/embedding counts and query latency per configuration,
+and recommends the cheapest one (fewest embeddings) that reaches a target recall.
+
+Queries are JSON lines: {"query": "...", "expected": "passage text", "doc": "optional
+file name"}. A chunk counts as relevant when at least half of the shorter of the
+chunk and the expected passage overlap.
+"""
+
+import re
+import sys
+import json
+import time
+import asyncio
+import sqlite3
+import argparse
+import importlib
+from pathlib import Path
+
+try:
+    import numpy as np
+except ImportError:
+    print(json.dumps({
+        "success": False,
+        "error": "numpy not installed. Please run: pip install numpy"
+    }))
+    sys.exit(1)
+
+from chunk_text import chunk_blocks, BLOCK_SEPARATOR
+from ingest_pipeline import detect_document_type, iter_document_blocks, validate_chunk_settings
+from segs_loader import stand_in_embedding
+from ann_index import normalize_rows
+from embedding_cache import EmbeddingCache, DEFAULT_CACHE_PATH, DEFAULT_MAX_MB
+
+DEFAULT_CHUNK_SIZES = [250, 500, 1000, 2000]
+DEFAULT_OVERLAPS = [0, 100, 200]
+DEFAULT_K_VALUES = [1, 5, 10]
+DEFAULT_TARGET_RECALL = 0.9
+
+# Share of the shorter of chunk and passage that must overlap for a chunk to count
+RELEVANT_OVERLAP = 0.5
+
+TEXT_SUFFIXES = {".txt", ".text"}
+
+def load_document_text(path, max_pages=50):
+    """
+    Extract a document to the text that chunk offsets refer to: its blocks joined by
+    BLOCK_SEPARATOR. Plain text files are one block.
+
+    Returns:
+        tuple: (blocks list, joined text)
+    """
+    if Path(path).suffix.lower() in TEXT_SUFFIXES:
+        blocks = [{"text": Path(path).read_text(encoding="utf-8", errors="replace"), "position": 1}]
+    else:
+        document_type = detect_document_type(path)
+        if document_type is None:
+            raise ValueError(f"Unsupported document type: {Path(path).suffix or path}")
+        blocks = list(iter_document_blocks(path, document_type, max_pages))
+    texts = [block.get("text", "").strip() for block in blocks]
+    return blocks, BLOCK_SEPARATOR.join(text for text in texts if text)
+
+def read_queries(path):
+    """Read query records from a JSON lines file (or a JSON list)."""
+    content = Path(path).read_text(encoding="utf-8")
+    if content.lstrip().startswith("["):
+        records = json.loads(content)
+    else:
+        records = [json.loads(line) for line in content.splitlines() if line.strip()]
+    for number, record in enumerate(records, 1):
+        if not record.get("query") or not record.get("expected"):
+            raise ValueError(f"Query {number} needs non-empty \"query\" and \"expected\" fields")
+    return records
+
+def locate_passage(passage, documents, doc=None):
+    """
+    Find an expected passage in the extracted documents, ignoring whitespace differences.
+
+    Args:
+        passage (str): Expected passage text
+        documents (dict): Document name -> joined text
+        doc (str): Only search this document
+
+    Returns:
+        tuple: (document name, start, end), or None if the passage is not found
+    """
+    pattern = re.compile(r"\s+".join(re.escape(word) for word in passage.split()))
+    for name, text in documents.items():
+        if doc is not None and name != doc:
+            continue
+        match = pattern.search(text)
+        if match:
+            return name, match.start(), match.end()
+    return None
+
+def relevant_chunks(span, chunk_docs, chunk_starts, chunk_ends):
+    """Boolean mask of the chunks that cover enough of the passage span."""
+    doc, start, end = span
+    overlap = np.minimum(chunk_ends, end) - np.maximum(chunk_starts, start)
+    shorter = np.minimum(chunk_ends - chunk_starts, end - start)
+    return (chunk_docs == doc) & (overlap > 0) & (overlap >= RELEVANT_OVERLAP * shorter)
+
+def passage_coverage(span, chunk_starts, chunk_ends, chunk_docs, retrieved):
+    """Fraction of the passage's characters inside at least one retrieved chunk."""
+    doc, start, end = span
+    covered = np.zeros(end - start, dtype=bool)
+    for number in retrieved:
+        if chunk_docs[number] == doc:
+            covered[max(chunk_starts[number], start) - start:max(min(chunk_ends[number], end) - start, 0)] = True
+    return float(covered.mean()) if len(covered) else 0.0
+
+def stand_in_embedder(texts):
+    """The SQLite stand-in's hashed bag-of-words model."""
+    return np.vstack([np.frombuffer(stand_in_embedding(text), dtype=np.float32) for text in texts])
+
+class OllamaEmbedder:
+    """Embeds through embed_client.py's batched client, keeping one event loop and connection pool."""
+
+    def __init__(self, base_url, model, batch_size, concurrency):
+        from embed_client import OllamaEmbedClient
+        self.batch_size = batch_size
+        self.loop = asyncio.new_event_loop()
+        self.client = OllamaEmbedClient(base_url, model, concurrency)
+
+    def __call__(self, texts):
+        async def run():
+            vectors = [None] * len(texts)
+            chunks = ({"id": number, "text": text} for number, text in enumerate(texts))
+            async for batch, batch_vectors in self.client.embed_chunks(chunks, self.batch_size):
+                for chunk, vector in zip(batch, batch_vectors):
+                    vectors[chunk["id"]] = vector
+            return vectors
+        return np.asarray(self.loop.run_until_complete(run()), dtype=np.float32)
+
+    def close(self):
+        self.loop.run_until_complete(self.client.close())
+        self.loop.close()
+
+class CachedEmbedder:
+    """
+    Wraps an embedder with an EmbeddingCache: texts are looked up first, only the
+    misses are embedded, and their vectors are stored. Every grid configuration
+    re-embeds mostly the same text, so later configurations are largely hits.
+    """
+
+    def __init__(self, embed, cache):
+        self.embed = embed
+        self.cache = cache
+
+    def __call__(self, texts):
+        found = self.cache.get_many(texts)
+        missing = [position for position in range(len(texts)) if position not in found]
+        fresh = np.asarray(self.embed([texts[position] for position in missing]), dtype=np.float32) if missing else None
+        if fresh is not None:
+            self.cache.put_many((texts[position], vector.tobytes()) for position, vector in zip(missing, fresh))
+
+        dimensions = fresh.shape[1] if fresh is not None else len(next(iter(found.values()))) // 4
+        vectors = np.empty((len(texts), dimensions), dtype=np.float32)
+        for position, vector in found.items():
+            vectors[position] = np.frombuffer(vector, dtype=np.float32)
+        if fresh is not None:
+            vectors[missing] = fresh
+        return vectors
+
+    def close(self):
+        if hasattr(self.embed, "close"):
+            self.embed.close()
+        self.cache.close()
+
+def load_embedder(name, args):
+    """
+    Resolve --embedder: "stand-in", "ollama", or "module:function" for any callable
+    that takes a list of texts and returns one vector per text.
+    """
+    if name == "stand-in":
+        embed = stand_in_embedder
+    elif name == "ollama":
+        embed = OllamaEmbedder(args.base_url, args.model, args.batch_size, args.concurrency)
+    else:
+        module_name, _, function_name = name.partition(":")
+        if not function_name:
+            raise ValueError(f"Embedder must be stand-in, ollama or module:function, not {name!r}")
+        function = getattr(importlib.import_module(module_name), function_name)
+
+        def embed(texts):
+            return np.asarray(function(texts), dtype=np.float32)
+    if not args.embedding_cache:
+        return embed
+    # Cache keys use the model name, so vectors are shared with segs_loader.py and embed_client.py
+    model = args.model if name == "ollama" else name
+    return CachedEmbedder(embed, EmbeddingCache(args.embedding_cache, model, int(args.cache_max_mb * 1024 * 1024)))
+
+def evaluate_configuration(documents, queries, spans, embed, chunk_size, overlap, k_values):
+    """
+    Chunk, embed and query one configuration.
+
+    Args:
+        documents (dict): Document name -> (blocks, joined text)
+        queries (list): Query records
+        spans (list): (doc, start, end) of each query's expected passage
+        embed (callable): Texts -> (n, d) vectors
+        chunk_size (int): Target chunk size in characters
+        overlap (int): Characters of overlap
+        k_values (list): Cut-offs for recall@k and coverage@k
+
+    Returns:
+        dict: Counts, costs and quality metrics for the configuration
+    """
+    start = time.perf_counter()
+    texts, docs, starts, ends = [], [], [], []
+    for name, (blocks, _) in documents.items():
+        for chunk in chunk_blocks(blocks, chunk_size, overlap):
+            texts.append(chunk["text"])
+            docs.append(name)
+            starts.append(chunk["start"])
+            ends.append(chunk["end"])
+    chunked = time.perf_counter()
+    vectors = normalize_rows(embed(texts)) if texts else np.empty((0, 0), dtype=np.float32)
+    embedded = time.perf_counter()
+
+    chunk_docs = np.asarray(docs, dtype=object)
+    chunk_starts = np.asarray(starts, dtype=np.int64)
+    chunk_ends = np.asarray(ends, dtype=np.int64)
+    depth = min(max(k_values), len(texts))
+
+    hits = {k: 0 for k in k_values}
+    coverage = {k: 0.0 for k in k_values}
+    reciprocal_ranks = 0.0
+    latencies = []
+    for query, span in zip(queries, spans):
+        began = time.perf_counter()
+        query_vector = normalize_rows(embed([query["query"]])[0])
+        scores = vectors @ query_vector
+        best = np.argpartition(-scores, depth - 1)[:depth] if depth else np.empty(0, dtype=np.int64)
+        ranked = best[np.argsort(-scores[best], kind="stable")]
+        latencies.append(time.perf_counter() - began)
+
+        relevant = relevant_chunks(span, chunk_docs, chunk_starts, chunk_ends)
+        relevant_ranks = np.flatnonzero(relevant[ranked])
+        if len(relevant_ranks):
+            reciprocal_ranks += 1.0 / (relevant_ranks[0] + 1)
+        for k in k_values:
+            hits[k] += bool(len(relevant_ranks)) and relevant_ranks[0] < k
+            coverage[k] += passage_coverage(span, chunk_starts, chunk_ends, chunk_docs, ranked[:k])
+
+    latencies.sort()
+    count = len(queries)
+    return {
+        "chunkSize": chunk_size,
+        "overlap": overlap,
+        "chunks": len(texts),
+        "embeddedCharacters": sum(len(text) for text in texts),
+        "chunkSeconds": round(chunked - start, 3),
+        "embedSeconds": round(embedded - chunked, 3),
+        "recallAtK": {str(k): round(hits[k] / count, 4) for k in k_values},
+        "coverageAtK": {str(k): round(coverage[k] / count, 4) for k in k_values},
+        "mrr": round(reciprocal_ranks / count, 4),
+        "queryP50Ms": round(latencies[len(latencies) // 2] * 1000, 3),
+        "queryP95Ms": round(latencies[min(count - 1, int(count * 0.95))] * 1000, 3)
+    }
+
+def recommend(configurations, k, target_recall):
+    """The configuration with the fewest chunks whose recall@k reaches the target, or None."""
+    passing = [config for config in configurations if config["recallAtK"][str(k)] >= target_recall]
+    if not passing:
+        return None
+    best = min(passing, key=lambda config: (config["chunks"], config["embeddedCharacters"]))
+    return {"chunkSize": best["chunkSize"], "overlap": best["overlap"], "chunks": best["chunks"],
+            "recallAtK": best["recallAtK"][str(k)]}
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure retrieval quality and cost for a grid of chunk sizes and overlaps')
+    parser.add_argument('queries', help='JSON lines file of {"query", "expected", optional "doc"} records')
+    parser.add_argument('documents', nargs='+', help='Documents (any type ingest_pipeline.py reads, or .txt)')
+    parser.add_argument('--chunk-sizes', type=int, nargs='+', default=DEFAULT_CHUNK_SIZES, help='Chunk sizes to try')
+    parser.add_argument('--overlaps', type=int, nargs='+', default=DEFAULT_OVERLAPS, help='Overlaps to try (skipped when >= the size)')
+    parser.add_argument('--k', type=int, nargs='+', default=DEFAULT_K_VALUES, help='Cut-offs for recall@k')
+    parser.add_argument('--target-recall', type=float, default=DEFAULT_TARGET_RECALL,
+                        help='Recall@k (largest k) the recommended configuration must reach')
+    parser.add_argument('--embedder', default='stand-in', help='stand-in, ollama, or module:function')
+    parser.add_argument('--base-url', default=None, help='Ollama server for --embedder ollama')
+    parser.add_argument('--model', default=None, help='Ollama embedding model for --embedder ollama')
+    parser.add_argument('--batch-size', type=int, default=32, help='Texts per Ollama request')
+    parser.add_argument('--concurrency', type=int, default=4, help='Ollama requests in flight')
+    parser.add_argument('--max-pages', type=int, default=50, help='Maximum PDF pages to process')
+    parser.add_argument('--embedding-cache', nargs='?', const=DEFAULT_CACHE_PATH, default=None, metavar='PATH',
+                        help=f'Reuse embeddings of previously seen chunk text from this cache (default path: {DEFAULT_CACHE_PATH})')
+    parser.add_argument('--cache-max-mb', type=float, default=DEFAULT_MAX_MB, help='Embedding cache size limit in megabytes')
+
+    args = parser.parse_args()
+
+    def fail(message):
+        print(json.dumps({"success": False, "error": message}))
+        sys.exit(1)
+
+    if args.embedder == "ollama":
+        from embed_client import DEFAULT_BASE_URL, DEFAULT_MODEL
+        args.base_url = args.base_url or DEFAULT_BASE_URL
+        args.model = args.model or DEFAULT_MODEL
+
+    grid = [(size, overlap) for size in args.chunk_sizes for overlap in args.overlaps
+            if validate_chunk_settings(size, overlap) is None]
+    if not grid:
+        fail("No valid chunk size / overlap combination (overlap must be less than the size)")
+
+    try:
+        queries = read_queries(args.queries)
+    except (OSError, ValueError) as e:
+        fail(f"Could not read queries: {str(e)}")
+    if not queries:
+        fail("The query file is empty")
+
+    documents = {}
+    try:
+        for path in args.documents:
+            documents[Path(path).name] = load_document_text(path, args.max_pages)
+    except Exception as e:
+        fail(f"Could not extract {path}: {str(e)}")
+
+    texts = {name: text for name, (_, text) in documents.items()}
+    spans = [locate_passage(query["expected"], texts, query.get("doc")) for query in queries]
+    missing = [number for number, span in enumerate(spans, 1) if span is None]
+    if missing:
+        fail(f"Expected passages not found in the documents for queries {missing[:10]}")
+
+    try:
+        embed = load_embedder(args.embedder, args)
+    except (ImportError, AttributeError, ValueError, sqlite3.Error) as e:
+        fail(f"Could not load embedder: {str(e)}")
+
+    configurations = []
+    try:
+        for size, overlap in grid:
+            configurations.append(evaluate_configuration(documents, queries, spans, embed, size, overlap, args.k))
+    except Exception as e:
+        fail(f"Evaluation failed at chunk size {size}, overlap {overlap}: {str(e)}")
+    finally:
+        if hasattr(embed, "close"):
+            embed.close()
+
+    print(json.dumps({
+        "success": True,
+        "documents": len(documents),
+        "queries": len(queries),
+        "embedder": args.embedder,
+        "configurations": configurations,
+        "recommended": recommend(configurations, max(args.k), args.target_recall)
+    }, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+"""
+Bulk Loader for the segs Table
+Loads chunk_text.py / ingest_pipeline.py chunks into segs with array-bound batch
+inserts and a single set-based VECTOR_EMBEDDING update per document, instead of one
+INSERT and one correlated UPDATE round trip per chunk. Chunks can also be written as
+a CSV and SQL*Loader control file, and a SQLite stand-in is available for local runs.
+With --embedding-cache, chunk text embedded before gets its cached vector and only
+the remaining rows go through the embedding update.
+"""
+
+import os
+import sys
+import csv
+import json
+import time
+import array
+import hashlib
+import argparse
+import sqlite3
+from pathlib import Path
+
+from embedding_cache import EmbeddingCache, DEFAULT_CACHE_PATH, DEFAULT_MAX_MB
+from processor_output import read_chunks
+
+EMBEDDING_MODEL = "ALL_MINILM_L12_V2"
+DEFAULT_BATCH_SIZE = 500
+
+# query_cache.py's default database; loads invalidate it whenever it exists
+DEFAULT_QUERY_CACHE_PATH = "temp/query-cache.db"
+
+# Dimension of the ALL_MINILM_L12_V2 vectors, mirrored by the SQLite stand-in
+STAND_IN_DIMENSIONS = 384
+
+DELETE_SQL = "delete from segs where doc = :doc"
+INSERT_SQL = "insert into segs (id, seg, doc) values (:id, :seg, :doc)"
+EMBED_SQL = {
+    "oracle": f"update segs set vec = VECTOR_EMBEDDING({EMBEDDING_MODEL} USING seg as data) where doc = :doc",
+    "sqlite": "update segs set vec = vector_embedding(seg) where doc = :doc"
+}
+
+# With an embedding cache: cached vectors are written directly, the model only
+# embeds the rows still without one, and those vectors are read back to cache them
+SET_VECTOR_SQL = "update segs set vec = :vec where doc = :doc and id = :id and vec is null"
+EMBED_MISSING_SQL = {backend: f"{statement} and vec is null" for backend, statement in EMBED_SQL.items()}
+SELECT_VECTORS_SQL = "select id, vec from segs where doc = :doc"
+
+SQLITE_SCHEMA = """
+create table if not exists segs (
+    id integer not null,
+    seg text,
+    doc text not null,
+    vec blob,
+    series text
+)
+"""
+
+SQLITE_INDEX = "create index if not exists segs_doc_id on segs (doc, id)"
+
+def normalize_segment(text):
+    """
+    Flatten a chunk the way Vectorize.tsx does before inserting it.
+
+    Newlines and tabs become spaces so rows match the ones the UI loads. Quotes and
+    backslashes are left alone because the text is passed as a bind variable.
+    """
+    return text.replace("\r\n", " ").replace("\n", " ").replace("\t", " ").strip()
+
+def segment_rows(chunks, document_name):
+    """Build segs bind rows for a document's chunks."""
+    return [
+        {"id": int(chunk["id"]), "seg": normalize_segment(chunk["text"]), "doc": document_name}
+        for chunk in chunks
+    ]
+
+def stand_in_embedding(text):
+    """
+    Deterministic hashed bag-of-words vector used by the SQLite stand-in.
+
+    It only has to be cheap and repeatable so local runs exercise the same statements
+    as the database; it is not a substitute for the real model.
+    """
+    vector = [0.0] * STAND_IN_DIMENSIONS
+    for word in text.lower().split():
+        digest = hashlib.blake2b(word.encode("utf-8"), digest_size=8).digest()
+        bucket = int.from_bytes(digest[:4], "little") % STAND_IN_DIMENSIONS
+        vector[bucket] += 1.0 if digest[4] & 1 else -1.0
+    norm = sum(value * value for value in vector) ** 0.5 or 1.0
+    return array.array("f", (value / norm for value in vector)).tobytes()
+
+def vector_bytes(backend, vec):
+    """float32 bytes of a segs.vec value (SQLite blob, or python-oracledb array)."""
+    if backend == "sqlite":
+        return bytes(vec)
+    return vec.tobytes() if getattr(vec, "typecode", None) == "f" else array.array("f", vec).tobytes()
+
+def vector_bind_value(backend, data):
+    """Bind value for writing float32 bytes to segs.vec."""
+    if backend == "sqlite":
+        return data
+    return array.array("f", data)
+
+def connect_sqlite(path):
+    """Open (and create if needed) the SQLite stand-in for segs."""
+    if path != ":memory:":
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+    connection = sqlite3.connect(path)
+    connection.execute(SQLITE_SCHEMA)
+    connection.execute(SQLITE_INDEX)
+    connection.create_function("vector_embedding", 1, stand_in_embedding, deterministic=True)
+    return connection
+
+def connect_oracle(user, dsn, password):
+    """
+    Connect to Oracle with python-oracledb (imported here so it stays optional).
+
+    Raises:
+        ImportError: If python-oracledb is not installed
+    """
+    import oracledb
+    return oracledb.connect(user=user, password=password, dsn=dsn)
+
+def load_document(connection, backend, rows, document_name, batch_size=DEFAULT_BATCH_SIZE, replace=True, embed=True,
+                  cache=None):
+    """
+    Write one document's rows to segs and embed them.
+
+    Args:
+        connection: DB-API connection (python-oracledb or sqlite3)
+        backend (str): "oracle" or "sqlite"
+        rows (list): Bind rows from segment_rows()
+        document_name (str): Value of segs.doc
+        batch_size (int): Rows per executemany() call
+        replace (bool): Delete the document's existing rows first
+        embed (bool): Run the set-based embedding update
+        cache (EmbeddingCache): Reuse vectors for text embedded before, and
+            store the new ones (default: embed every row)
+
+    Returns:
+        dict: Row, batch and round-trip counts with per-step timings
+    """
+    stats = {"rows": len(rows), "batches": 0, "roundTrips": 0, "stagesMs": {}}
+    cursor = connection.cursor()
+
+    def timed(stage, statement, parameters, many=False):
+        start = time.perf_counter()
+        if many:
+            cursor.executemany(statement, parameters)
+        else:
+            cursor.execute(statement, parameters)
+        stats["roundTrips"] += 1
+        stats["stagesMs"][stage] = round(stats["stagesMs"].get(stage, 0.0) + (time.perf_counter() - start) * 1000, 3)
+
+    try:
+        if replace:
+            timed("delete", DELETE_SQL, {"doc": document_name})
+
+        if backend == "oracle" and any(len(row["seg"]) > 4000 for row in rows):
+            import oracledb
+            cursor.setinputsizes(seg=oracledb.DB_TYPE_CLOB)
+
+        for start in range(0, len(rows), batch_size):
+            timed("insert", INSERT_SQL, rows[start:start + batch_size], many=True)
+            stats["batches"] += 1
+
+        if embed and cache is None:
+            timed("embed", EMBED_SQL[backend], {"doc": document_name})
+        elif embed:
+            cached = cache.get_many([row["seg"] for row in rows])
+            stats["cache"] = {"hits": len(cached), "misses": len(rows) - len(cached)}
+            if cached:
+                updates = [
+                    {"vec": vector_bind_value(backend, cached[position]), "doc": document_name, "id": rows[position]["id"]}
+                    for position in sorted(cached)
+                ]
+                for start in range(0, len(updates), batch_size):
+                    timed("cachedVectors", SET_VECTOR_SQL, updates[start:start + batch_size], many=True)
+            if len(cached) < len(rows):
+                timed("embed", EMBED_MISSING_SQL[backend], {"doc": document_name})
+                missed = {row["id"]: row["seg"] for position, row in enumerate(rows) if position not in cached}
+                timed("readVectors", SELECT_VECTORS_SQL, {"doc": document_name})
+                start = time.perf_counter()
+                cache.put_many(
+                    (missed[chunk_id], vector_bytes(backend, vec))
+                    for chunk_id, vec in cursor
+                    if chunk_id in missed and vec is not None
+                )
+                stats["stagesMs"]["cacheStore"] = round((time.perf_counter() - start) * 1000, 3)
+
+        start = time.perf_counter()
+        connection.commit()
+        stats["roundTrips"] += 1
+        stats["stagesMs"]["commit"] = round((time.perf_counter() - start) * 1000, 3)
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        cursor.close()
+
+    return stats
+
+def write_sqlldr_files(rows, document_name, output_dir):
+    """
+    Write a CSV, a SQL*Loader control file and the embedding update script.
+
+    Load with `sqlldr control=<ctl>` (or map the CSV as an external table), then run
+    the .sql script once to embed the whole document.
+
+    Returns:
+        dict: Paths of the generated files and the commands to run
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    base = "".join(ch if ch.isalnum() or ch in "-_" else "_" for ch in document_name) or "segs"
+    csv_path = output_dir / f"{base}.csv"
+    ctl_path = output_dir / f"{base}.ctl"
+    sql_path = output_dir / f"{base}_embed.sql"
+
+    with open(csv_path, "w", encoding="utf-8", newline="") as file:
+        writer = csv.writer(file, quoting=csv.QUOTE_ALL, lineterminator="\n")
+        for row in rows:
+            writer.writerow([row["id"], row["doc"], row["seg"]])
+
+    longest = max((len(row["seg"].encode("utf-8")) for row in rows), default=1)
+    ctl_path.write_text(
+        "LOAD DATA\n"
+        "CHARACTERSET AL32UTF8\n"
+        f"INFILE '{csv_path.name}'\n"
+        "APPEND\n"
+        "INTO TABLE segs\n"
+        "FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '\"'\n"
+        "TRAILING NULLCOLS\n"
+        f"(id INTEGER EXTERNAL, doc CHAR(4000), seg CHAR({max(longest, 4000)}))\n",
+        encoding="utf-8"
+    )
+
+    escaped_name = document_name.replace("'", "''")
+    embed_statement = EMBED_SQL["oracle"].replace(":doc", f"'{escaped_name}'")
+    sql_path.write_text(f"{embed_statement};\ncommit;\n", encoding="utf-8")
+
+    return {
+        "csv": str(csv_path),
+        "controlFile": str(ctl_path),
+        "embedScript": str(sql_path),
+        "commands": [
+            f"delete from segs where doc = '{escaped_name}';",
+            f"sqlldr control={ctl_path.name}",
+            f"@{sql_path.name}"
+        ]
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='Bulk load chunks into the segs table and embed them in one statement')
+    parser.add_argument('chunks', help='chunk_text.py JSON or ingest_pipeline.py --stream NDJSON file ("-" for stdin)')
+    parser.add_argument('--doc', required=True, help='Document name stored in segs.doc')
+    parser.add_argument('--backend', choices=['oracle', 'sqlite', 'csv'], default='sqlite',
+                        help='Oracle via python-oracledb, the local SQLite stand-in, or SQL*Loader files')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE, help='Rows per batch insert')
+    parser.add_argument('--append', action='store_true', help="Keep the document's existing rows instead of replacing them")
+    parser.add_argument('--no-embed', action='store_true', help='Insert rows without running the embedding update')
+    parser.add_argument('--embedding-cache', nargs='?', const=DEFAULT_CACHE_PATH, default=None, metavar='PATH',
+                        help=f'Reuse embeddings of previously seen chunk text from this cache (default path: {DEFAULT_CACHE_PATH})')
+    parser.add_argument('--cache-max-mb', type=float, default=DEFAULT_MAX_MB, help='Embedding cache size limit in megabytes')
+    parser.add_argument('--query-cache', default=DEFAULT_QUERY_CACHE_PATH, metavar='PATH',
+                        help="Query cache (query_cache.py) whose results for the document are invalidated after "
+                             f"loading, if it exists (default: {DEFAULT_QUERY_CACHE_PATH})")
+    parser.add_argument('--no-query-cache', action='store_true', help='Leave the query cache untouched')
+    parser.add_argument('--sqlite-path', default='temp/segs.db', help='SQLite stand-in database file')
+    parser.add_argument('--output-dir', default='temp/segs-load', help='Directory for SQL*Loader files')
+    parser.add_argument('--user', default=os.environ.get('ORACLE_USER'), help='Oracle user (default: $ORACLE_USER)')
+    parser.add_argument('--dsn', default=os.environ.get('ORACLE_DSN'), help='Oracle connect string (default: $ORACLE_DSN)')
+
+    args = parser.parse_args()
+
+    def fail(message):
+        print(json.dumps({"success": False, "error": message}))
+        sys.exit(1)
+
+    if args.batch_size <= 0:
+        fail("Batch size must be greater than 0")
+
+    try:
+        rows = segment_rows(read_chunks(args.chunks), args.doc)
+    except (OSError, ValueError, KeyError) as e:
+        fail(f"Could not read chunks: {str(e)}")
+
+    result = {"success": True, "doc": args.doc, "backend": args.backend}
+
+    if args.backend == "csv":
+        result.update({"rows": len(rows), **write_sqlldr_files(rows, args.doc, args.output_dir)})
+        print(json.dumps(result, indent=2))
+        return
+
+    try:
+        if args.backend == "oracle":
+            if not args.user or not args.dsn:
+                fail("Oracle backend needs --user/--dsn (or ORACLE_USER/ORACLE_DSN) and ORACLE_PASSWORD")
+            connection = connect_oracle(args.user, args.dsn, os.environ.get('ORACLE_PASSWORD'))
+        else:
+            connection = connect_sqlite(args.sqlite_path)
+    except ImportError:
+        fail("python-oracledb not installed. Please run: pip install oracledb")
+    except Exception as e:
+        fail(f"Could not connect to {args.backend}: {str(e)}")
+
+    cache = None
+    try:
+        if args.embedding_cache and not args.no_embed:
+            cache = EmbeddingCache(args.embedding_cache, EMBEDDING_MODEL if args.backend == "oracle" else "stand-in",
+                                   int(args.cache_max_mb * 1024 * 1024))
+        stats = load_document(connection, args.backend, rows, args.doc, args.batch_size,
+                              replace=not args.append, embed=not args.no_embed, cache=cache)
+        if cache is not None:
+            stats["cache"] = {**stats.get("cache", {}), **cache.stats()}
+    except Exception as e:
+        fail(f"Load failed: {str(e)}")
+    finally:
+        connection.close()
+        if cache is not None:
+            cache.close()
+
+    result.update(stats)
+
+    if not args.no_query_cache and os.path.exists(args.query_cache):
+        # Imported here: query_cache.py needs numpy and imports this module
+        from query_cache import QueryCache
+        try:
+            with QueryCache(args.query_cache) as query_cache:
+                result["queryCacheInvalidated"] = query_cache.invalidate_document(args.doc)
+        except Exception as e:
+            fail(f"Loaded, but could not invalidate the query cache: {str(e)}")
+
+    print(json.dumps(result, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+"""
+Synthetic Document Corpus Generator
+Generates deterministic PDF, Word, PowerPoint, Excel, CSV, HTML and Markdown files
+locally for benchmarking the processors and the chunker: varying page/paragraph/
+slide/row counts, tables, and images with rendered text (so OCR has something to read).
+"""
+
+import io
+import sys
+import csv
+import json
+import random
+import argparse
+import zlib
+from pathlib import Path
+
+WORDS = (
+    "student teacher lesson schedule studio practice rhythm tempo routine class "
+    "ballroom latin swing waltz tango foxtrot rumba salsa cha merengue bolero "
+    "instructor invoice payment package session weekly monthly private group "
+    "beginner intermediate advanced technique posture frame footwork timing music "
+    "showcase competition rehearsal choreography partner lead follow turn spin"
+).split()
+
+# Size buckets used by the benchmark suite; each maps to generator arguments
+SIZE_BUCKETS = {
+    "small": {"pdf": {"pages": 3}, "docx": {"paragraphs": 40, "tables": 1, "images": 0},
+              "pptx": {"slides": 5, "images": 0}, "xlsx": {"rows": 500}, "csv": {"rows": 1000},
+              "html": {"sections": 20}, "markdown": {"sections": 20}},
+    "medium": {"pdf": {"pages": 25}, "docx": {"paragraphs": 400, "tables": 5, "images": 2},
+               "pptx": {"slides": 40, "images": 2}, "xlsx": {"rows": 20000}, "csv": {"rows": 50000},
+               "html": {"sections": 1000}, "markdown": {"sections": 1000}},
+    "large": {"pdf": {"pages": 50}, "docx": {"paragraphs": 3000, "tables": 20, "images": 5},
+              "pptx": {"slides": 200, "images": 5}, "xlsx": {"rows": 100000}, "csv": {"rows": 1000000},
+              "html": {"sections": 20000}, "markdown": {"sections": 20000}}
+}
+
+def sentence(rng, words=12):
+    """Return a pseudo-random sentence."""
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+def paragraph(rng, sentences=4):
+    """Return a pseudo-random paragraph."""
+    return " ".join(sentence(rng, rng.randint(8, 16)) for _ in range(sentences))
+
+def render_text_image(text, width=800, height=200):
+    """
+    Render text onto a white PNG so OCR has something to read.
+
+    Returns:
+        bytes: PNG data, or None if Pillow is not installed
+    """
+    try:
+        from PIL import Image, ImageDraw, ImageFont
+    except ImportError:
+        return None
+
+    image = Image.new("RGB", (width, height), "white")
+    draw = ImageDraw.Draw(image)
+    try:
+        font = ImageFont.load_default(size=28)
+    except TypeError:
+        font = ImageFont.load_default()
+    draw.multiline_text((20, 20), text, fill="black", font=font)
+
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+def _pdf_escape(text):
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+def generate_pdf(path, pages=10, seed=0, lines_per_page=40):
+    """
+    Write a text PDF with the given number of pages using only the standard library.
+
+    Every page has a heading, body lines and a small table rendered as text rows.
+    """
+    rng = random.Random(seed)
+    objects = []
+
+    def add(obj):
+        objects.append(obj)
+        return len(objects)
+
+    catalog_id = add(None)
+    pages_id = add(None)
+    font_id = add(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+
+    page_ids = []
+    for page_number in range(1, pages + 1):
+        lines = [f"Section {page_number}: {sentence(rng, 6)}"]
+        lines += [sentence(rng, rng.randint(8, 14)) for _ in range(lines_per_page - 6)]
+        lines += [f"Row {row} | {rng.choice(WORDS)} | {rng.randint(1, 500)} | {rng.choice(WORDS)}" for row in range(5)]
+
+        stream_lines = ["BT", "/F1 10 Tf", "12 TL", "50 770 Td"]
+        for line in lines:
+            stream_lines.append(f"({_pdf_escape(line)}) Tj T*")
+        stream_lines.append("ET")
+        content = zlib.compress("\n".join(stream_lines).encode("latin-1"))
+
+        content_id = add(b"<< /Length %d /Filter /FlateDecode >>\nstream\n" % len(content) + content + b"\nendstream")
+        page_ids.append(add(
+            f"<< /Type /Page /Parent {pages_id} 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 {font_id} 0 R >> >> /Contents {content_id} 0 R >>".encode()
+        ))
+
+    kids = " ".join(f"{page_id} 0 R" for page_id in page_ids)
+    objects[pages_id - 1] = f"<< /Type /Pages /Kids [{kids}] /Count {len(page_ids)} >>".encode()
+    objects[catalog_id - 1] = f"<< /Type /Catalog /Pages {pages_id} 0 R >>".encode()
+
+    output = bytearray(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(output))
+        output += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+
+    xref_offset = len(output)
+    output += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        output += b"%010d 00000 n \n" % offset
+    output += b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+        len(objects) + 1, catalog_id, xref_offset)
+
+    Path(path).write_bytes(bytes(output))
+
+def generate_docx(path, paragraphs=100, tables=2, images=1, seed=0):
+    """Write a Word document with headings, paragraphs, tables and text images."""
+    from docx import Document
+    from docx.shared import Inches
+
+    rng = random.Random(seed)
+    document = Document()
+
+    per_section = max(1, paragraphs // max(1, tables + 1))
+    table_number = 0
+    for index in range(paragraphs):
+        if index % per_section == 0:
+            document.add_heading(sentence(rng, 5), level=1)
+            if table_number < tables and index:
+                table_number += 1
+                table = document.add_table(rows=6, cols=4)
+                for row in table.rows:
+                    for cell in row.cells:
+                        cell.text = f"{rng.choice(WORDS)} {rng.randint(1, 999)}"
+        document.add_paragraph(paragraph(rng, rng.randint(2, 5)))
+
+    for image_number in range(images):
+        png = render_text_image(f"Figure {image_number + 1}\n{sentence(rng, 5)}")
+        if png:
+            document.add_picture(io.BytesIO(png), width=Inches(5))
+
+    document.save(path)
+
+def generate_pptx(path, slides=20, images=1, seed=0):
+    """Write a deck with titled bullet slides, periodic tables, notes and text images."""
+    from pptx import Presentation
+    from pptx.util import Inches
+
+    rng = random.Random(seed)
+    presentation = Presentation()
+    title_and_content = presentation.slide_layouts[1]
+    image_slides = set(rng.sample(range(slides), min(images, slides)))
+
+    for index in range(slides):
+        slide = presentation.slides.add_slide(title_and_content)
+        slide.shapes.title.text = f"{index + 1}. {sentence(rng, 5)}"
+        body = slide.placeholders[1].text_frame
+        body.text = sentence(rng)
+        for _ in range(rng.randint(3, 6)):
+            body.add_paragraph().text = sentence(rng, rng.randint(6, 12))
+
+        if index % 10 == 9:
+            table = slide.shapes.add_table(4, 3, Inches(5), Inches(4.5), Inches(4), Inches(2)).table
+            for row in range(4):
+                for col in range(3):
+                    table.cell(row, col).text = f"{rng.choice(WORDS)} {rng.randint(1, 99)}"
+
+        if index in image_slides:
+            png = render_text_image(f"Diagram {index + 1}\n{sentence(rng, 4)}")
+            if png:
+                slide.shapes.add_picture(io.BytesIO(png), Inches(0.5), Inches(5), width=Inches(4))
+
+        slide.notes_slide.notes_text_frame.text = paragraph(rng, 2)
+
+    presentation.save(path)
+
+def table_row(rng, row):
+    """Return one spreadsheet-style row: id, two words, a quantity, a price and a note."""
+    return [row, rng.choice(WORDS), rng.choice(WORDS), rng.randint(1, 500),
+            round(rng.uniform(5, 250), 2), sentence(rng, rng.randint(4, 10))]
+
+TABLE_HEADER = ["id", "category", "style", "quantity", "price", "note"]
+
+def generate_xlsx(path, rows=1000, seed=0, sheets=2):
+    """Write a workbook with rows spread over several sheets (write-only mode)."""
+    from openpyxl import Workbook
+
+    rng = random.Random(seed)
+    workbook = Workbook(write_only=True)
+    per_sheet = max(1, rows // sheets)
+    for sheet_number in range(sheets):
+        sheet = workbook.create_sheet(f"Sheet{sheet_number + 1}")
+        sheet.append(TABLE_HEADER)
+        for row in range(1, per_sheet + 1):
+            sheet.append(table_row(rng, row))
+    workbook.save(path)
+
+def generate_csv(path, rows=1000, seed=0):
+    """Write a CSV export with quoted free-text notes."""
+    rng = random.Random(seed)
+    with open(path, "w", encoding="utf-8", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(TABLE_HEADER)
+        for row in range(1, rows + 1):
+            writer.writerow(table_row(rng, row))
+
+def generate_html(path, sections=100, seed=0):
+    """Write an HTML page with navigation, scripts and footer chrome around the content."""
+    rng = random.Random(seed)
+    with open(path, "w", encoding="utf-8") as file:
+        file.write("<!DOCTYPE html>\n<html><head><meta charset=\"utf-8\"><title>Studio Handbook</title>"
+                   "<style>body { font-family: sans-serif; }</style>"
+                   "<script>window.analytics = [];</script></head>\n<body>\n"
+                   "<header><nav class=\"site-nav\"><a href=\"/\">Home</a> <a href=\"/classes\">Classes</a></nav></header>\n"
+                   "<main>\n")
+        for index in range(sections):
+            file.write(f"<h2>{sentence(rng, 5)}</h2>\n")
+            for _ in range(rng.randint(2, 4)):
+                file.write(f"<p>{paragraph(rng, rng.randint(2, 4))}</p>\n")
+            if index % 10 == 9:
+                file.write("<table><tr><th>Class</th><th>Level</th><th>Students</th></tr>")
+                for _ in range(4):
+                    file.write(f"<tr><td>{rng.choice(WORDS)}</td><td>{rng.choice(WORDS)}</td>"
+                               f"<td>{rng.randint(1, 30)}</td></tr>")
+                file.write("</table>\n")
+        file.write("</main>\n<aside class=\"sidebar\">Related posts</aside>\n"
+                   "<footer>&copy; Studio</footer>\n</body></html>\n")
+
+def generate_markdown(path, sections=100, seed=0):
+    """Write a Markdown document with front matter, headings, lists, tables and code."""
+    rng = random.Random(seed)
+    with open(path, "w", encoding="utf-8") as file:
+        file.write("---\ntitle: Studio Handbook\n---\n\n# Studio Handbook\n\n")
+        for index in range(sections):
+            file.write(f"## {sentence(rng, 5)}\n\n{paragraph(rng, rng.randint(2, 4))} "
+                       f"See [the schedule](https://example.com/{index}) for **details**.\n\n")
+            for _ in range(rng.randint(2, 4)):
+                file.write(f"- {sentence(rng, rng.randint(4, 8))}\n")
+            file.write("\n")
+            if index % 10 == 9:
+                file.write("| Class | Level | Students |\n|---|---|---:|\n")
+                for _ in range(4):
+                    file.write(f"| {rng.choice(WORDS)} | {rng.choice(WORDS)} | {rng.randint(1, 30)} |\n")
+                file.write("\n```\nschedule = build_schedule(week)\n```\n\n")
+
+GENERATORS = {
+    "pdf": generate_pdf,
+    "docx": generate_docx,
+    "pptx": generate_pptx,
+    "xlsx": generate_xlsx,
+    "csv": generate_csv,
+    "html": generate_html,
+    "markdown": generate_markdown
+}
+
+# File extension per generated document type
+EXTENSIONS = {"markdown": "md"}
+
+def generate_corpus(output_dir, buckets=None, types=None, seed=0):
+    """
+    Generate one file per document type and size bucket.
+
+    Existing files are kept, so repeated benchmark runs reuse the same corpus.
+
+    Returns:
+        list: Dicts with type, bucket and path of each file
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    files = []
+
+    for bucket in buckets or list(SIZE_BUCKETS):
+        for document_type in types or list(GENERATORS):
+            path = output_dir / f"{bucket}_seed{seed}.{EXTENSIONS.get(document_type, document_type)}"
+            if not path.exists():
+                GENERATORS[document_type](str(path), seed=seed, **SIZE_BUCKETS[bucket][document_type])
+            files.append({"type": document_type, "bucket": bucket, "path": str(path)})
+
+    return files
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate a synthetic PDF/DOCX/PPTX/XLSX/CSV/HTML/Markdown corpus for benchmarking')
+    parser.add_argument('output_dir', help='Directory to write the corpus to')
+    parser.add_argument('--buckets', nargs='+', choices=list(SIZE_BUCKETS), help='Size buckets (default: all)')
+    parser.add_argument('--types', nargs='+', choices=list(GENERATORS), help='Document types (default: all)')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed for the generated text')
+
+    args = parser.parse_args()
+
+    try:
+        files = generate_corpus(args.output_dir, args.buckets, args.types, args.seed)
+    except ImportError as e:
+        print(json.dumps({"success": False, "error": f"Missing dependency: {str(e)}"}))
+        sys.exit(1)
+
+    print(json.dumps({"success": True, "files": files}, indent=2))
+
+if __name__ == "__main__":
+    main()
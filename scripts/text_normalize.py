@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Shared Text Normalization for the Document Processors
+Cleans extracted text in one call: Unicode NFC, typographic ligatures and soft
+hyphens, per-line whitespace, blank-line runs and (for PDF) words hyphenated across
+line breaks. Used by the PDF, Word and PowerPoint processors.
+"""
+
+import re
+import unicodedata
+
+# Typographic ligatures (U+FB00-U+FB06) expanded to plain letters; soft hyphens removed
+LIGATURES = {
+    "\ufb00": "ff",
+    "\ufb01": "fi",
+    "\ufb02": "fl",
+    "\ufb03": "ffi",
+    "\ufb04": "ffl",
+    "\ufb05": "st",
+    "\ufb06": "st",
+    "\u00ad": ""
+}
+
+# Whitespace is handled with C-level str methods rather than whole-buffer regexes:
+# a pattern led by a character class ("[ \t]*\n[ \t]*") is tried at every offset
+# and measured 6-10x slower on multi-megabyte text (see bench_normalize.py).
+# This pattern starts with a literal so the engine skips straight to candidates.
+HYPHENATED_BREAK = re.compile(r"-\n(?<=\w-\n)([a-z][\w']*[^\s\w]*)[^\S\n]*\n?")
+
+# Words that usually start a hyphenated compound: "well-\nknown" stays "well-known"
+COMPOUND_PREFIXES = {
+    "all", "anti", "co", "cross", "ex", "full", "half", "high", "ill", "long", "low",
+    "multi", "non", "part", "post", "pre", "quasi", "self", "semi", "short", "so", "well"
+}
+
+# Characters looked back from a hyphenated break to find the word it ends
+HYPHEN_LOOKBEHIND_CHARS = 64
+
+def join_hyphenated(match):
+    """
+    Replacement for HYPHENATED_BREAK: join the word halves, but keep the hyphen when
+    the first half is a compound prefix or already part of a hyphenated compound
+    ("state-of-the-\nart").
+    """
+    start = match.start()
+    before = match.string[max(0, start - HYPHEN_LOOKBEHIND_CHARS):start].rsplit(None, 1)
+    word = before[-1].lstrip("\"'([{") if before else ""
+    if "-" in word or word.lower() in COMPOUND_PREFIXES:
+        return f"-{match.group(1)}\n"
+    return f"{match.group(1)}\n"
+
+def normalize_text(text, keep_blank_lines=False, dehyphenate=False):
+    """
+    Normalize extracted document text.
+
+    Every line is stripped (as str.strip() does, including Unicode whitespace) and
+    the result is stripped as a whole. Each fix-up is guarded by a cheap check, so
+    text that does not need it costs almost nothing extra.
+
+    Args:
+        text (str): Extracted text
+        keep_blank_lines (bool): Keep paragraph breaks as a single blank line (Word,
+            PowerPoint); otherwise blank lines are dropped (PDF)
+        dehyphenate (bool): Join words split with a hyphen at a line break when the
+            continuation is lower-case, moving the rest of the word up to the first
+            line ("exam-\\nple text" becomes "example\\ntext"); the hyphen is kept
+            for compounds ("well-\\nknown" becomes "well-known")
+
+    Returns:
+        str: Normalized text
+    """
+    if not text:
+        return ""
+
+    # str.replace per character: str.translate with multi-character replacements
+    # is an order of magnitude slower on large text
+    for character, replacement in LIGATURES.items():
+        if character in text:
+            text = text.replace(character, replacement)
+    if not unicodedata.is_normalized("NFC", text):
+        text = unicodedata.normalize("NFC", text)
+
+    if keep_blank_lines:
+        # One loop that also collapses blank-line runs: a second whole-buffer pass for
+        # "\n\n\n" costs more than the loop saves
+        kept = []
+        previous = ""
+        for line in text.split("\n"):
+            line = line.strip()
+            if line or previous:
+                kept.append(line)
+            previous = line
+        text = "\n".join(kept)
+    else:
+        text = "\n".join(filter(None, map(str.strip, text.split("\n"))))
+
+    if dehyphenate and "-\n" in text:
+        text = HYPHENATED_BREAK.sub(join_hyphenated, text)
+
+    return text.strip()
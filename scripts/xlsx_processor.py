@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+Excel Workbook Text Extraction Script
+Extracts cell text from .xlsx files with openpyxl in read-only mode, streaming rows
+sheet by sheet so memory stays flat on very large workbooks.
+"""
+
+import sys
+import json
+import argparse
+import os
+import logging
+from datetime import date, datetime, time
+
+from processor_log import get_logger, configure_logging, add_logging_arguments, log_event
+from processor_metrics import DocumentMetrics, add_metrics_arguments, serialize_result
+from processor_output import add_output_arguments, write_output
+
+try:
+    from openpyxl import load_workbook
+except ImportError:
+    print(json.dumps({
+        "success": False,
+        "error": "openpyxl not installed. Please run: pip install openpyxl",
+        "text": "",
+        "rowCount": 0
+    }))
+    sys.exit(1)
+
+logger = get_logger("xlsx")
+
+# Non-empty rows grouped into one block
+ROWS_PER_BLOCK = 50
+
+def format_cell(value):
+    """Render a cell value as text (None as an empty string, whole floats without .0)."""
+    if value is None:
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    return str(value).strip()
+
+def format_row(values):
+    """Tab-join a row's cells, dropping trailing empty cells; returns "" for empty rows."""
+    cells = [format_cell(value) for value in values]
+    while cells and not cells[-1]:
+        cells.pop()
+    return "\t".join(cells)
+
+def open_workbook(file):
+    """
+    Open a workbook in read-only (streaming) mode from a binary file object.
+
+    Passing a file object rather than a path skips openpyxl's file extension check,
+    so workbooks detected by content but saved under another name still open. The
+    file must stay open until the workbook is closed.
+    """
+    return load_workbook(file, read_only=True, data_only=True)
+
+def iter_xlsx_blocks(workbook, max_rows=None):
+    """
+    Yield blocks of rows from a workbook opened with read_only=True.
+
+    Rows are read with iter_rows(values_only=True), so only the current block is held
+    in memory. Empty rows are skipped.
+
+    Args:
+        workbook: openpyxl Workbook opened in read-only mode
+        max_rows (int): Optional maximum number of non-empty rows per sheet (None for all)
+
+    Yields:
+        dict: {"type": "rows", "position", "sheet", "firstRow", "lastRow", "text"}
+    """
+    position = 0
+    for sheet in workbook.worksheets:
+        lines = []
+        first_row = None
+        row_count = 0
+
+        for row_number, values in enumerate(sheet.iter_rows(values_only=True), 1):
+            line = format_row(values)
+            if not line:
+                continue
+            if first_row is None:
+                first_row = row_number
+            lines.append(line)
+            last_row = row_number
+            row_count += 1
+
+            if len(lines) == ROWS_PER_BLOCK:
+                position += 1
+                yield {"type": "rows", "position": position, "sheet": sheet.title,
+                       "firstRow": first_row, "lastRow": last_row, "text": "\n".join(lines)}
+                lines, first_row = [], None
+
+            if max_rows is not None and row_count >= max_rows:
+                break
+
+        if lines:
+            position += 1
+            yield {"type": "rows", "position": position, "sheet": sheet.title,
+                   "firstRow": first_row, "lastRow": last_row, "text": "\n".join(lines)}
+
+def describe_xlsx_error(error, xlsx_path):
+    """
+    Build a user-facing message for an exception raised while reading a workbook.
+
+    Args:
+        error (Exception): The exception that was raised
+        xlsx_path (str): Path to the .xlsx file
+
+    Returns:
+        str: Error message
+    """
+    if isinstance(error, FileNotFoundError):
+        return f"Excel workbook not found: {xlsx_path}"
+
+    error_msg = str(error)
+    if "not a zip file" in error_msg.lower():
+        return "Invalid Excel workbook format. Please ensure the file is a valid .xlsx file (not .xls)."
+    return f"Unexpected error processing Excel workbook: {error_msg}"
+
+def extract_text_from_xlsx(xlsx_path, max_rows=None, metrics=None):
+    """
+    Extract text from an Excel workbook.
+
+    Args:
+        xlsx_path (str): Path to the .xlsx file
+        max_rows (int): Optional maximum number of non-empty rows per sheet (None for all)
+        metrics (DocumentMetrics): Optional metrics to record stages and counts into
+
+    Returns:
+        dict: Result containing success status, text, per-sheet row counts and timings
+    """
+    metrics = metrics or DocumentMetrics("xlsx", logger)
+    file = None
+    workbook = None
+    try:
+        metrics.count("bytes", os.path.getsize(xlsx_path))
+        with metrics.stage("parse"):
+            file = open(xlsx_path, 'rb')
+            workbook = open_workbook(file)
+
+        parts = []
+        sheets = {}
+        with metrics.stage("extract"):
+            for block in iter_xlsx_blocks(workbook, max_rows):
+                if block["sheet"] not in sheets:
+                    sheets[block["sheet"]] = 0
+                    parts.append(f"--- Sheet: {block['sheet']} ---")
+                sheets[block["sheet"]] += block["text"].count("\n") + 1
+                parts.append(block["text"])
+
+        text = "\n".join(parts)
+        row_count = sum(sheets.values())
+        metrics.count("rows", row_count)
+        log_event(logger, logging.INFO, "Workbook extracted", sheets=len(workbook.sheetnames), rows=row_count)
+
+        return {
+            "success": True,
+            "text": text,
+            "sheetCount": len(workbook.sheetnames),
+            "rowCount": row_count,
+            "sheets": [{"name": name, "rows": sheets.get(name, 0)} for name in workbook.sheetnames],
+            "hasText": bool(text.strip()),
+            "timings": metrics.as_dict()
+        }
+
+    except Exception as e:
+        return {
+            "success": False,
+            "error": describe_xlsx_error(e, xlsx_path),
+            "text": "",
+            "rowCount": 0
+        }
+    finally:
+        if workbook is not None:
+            workbook.close()
+        if file is not None:
+            file.close()
+
+def stream_text_from_xlsx(xlsx_path, max_rows=None, out=None, metrics=None):
+    """
+    Write workbook row blocks as NDJSON, one JSON object per line, as they are read.
+
+    A final "summary" line carries the counts; failures are reported as an "error" line.
+
+    Returns:
+        bool: True if the workbook was processed successfully
+    """
+    out = out or sys.stdout
+    metrics = metrics or DocumentMetrics("xlsx", logger)
+
+    def emit(record):
+        out.write(json.dumps(record) + "\n")
+        out.flush()
+
+    file = None
+    workbook = None
+    try:
+        metrics.count("bytes", os.path.getsize(xlsx_path))
+        with metrics.stage("parse"):
+            file = open(xlsx_path, 'rb')
+            workbook = open_workbook(file)
+
+        rows = 0
+        blocks = 0
+        characters = 0
+        for block in iter_xlsx_blocks(workbook, max_rows):
+            rows += block["text"].count("\n") + 1
+            blocks += 1
+            characters += len(block["text"])
+            emit(block)
+
+        metrics.count("rows", rows)
+        emit({
+            "type": "summary",
+            "success": True,
+            "sheetCount": len(workbook.sheetnames),
+            "rowCount": rows,
+            "blockCount": blocks,
+            "characterCount": characters,
+            "hasText": characters > 0,
+            "timings": metrics.as_dict()
+        })
+        return True
+
+    except Exception as e:
+        emit({
+            "type": "error",
+            "success": False,
+            "error": describe_xlsx_error(e, xlsx_path)
+        })
+        return False
+    finally:
+        if workbook is not None:
+            workbook.close()
+        if file is not None:
+            file.close()
+
+def main():
+    parser = argparse.ArgumentParser(description='Extract text from Excel (.xlsx) workbooks')
+    parser.add_argument('xlsx_path', help='Path to the .xlsx file')
+    parser.add_argument('--max-rows', type=int, default=None, help='Maximum non-empty rows per sheet (default: all)')
+    parser.add_argument('--stream', action='store_true', help='Stream row blocks as NDJSON')
+    add_logging_arguments(parser)
+    add_metrics_arguments(parser)
+    add_output_arguments(parser)
+
+    args = parser.parse_args()
+    configure_logging(args.log_level, args.log_json)
+
+    metrics = DocumentMetrics("xlsx", logger)
+    metrics.record_startup()
+    if args.profile_memory:
+        metrics.enable_memory_profiling()
+
+    if args.stream:
+        success = stream_text_from_xlsx(args.xlsx_path, args.max_rows, metrics=metrics)
+        if args.metrics_file:
+            metrics.write(args.metrics_file, args.metrics_format, success=success)
+        sys.exit(0 if success else 1)
+
+    result = extract_text_from_xlsx(args.xlsx_path, args.max_rows, metrics)
+    write_output(serialize_result(result, metrics, args.metrics_file, args.metrics_format,
+                                 output_format=args.output_format, indent=2))
+
+if __name__ == "__main__":
+    main()